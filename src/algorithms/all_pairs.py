@@ -0,0 +1,158 @@
+# algorithms/all_pairs.py
+
+import os
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+
+import instrumentation
+from algorithms.engagement_paths import DEFAULT_MAX_NODES, highest_engagement_path
+from algorithms.influence import graph_influence_matrix
+from algorithms.shortest_paths import bfs_tree
+from data.graph import Graph
+
+# Each worker gets roughly this many shards, which keeps the pool busy when
+# some sources take much longer than others.
+SHARDS_PER_WORKER = 4
+# Shards per worker submitted but not yet consumed; a slow consumer (the CSV
+# writer) holds the pool back instead of piling up finished blocks.
+IN_FLIGHT_PER_WORKER = 2
+
+GRAPH_ARRAYS = (
+    'out_indptr', 'out_indices', 'in_indptr', 'in_indices',
+    'likes_indptr', 'likes_indices', 'likes_data',
+    'comments_indptr', 'comments_indices', 'comments_data',
+)
+
+_worker_context = None
+
+
+class AllPairsContext:
+    def __init__(self, graph, targets, max_nodes=DEFAULT_MAX_NODES):
+        # max_nodes caps the work of each highest engagement path search;
+        # capped searches report the best path found so far, marked inexact.
+        self.graph = graph
+        self.max_nodes = max_nodes
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.influences = graph_influence_matrix(graph)
+        self.weights = graph.total_engagements().tolist()
+        self.followers = graph.in_degrees().tolist()
+
+
+def pack_paths(paths):
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum([len(path) for path in paths], out=offsets[1:])
+    flat = np.fromiter((node for path in paths for node in path), dtype=np.int32, count=int(offsets[-1]))
+    return offsets, flat
+
+
+def unpack_path(offsets, flat, position):
+    return flat[offsets[position]:offsets[position + 1]].tolist()
+
+
+def analyze_source(context, source):
+    graph = context.graph
+    weights = context.weights
+    followers = context.followers[source]
+    engagement_rate = weights[source] / followers * 100 if followers else 0.0
+    influences = context.influences.dense_row(source)[context.targets]
+    with instrumentation.timer('all_pairs.bfs_tree'):
+        tree = bfs_tree(graph, source)
+    shortest_paths = []
+    shortest_times = np.zeros(len(context.targets))
+    engagement_paths = []
+    engagements = np.zeros(len(context.targets), dtype=np.int64)
+    exact = np.ones(len(context.targets), dtype=bool)
+    for position, target in enumerate(context.targets.tolist()):
+        if target == source:
+            shortest_paths.append([])
+            engagement_paths.append([])
+            continue
+        start_time = time.perf_counter()
+        shortest_paths.append(tree.path(target))
+        shortest_times[position] = time.perf_counter() - start_time
+
+        with instrumentation.timer('all_pairs.highest_engagement_path'):
+            result = highest_engagement_path(
+                graph, source, target, max_nodes=context.max_nodes, weights=weights, forward=tree.distances
+            )
+        exact[position] = result.exact
+        # The report scores every member on the path except the target.
+        engagement = result.engagement - weights[target] if result.path else 0
+        if engagement > 0:
+            engagement_paths.append(result.path)
+            engagements[position] = engagement
+        else:
+            engagement_paths.append([])
+    return (
+        source, engagement_rate, influences,
+        pack_paths(shortest_paths), shortest_times,
+        pack_paths(engagement_paths), engagements, exact,
+    )
+
+
+def save_graph_arrays(graph, directory):
+    out_indptr, out_indices = graph.out_csr()
+    in_indptr, in_indices = graph.in_csr()
+    arrays = (out_indptr, out_indices, in_indptr, in_indices)
+    arrays += graph.likes.csr(len(graph)) + graph.comments.csr(len(graph))
+    for name, array in zip(GRAPH_ARRAYS, arrays):
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+
+
+def load_graph_arrays(directory):
+    arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in GRAPH_ARRAYS]
+    return Graph.from_arrays(arrays[0:2], arrays[2:4], arrays[4:7], arrays[7:10])
+
+
+def _init_worker(directory, targets, max_nodes, instrumented):
+    global _worker_context
+    # A forked worker starts with a copy of the parent's counters.
+    instrumentation.reset()
+    if instrumented:
+        instrumentation.enable()
+    else:
+        instrumentation.disable()
+    _worker_context = AllPairsContext(load_graph_arrays(directory), targets, max_nodes)
+
+
+def _analyze_shard(sources):
+    blocks = [analyze_source(_worker_context, source) for source in sources]
+    if not instrumentation.ENABLED:
+        return blocks, None
+    counts = instrumentation.snapshot()
+    instrumentation.reset()
+    return blocks, counts
+
+
+def all_pairs_blocks(graph, sources, targets, workers=1, max_nodes=DEFAULT_MAX_NODES):
+    sources = [int(source) for source in sources]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(sources) <= 1:
+        context = AllPairsContext(graph, targets, max_nodes)
+        for source in sources:
+            yield analyze_source(context, source)
+        return
+    # Imported here so single-process runs skip loading multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor
+    shard_size = max(1, -(-len(sources) // (workers * SHARDS_PER_WORKER)))
+    shards = [sources[start:start + shard_size] for start in range(0, len(sources), shard_size)]
+    with tempfile.TemporaryDirectory() as directory:
+        save_graph_arrays(graph, directory)
+        initargs = (directory, targets, max_nodes, instrumentation.ENABLED)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as executor:
+            shards = iter(shards)
+            in_flight = deque(
+                executor.submit(_analyze_shard, shard) for _, shard in zip(range(IN_FLIGHT_PER_WORKER * workers), shards)
+            )
+            while in_flight:
+                blocks, counts = in_flight.popleft().result()
+                shard = next(shards, None)
+                if shard is not None:
+                    in_flight.append(executor.submit(_analyze_shard, shard))
+                if counts is not None:
+                    instrumentation.merge(counts)
+                yield from blocks
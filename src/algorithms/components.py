@@ -0,0 +1,195 @@
+# algorithms/components.py
+
+import numpy as np
+
+from data.graph import GraphListener
+from data.sparse import build_csr, csr_rows
+
+
+def strongly_connected_components(graph):
+    # Iterative Tarjan; components are labelled in reverse topological order,
+    # so label 0 is a sink of the condensation.
+    indptr, indices = graph.out_csr()
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    num_nodes = len(graph)
+    order = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    labels = [-1] * num_nodes
+    stack = []
+    counter = 0
+    count = 0
+    for root in range(num_nodes):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, indptr[root]]]
+        while work:
+            frame = work[-1]
+            node, edge = frame
+            end = indptr[node + 1]
+            descended = False
+            while edge < end:
+                neighbor = indices[edge]
+                edge += 1
+                if order[neighbor] == -1:
+                    frame[1] = edge
+                    order[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = True
+                    work.append([neighbor, indptr[neighbor]])
+                    descended = True
+                    break
+                if on_stack[neighbor] and order[neighbor] < low[node]:
+                    low[node] = order[neighbor]
+            if descended:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    labels[member] = count
+                    if member == node:
+                        break
+                count += 1
+    return np.array(labels, dtype=np.int32), count
+
+
+class ReachabilityIndex(GraphListener):
+    # Answers "can A reach B" from the condensation of the follow graph.
+    # Tarjan labels are a reverse topological order, so a member can only
+    # reach components with a label no greater than its own; each of the
+    # randomised DFS traversals also gives every component a post-order
+    # interval that contains the intervals of all it can reach. Pairs that
+    # fail either test are rejected in O(traversals), and pairs in the same
+    # DFS subtree are accepted just as fast; the rest fall back to a search
+    # of the condensation pruned by the same labels. The index is
+    # rebuilt lazily after the graph changes.
+
+    def __init__(self, graph, traversals=2, seed=0):
+        self.graph = graph
+        self.traversals = traversals
+        self.seed = seed
+        self.searches = 0
+        self._build()
+        graph.listeners.append(self)
+
+    def reachable(self, source, target):
+        if self.stale:
+            self._build()
+        labels = self.labels
+        source_label = labels[source]
+        target_label = labels[target]
+        if source_label == target_label:
+            return True
+        if not self._may_reach(source_label, target_label):
+            return False
+        for _, start, post in self.intervals:
+            # Descendants in the DFS spanning tree are numbered contiguously.
+            if start[source_label] <= post[target_label] <= post[source_label]:
+                return True
+        self.searches += 1
+        indptr, indices = self.indptr, self.indices
+        seen = {source_label}
+        stack = [source_label]
+        while stack:
+            label = stack.pop()
+            for child in indices[indptr[label]:indptr[label + 1]]:
+                if child == target_label:
+                    return True
+                if child not in seen and self._may_reach(child, target_label):
+                    seen.add(child)
+                    stack.append(child)
+        return False
+
+    def _may_reach(self, source_label, target_label):
+        if source_label < target_label:
+            return False
+        for low, _, post in self.intervals:
+            if low[target_label] < low[source_label] or post[target_label] > post[source_label]:
+                return False
+        return True
+
+    def _build(self):
+        graph = self.graph
+        labels, count = strongly_connected_components(graph)
+        indptr, indices = graph.out_csr()
+        sources = labels[csr_rows(indptr)]
+        targets = labels[indices]
+        between = sources != targets
+        indptr, indices = build_csr(count, sources[between], targets[between])
+        self.labels = labels.tolist()
+        self.count = count
+        self.indptr = indptr.tolist()
+        self.indices = indices.tolist()
+        has_parent = np.zeros(count, dtype=bool)
+        has_parent[indices] = True
+        roots = np.flatnonzero(~has_parent)
+        rng = np.random.default_rng(self.seed)
+        rows = csr_rows(indptr)
+        self.intervals = []
+        for _ in range(self.traversals):
+            # Shuffle the children within each row and the order of the roots.
+            shuffled = indices[np.lexsort((rng.random(len(indices)), rows))].tolist()
+            self.intervals.append(self._interval_labels(rng.permutation(roots).tolist(), shuffled))
+        self.stale = False
+
+    def _interval_labels(self, roots, indices):
+        # Post-order numbers from one DFS over the condensation, the first
+        # post number handed out inside each component's DFS subtree, and
+        # the smallest post number of anything the component reaches.
+        indptr = self.indptr
+        start = [-1] * self.count
+        post = [-1] * self.count
+        visited = [False] * self.count
+        counter = 0
+        for root in roots:
+            visited[root] = True
+            start[root] = counter
+            work = [(root, iter(indices[indptr[root]:indptr[root + 1]]))]
+            while work:
+                label, children = work[-1]
+                for child in children:
+                    if not visited[child]:
+                        visited[child] = True
+                        start[child] = counter
+                        work.append((child, iter(indices[indptr[child]:indptr[child + 1]])))
+                        break
+                else:
+                    work.pop()
+                    post[label] = counter
+                    counter += 1
+        low = list(post)
+        # Children carry smaller Tarjan labels, so ascending order is bottom-up.
+        for label in range(self.count):
+            for child in indices[indptr[label]:indptr[label + 1]]:
+                if low[child] < low[label]:
+                    low[label] = low[child]
+        return low, start, post
+
+    def on_member(self, node):
+        self.stale = True
+
+    def on_follow(self, source, target):
+        # A follow between members that already reach each other in that
+        # direction adds no new reachability (nor a new cycle), so the index
+        # stays valid and skips the rebuild.
+        if not self.stale and self.reachable(source, target):
+            return
+        self.stale = True
+
+    def on_unfollow(self, source, target):
+        self.stale = True
+
+    def on_bulk(self):
+        self.stale = True
@@ -0,0 +1,209 @@
+# algorithms/engagement_paths.py
+
+import time
+
+import instrumentation
+from algorithms.components import ReachabilityIndex, strongly_connected_components
+from algorithms.shortest_paths import bfs_tree
+
+# Above this many candidate members the (node, visited-set) memo is skipped,
+# since the number of distinct states it would hold explodes.
+MEMO_LIMIT = 64
+# The time budget is only checked every this many expansions.
+CLOCK_INTERVAL = 1024
+# Node expansions one search may spend unless the caller passes its own
+# max_nodes (None for no cap). The exact search is exponential in the worst
+# case; past this the best path found so far is returned with exact=False.
+DEFAULT_MAX_NODES = 2_000
+
+MODES = ('exact', 'dag', 'hops')
+
+
+class EngagementPath:
+    def __init__(self, graph, path, engagement, exact, expanded):
+        self.graph = graph
+        self.path = path
+        self.engagement = engagement
+        self.exact = exact
+        self.expanded = expanded
+
+    def path_ids(self):
+        members = self.graph.members
+        return [members[node].member_id for node in self.path]
+
+
+class Budget:
+    def __init__(self, max_nodes=None, max_seconds=None):
+        self.max_nodes = max_nodes
+        self.deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+        self.expanded = 0
+        self.exhausted = False
+
+    def spend(self):
+        self.expanded += 1
+        if self.max_nodes is not None and self.expanded > self.max_nodes:
+            self.exhausted = True
+        elif self.deadline is not None and self.expanded % CLOCK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            self.exhausted = True
+        return not self.exhausted
+
+
+def highest_engagement_path(graph, source, target, mode='exact', max_hops=None, max_nodes=DEFAULT_MAX_NODES, max_seconds=None,
+                            weights=None, forward=None):
+    # Callers asking for many targets of one source can pass the member
+    # weights list and the source's BFS distances to avoid recomputing them.
+    if mode not in MODES:
+        raise ValueError(f"Unknown highest engagement path mode: {mode}")
+    if mode == 'hops' and max_hops is None:
+        raise ValueError("The 'hops' mode needs max_hops")
+    if weights is None:
+        weights = graph.total_engagements().tolist()
+    budget = Budget(max_nodes, max_seconds)
+    if source == target:
+        return EngagementPath(graph, [source], weights[source], True, 0)
+    reachability = graph.listener(ReachabilityIndex)
+    if reachability is not None and not reachability.reachable(source, target):
+        return EngagementPath(graph, [], None, True, 0)
+    if forward is None:
+        forward = bfs_tree(graph, source).distances
+    if forward[target] < 0:
+        return EngagementPath(graph, [], None, True, 0)
+    backward = bfs_tree(graph, target, reverse=True).distances
+    if backward[source] < 0:
+        return EngagementPath(graph, [], None, True, 0)
+    candidates = (forward >= 0) & (backward >= 0)
+    if mode == 'dag':
+        result = _dag_search(graph, source, target, weights, candidates, budget)
+    else:
+        result = _dfs_search(graph, source, target, weights, candidates, backward.tolist(), max_hops, budget)
+    if instrumentation.ENABLED:
+        instrumentation.count('engagement_path.searches')
+        instrumentation.count('engagement_path.candidates', int(candidates.sum()))
+        instrumentation.count('engagement_path.nodes_expanded', result.expanded)
+        instrumentation.count('engagement_path.inexact', not result.exact)
+    return result
+
+
+def _dfs_search(graph, source, target, weights, candidates, to_target, max_hops, budget):
+    indptr, indices = graph.out_csr()
+    nodes = candidates.nonzero()[0].tolist()
+    candidates = candidates.tolist()
+    bit = {node: 1 << position for position, node in enumerate(nodes)} if len(nodes) <= MEMO_LIMIT else None
+    explored = set()
+    neighbors = {}
+
+    def successors(node):
+        row = neighbors.get(node)
+        if row is None:
+            row = [n for n in indices[indptr[node]:indptr[node + 1]].tolist() if candidates[n]]
+            neighbors[node] = row
+        return row
+
+    on_path = {source}
+    path = [source]
+    score = weights[source]
+    remaining = sum(weights[node] for node in nodes) - score
+    mask = bit[source] if bit is not None else 0
+    best_path, best = [], None
+    cut_by_hops = False
+    stack = [iter(successors(source))]
+    while stack:
+        node = path[-1]
+        advanced = False
+        for neighbor in stack[-1]:
+            if neighbor in on_path:
+                continue
+            if neighbor == target:
+                if max_hops is not None and len(path) > max_hops:
+                    cut_by_hops = True
+                elif best is None or score + weights[target] > best:
+                    best = score + weights[target]
+                    best_path = path + [target]
+                continue
+            if max_hops is not None and len(path) + to_target[neighbor] > max_hops:
+                cut_by_hops = True
+                continue
+            if best is not None and score + remaining <= best:
+                break
+            state = (neighbor, mask | bit[neighbor]) if bit is not None else None
+            if state is not None:
+                if state in explored:
+                    continue
+                explored.add(state)
+            if not budget.spend():
+                break
+            on_path.add(neighbor)
+            path.append(neighbor)
+            score += weights[neighbor]
+            remaining -= weights[neighbor]
+            if bit is not None:
+                mask |= bit[neighbor]
+            stack.append(iter(successors(neighbor)))
+            advanced = True
+            break
+        if budget.exhausted:
+            break
+        if advanced:
+            continue
+        stack.pop()
+        path.pop()
+        if node != source:
+            on_path.discard(node)
+            score -= weights[node]
+            remaining += weights[node]
+            if bit is not None:
+                mask &= ~bit[node]
+    exact = not budget.exhausted and not cut_by_hops
+    return EngagementPath(graph, best_path, best, exact, budget.expanded)
+
+
+def _dag_search(graph, source, target, weights, candidates, budget):
+    indptr, indices = graph.out_csr()
+    labels, count = strongly_connected_components(graph)
+    labels = labels.tolist()
+    components = [[] for _ in range(count)]
+    for node in candidates.nonzero()[0].tolist():
+        components[labels[node]].append(node)
+    candidates = candidates.tolist()
+    best = [None] * len(graph)
+    parent = [-1] * len(graph)
+    best[source] = weights[source]
+    exact = True
+    # Tarjan labels sinks first, so walk the labels backwards for a topological order.
+    for label in range(count - 1, -1, -1):
+        members = components[label]
+        if not members:
+            continue
+        if len(members) > 1:
+            exact = False
+            settled = sorted((node for node in members if best[node] is not None), key=lambda node: -best[node])
+            queue = list(settled)
+            settled = set(settled)
+            for node in queue:
+                if not budget.spend():
+                    break
+                for neighbor in indices[indptr[node]:indptr[node + 1]].tolist():
+                    if labels[neighbor] == label and neighbor not in settled:
+                        settled.add(neighbor)
+                        best[neighbor] = best[node] + weights[neighbor]
+                        parent[neighbor] = node
+                        queue.append(neighbor)
+        for node in members:
+            if best[node] is None:
+                continue
+            budget.spend()
+            for neighbor in indices[indptr[node]:indptr[node + 1]].tolist():
+                if labels[neighbor] != label and candidates[neighbor]:
+                    engagement = best[node] + weights[neighbor]
+                    if best[neighbor] is None or engagement > best[neighbor]:
+                        best[neighbor] = engagement
+                        parent[neighbor] = node
+        if budget.exhausted:
+            break
+    if best[target] is None:
+        return EngagementPath(graph, [], None, False, budget.expanded)
+    path = [target]
+    while path[-1] != source:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return EngagementPath(graph, path, best[target], exact and not budget.exhausted, budget.expanded)
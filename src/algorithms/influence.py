@@ -1,8 +1,43 @@
 # algorithms/influence.py
 
+from algorithms.ranking import top_k
+import numpy as np
+
+from data.graph import member_nodes, shared_graph
+from data.sparse import CSRMatrix, csr_rows
+
 def calculate_influence(member_a, member_b):
     total_engagement_a = member_a.total_engagement()
     if total_engagement_a == 0:
         return 0.0
-    influence = (member_a.likes.get(member_b.member_id, 0) + member_a.comments.get(member_b.member_id, 0)) / total_engagement_a * 100
+    if member_b._graph is not member_a._graph:
+        return 0.0
+    influence = member_a._graph.engagement_between(member_a._index, member_b._index) / total_engagement_a * 100
     return round(influence, 2)
+
+def influence_matrix(members):
+    return graph_influence_matrix(shared_graph(members))
+
+def graph_influence_matrix(graph):
+    engagement = graph.engagement_matrix()
+    totals = engagement.row_sums()[csr_rows(engagement.indptr)]
+    # Rows summing to zero (explicit zero counts) have no influence.
+    influence = np.zeros(len(engagement.data))
+    nonzero = totals != 0
+    influence[nonzero] = engagement.data[nonzero] / totals[nonzero] * 100
+    return CSRMatrix(engagement.indptr, engagement.indices, influence, engagement.shape, engagement.ids)
+
+def top_influenced(members, k, matrix=None):
+    if k <= 0:
+        return
+    if matrix is None:
+        matrix = influence_matrix(members)
+    ids = matrix.ids
+    for node in member_nodes(members).tolist():
+        start, end = matrix.indptr[node], matrix.indptr[node + 1]
+        cols = matrix.indices[start:end]
+        values = matrix.data[start:end]
+        keep = cols != node
+        cols, values = cols[keep], values[keep]
+        order = top_k(values, cols, k)
+        yield ids[node], [(ids[col], value) for col, value in zip(cols[order].tolist(), values[order].tolist())]
@@ -0,0 +1,206 @@
+# algorithms/landmarks.py
+
+import os
+
+import numpy as np
+
+from algorithms.shortest_paths import hop_distances
+
+LANDMARK_ARRAYS = ('landmarks', 'from_landmarks', 'to_landmarks')
+# Smaller frontiers are expanded unpruned; bounding them costs more than it saves.
+PRUNE_MIN_FRONTIER = 256
+
+
+class LandmarkIndex:
+    # Hop distances from and to k landmark members (ALT). By the triangle
+    # inequality they bound any distance in O(k) and prune the exact path
+    # search. More landmarks cost k BFS passes and 2*k bytes (or 4*k
+    # once distances pass 254) per member, and tighten the bounds.
+    # The index describes the graph as it was when built.
+
+    def __init__(self, landmarks, from_landmarks, to_landmarks, graph=None):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.from_landmarks = from_landmarks
+        self.to_landmarks = to_landmarks
+        self.unreachable = np.iinfo(from_landmarks.dtype).max
+
+    @classmethod
+    def build(cls, graph, num_landmarks=16, strategy='degree'):
+        num_landmarks = min(num_landmarks, len(graph))
+        if strategy == 'degree':
+            landmarks = np.argsort(-(graph.in_degrees() + graph.out_degrees()), kind='stable')[:num_landmarks]
+            from_landmarks = _distance_rows(graph, landmarks, reverse=False)
+        elif strategy == 'farthest':
+            landmarks, from_landmarks = _farthest_landmarks(graph, num_landmarks)
+        else:
+            raise ValueError(f"Unknown landmark strategy: {strategy}")
+        to_landmarks = _distance_rows(graph, landmarks, reverse=True)
+        dtype = np.uint8 if max(from_landmarks.max(initial=0), to_landmarks.max(initial=0)) < 255 else np.uint16
+        return cls(
+            landmarks.astype(np.int64),
+            _compact(from_landmarks, dtype),
+            _compact(to_landmarks, dtype),
+            graph,
+        )
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in LANDMARK_ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, graph=None):
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in LANDMARK_ARRAYS]
+        return cls(*arrays, graph=graph)
+
+    @property
+    def nbytes(self):
+        return self.from_landmarks.nbytes + self.to_landmarks.nbytes
+
+    def bounds(self, source, target):
+        # Returns (lower, upper); lower is inf when some landmark proves there
+        # is no path and upper is inf when no landmark lies on a path.
+        lower = self.lower_bounds(source, target)[0]
+        upper = self.upper_bounds(source, target)[0]
+        return _as_int(lower), _as_int(upper)
+
+    def lower_bounds(self, sources, targets):
+        sources, targets = np.broadcast_arrays(np.atleast_1d(sources), np.atleast_1d(targets))
+        lower = _lower_bounds(
+            self._column(self.from_landmarks, sources), self._column(self.to_landmarks, sources),
+            self._column(self.from_landmarks, targets), self._column(self.to_landmarks, targets),
+        )
+        lower[sources == targets] = 0
+        return lower
+
+    def upper_bounds(self, sources, targets):
+        sources, targets = np.broadcast_arrays(np.atleast_1d(sources), np.atleast_1d(targets))
+        upper = (self._column(self.to_landmarks, sources) + self._column(self.from_landmarks, targets)).min(axis=0, initial=np.inf)
+        upper[sources == targets] = 0
+        return upper
+
+    def distance(self, source, target):
+        lower, upper = self.bounds(source, target)
+        if lower == np.inf:
+            return None
+        if lower == upper:
+            return lower
+        path = self.path(source, target)
+        return len(path) - 1 if path else None
+
+    def path(self, source, target):
+        # Bidirectional BFS in which each new level is pruned with the
+        # landmark bounds: a node whose level plus its lower bound to the far
+        # end exceeds the upper bound cannot be on a shortest path. Nodes of
+        # a shortest path are never pruned and keep their true levels, so
+        # the first meeting still closes a shortest path.
+        if self.graph is None:
+            raise ValueError("A graph is needed to search for paths")
+        if source == target:
+            return [source]
+        lower, upper = self.bounds(source, target)
+        if lower == np.inf:
+            return []
+        forward = _Side(self.graph.successors, source, lambda nodes: self.lower_bounds(nodes, target))
+        backward = _Side(self.graph.predecessors, target, lambda nodes: self.lower_bounds(source, nodes))
+        while forward.frontier and backward.frontier:
+            side, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+            node = side.expand(other, upper)
+            if node is not None:
+                return forward.trace(node)[::-1] + backward.trace(node)[1:]
+        return []
+
+    def _column(self, distances, nodes):
+        # (landmarks, nodes) float distances with inf for unreachable.
+        columns = distances[:, nodes].astype(np.float64)
+        columns[columns == self.unreachable] = np.inf
+        return columns
+
+
+def _lower_bounds(from_source, to_source, from_target, to_target):
+    # d(s, t) >= d(L, t) - d(L, s) and d(s, t) >= d(s, L) - d(t, L). A
+    # landmark reaching s but not t, or reached from t but not from s,
+    # proves there is no path at all, and inf - finite keeps that as inf.
+    with np.errstate(invalid='ignore'):
+        forward = from_target - from_source
+        backward = to_source - to_target
+    forward[np.isnan(forward)] = 0
+    backward[np.isnan(backward)] = 0
+    return np.maximum(forward, backward).max(axis=0, initial=0)
+
+
+def _distance_rows(graph, landmarks, reverse):
+    rows = np.empty((len(landmarks), len(graph)), dtype=np.int32)
+    position = 0
+    for _, distances in hop_distances(graph, landmarks, reverse=reverse):
+        rows[position:position + len(distances)] = distances
+        position += len(distances)
+    return rows
+
+
+def _farthest_landmarks(graph, num_landmarks):
+    # Each new landmark is the member farthest from those already chosen,
+    # starting from the best-connected one; members no landmark reaches yet
+    # count as farthest. Slower to build than picking by degree (one BFS
+    # pass per landmark) but spreads the landmarks across the graph.
+    degrees = graph.in_degrees() + graph.out_degrees()
+    landmarks = [int(np.argmax(degrees))] if num_landmarks else []
+    rows = []
+    nearest = np.full(len(graph), np.iinfo(np.int32).max, dtype=np.int64)
+    while landmarks:
+        _, distances = next(hop_distances(graph, [landmarks[-1]]))
+        rows.append(distances[0])
+        reached = distances[0] >= 0
+        nearest[reached] = np.minimum(nearest[reached], distances[0][reached])
+        if len(landmarks) == num_landmarks:
+            break
+        candidates = nearest.copy()
+        candidates[landmarks] = -1
+        landmarks.append(int(np.argmax(candidates)))
+    return np.array(landmarks, dtype=np.int64), np.array(rows, dtype=np.int32).reshape(len(landmarks), len(graph))
+
+
+def _compact(distances, dtype):
+    compact = distances.astype(dtype)
+    compact[distances < 0] = np.iinfo(dtype).max
+    return compact
+
+
+def _as_int(value):
+    return int(value) if np.isfinite(value) else np.inf
+
+
+class _Side:
+    def __init__(self, neighbors, root, bound):
+        self.neighbors = neighbors
+        self.bound = bound
+        self.parents = {root: -1}
+        self.frontier = [root]
+        self.level = 0
+
+    def expand(self, other, upper):
+        # Returns the first node the other side has already reached, if any.
+        # Pruned nodes stay visited but are never expanded.
+        next_frontier = []
+        for node in self.frontier:
+            for neighbor in self.neighbors(node).tolist():
+                if neighbor in self.parents:
+                    continue
+                self.parents[neighbor] = node
+                if neighbor in other.parents:
+                    return neighbor
+                next_frontier.append(neighbor)
+        self.level += 1
+        if len(next_frontier) >= PRUNE_MIN_FRONTIER and upper != np.inf:
+            nodes = np.array(next_frontier, dtype=np.int64)
+            next_frontier = nodes[self.level + self.bound(nodes) <= upper].tolist()
+        self.frontier = next_frontier
+        return None
+
+    def trace(self, node):
+        path = []
+        while node != -1:
+            path.append(node)
+            node = self.parents[node]
+        return path
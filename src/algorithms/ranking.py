@@ -0,0 +1,109 @@
+# algorithms/ranking.py
+
+import numpy as np
+
+from data.graph import GraphListener
+from data.sparse import grow
+
+METRICS = ('engagement_rate', 'total_engagement')
+
+
+def top_k(values, keys, k):
+    # Positions of the k largest values, ties broken by the smaller key. A
+    # partition finds the k-th value first so only the entries at or above
+    # it are sorted: O(n + k log k).
+    if k <= 0 or not len(values):
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.arange(len(values))
+    if len(values) > k:
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        candidates = np.flatnonzero(values >= threshold)
+    order = np.lexsort((keys[candidates], -values[candidates]))[:k]
+    return candidates[order]
+
+
+class Rankings(GraphListener):
+    # Engagement rates and total engagement of every member, kept current
+    # as follows and interactions arrive, with the answers to recent top-k
+    # queries cached. An update only drops a cached answer if the member is
+    # in it or now scores at least as high as its last entry.
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._cache = {}
+        self.recompute()
+        graph.listeners.append(self)
+
+    def recompute(self):
+        graph = self.graph
+        self.followers = graph.in_degrees()
+        self.total_engagement = graph.total_engagements()
+        self.engagement_rate = np.zeros(len(graph))
+        has_followers = self.followers > 0
+        self.engagement_rate[has_followers] = self.total_engagement[has_followers] / self.followers[has_followers] * 100
+        self._cache = {}
+
+    def top(self, metric, k):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        cached = self._cache.get((metric, k))
+        if cached is None:
+            scores = getattr(self, metric)[:len(self.graph)]
+            nodes = top_k(scores, np.arange(len(scores)), k)
+            cached = self._cache[(metric, k)] = (nodes.tolist(), set(nodes.tolist()), scores[nodes].tolist())
+        ids = self.graph.ids
+        nodes, _, scores = cached
+        return [(ids[node], score) for node, score in zip(nodes, scores)]
+
+    def top_influenced(self, source, k):
+        # Members the source engages with most, as a share of all its
+        # engagement; only the source's own row is read.
+        graph = self.graph
+        entries = graph.likes.row(source)
+        for target, count in graph.comments.row(source).items():
+            entries[target] = entries.get(target, 0) + count
+        entries.pop(source, None)
+        total = graph.total_engagement(source)
+        if not total:
+            return []
+        targets = np.fromiter(entries, dtype=np.int64, count=len(entries))
+        values = np.fromiter(entries.values(), dtype=np.float64, count=len(entries)) / total * 100
+        chosen = top_k(values, targets, k)
+        ids = graph.ids
+        return [(ids[target], value) for target, value in zip(targets[chosen].tolist(), values[chosen].tolist())]
+
+    def on_member(self, node):
+        size = node + 1
+        self.followers = grow(self.followers, size)
+        self.total_engagement = grow(self.total_engagement, size)
+        self.engagement_rate = grow(self.engagement_rate, size)
+        # A new member scores 0 and can only displace others from short lists.
+        self._invalidate(node, 0)
+
+    def on_follow(self, source, target):
+        self._update(target)
+
+    def on_unfollow(self, source, target):
+        self._update(target)
+
+    def on_interaction(self, kind, source, target, count):
+        self._update(source)
+
+    def on_bulk(self):
+        self.recompute()
+
+    def _update(self, node):
+        graph = self.graph
+        followers = graph.in_degree(node)
+        total = graph.total_engagement(node)
+        self.followers[node] = followers
+        self.total_engagement[node] = total
+        self.engagement_rate[node] = total / followers * 100 if followers else 0.0
+        self._invalidate(node)
+
+    def _invalidate(self, node, score=None):
+        for key, (nodes, members, scores) in list(self._cache.items()):
+            metric, k = key
+            value = getattr(self, metric)[node] if score is None else score
+            if node in members or len(nodes) < k or value >= scores[-1]:
+                del self._cache[key]
@@ -0,0 +1,241 @@
+# algorithms/shortest_paths.py
+
+from collections import OrderedDict
+
+import numpy as np
+
+import instrumentation
+from algorithms.components import ReachabilityIndex
+from data.graph import GraphListener
+
+# Sources explored together by one bitset pass; one bit per source in a uint64.
+BITSET_WIDTH = 64
+# Memory ShortestPathIndex spends on cached trees (8 bytes per member each)
+# before dropping the least recently used one.
+TREE_CACHE_BYTES = 256 * 2 ** 20
+
+
+def gather_neighbors(indptr, indices, frontier):
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    return indices[offsets], np.repeat(frontier, counts)
+
+
+class BFSTree:
+    def __init__(self, graph, source, distances, predecessors):
+        self.graph = graph
+        self.source = source
+        self.distances = distances
+        self.predecessors = predecessors
+
+    def distance(self, target):
+        distance = int(self.distances[target])
+        return distance if distance >= 0 else None
+
+    def path(self, target):
+        if self.distances[target] < 0:
+            return []
+        path = [target]
+        while path[-1] != self.source:
+            path.append(int(self.predecessors[path[-1]]))
+        path.reverse()
+        return path
+
+    def path_ids(self, target):
+        members = self.graph.members
+        return [members[node].member_id for node in self.path(target)]
+
+
+def bfs_tree(graph, source, reverse=False):
+    indptr, indices = graph.in_csr() if reverse else graph.out_csr()
+    distances = np.full(len(graph), -1, dtype=np.int32)
+    predecessors = np.full(len(graph), -1, dtype=np.int32)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while len(frontier):
+        level += 1
+        neighbors, parents = gather_neighbors(indptr, indices, frontier)
+        fresh = distances[neighbors] == -1
+        neighbors, parents = neighbors[fresh], parents[fresh]
+        # Keep the frontier in discovery order so each node's predecessor is
+        # the first frontier member that reached it, as a FIFO queue would.
+        neighbors, first = np.unique(neighbors, return_index=True)
+        order = np.argsort(first, kind='stable')
+        neighbors = neighbors[order].astype(np.int64)
+        distances[neighbors] = level
+        predecessors[neighbors] = parents[first[order]]
+        frontier = neighbors
+    if instrumentation.ENABLED:
+        instrumentation.count('bfs.searches')
+        instrumentation.count('bfs.levels', level)
+        instrumentation.count('bfs.nodes_reached', int(np.count_nonzero(distances >= 0)))
+    return BFSTree(graph, source, distances, predecessors)
+
+
+def bidirectional_path(graph, source, target):
+    # Point-to-point search that grows the smaller frontier one level at a
+    # time, forward over follows and backward over followers. Only visited
+    # nodes are stored, so a lookup costs nothing proportional to the graph.
+    if source == target:
+        return [source]
+    forward = {source: -1}
+    backward = {target: -1}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _expand(graph.successors, forward_frontier, forward, backward)
+        else:
+            backward_frontier, meeting = _expand(graph.predecessors, backward_frontier, backward, forward)
+        if meeting is not None:
+            break
+    if instrumentation.ENABLED:
+        instrumentation.count('bidirectional.searches')
+        instrumentation.count('bidirectional.nodes_visited', len(forward) + len(backward))
+    return _join(forward, backward, meeting) if meeting is not None else []
+
+
+def _expand(neighbors, frontier, parents, other):
+    # The two visited sets were disjoint before this level, so every node
+    # they now share sits on the other side's newest level: the first one
+    # found already closes a shortest path.
+    next_frontier = []
+    for node in frontier:
+        for neighbor in neighbors(node).tolist():
+            if neighbor in parents:
+                continue
+            parents[neighbor] = node
+            if neighbor in other:
+                return next_frontier, neighbor
+            next_frontier.append(neighbor)
+    return next_frontier, None
+
+
+def _join(forward, backward, meeting):
+    path = []
+    node = meeting
+    while node != -1:
+        path.append(node)
+        node = forward[node]
+    path.reverse()
+    node = backward[meeting]
+    while node != -1:
+        path.append(node)
+        node = backward[node]
+    return path
+
+
+def hop_distances(graph, sources=None, batch_size=BITSET_WIDTH, reverse=False):
+    # Distances from each source, or to each source when reverse is set.
+    batch_size = max(1, min(batch_size, BITSET_WIDTH))
+    in_indptr, in_indices = graph.out_csr() if reverse else graph.in_csr()
+    num_nodes = len(graph)
+    has_in = in_indptr[1:] > in_indptr[:-1]
+    segment_starts = in_indptr[:-1][has_in]
+    if sources is None:
+        sources = np.arange(num_nodes)
+    sources = np.asarray(sources, dtype=np.int64)
+    for offset in range(0, len(sources), batch_size):
+        batch = sources[offset:offset + batch_size]
+        bits = np.left_shift(np.uint64(1), np.arange(len(batch), dtype=np.uint64))
+        visited = np.zeros(num_nodes, dtype=np.uint64)
+        np.bitwise_or.at(visited, batch, bits)
+        frontier = visited.copy()
+        distances = np.full((len(batch), num_nodes), -1, dtype=np.int32)
+        distances[np.arange(len(batch)), batch] = 0
+        level = 0
+        while frontier.any():
+            level += 1
+            reached = np.zeros(num_nodes, dtype=np.uint64)
+            if len(in_indices):
+                reached[has_in] = np.bitwise_or.reduceat(frontier[in_indices], segment_starts)
+            frontier = reached & ~visited
+            visited |= frontier
+            nodes = np.flatnonzero(frontier)
+            words = frontier[nodes]
+            for bit in range(len(batch)):
+                hit = nodes[(words & bits[bit]) != 0]
+                distances[bit, hit] = level
+        yield batch, distances
+
+
+class ShortestPathIndex(GraphListener):
+    # BFS trees cached per source and kept in step with the graph: a new
+    # follow or unfollow drops only the trees it can change, which are
+    # searched again on their next query. A fresh BFS runs over the sorted
+    # CSR, so a rebuilt tree is identical to one computed from scratch. At
+    # most max_trees trees are kept (by default what fits in
+    # TREE_CACHE_BYTES), dropping the least recently used.
+
+    def __init__(self, graph, max_trees=None):
+        self.graph = graph
+        self.max_trees = max_trees
+        self.trees = OrderedDict()
+        self.searches = 0
+        graph.listeners.append(self)
+
+    def capacity(self):
+        if self.max_trees is not None:
+            return self.max_trees
+        return max(1, TREE_CACHE_BYTES // (8 * max(len(self.graph), 1)))
+
+    def tree(self, source):
+        tree = self.trees.get(source)
+        if tree is None:
+            tree = self.trees[source] = bfs_tree(self.graph, source)
+            self.searches += 1
+            capacity = self.capacity()
+            while len(self.trees) > capacity:
+                self.trees.popitem(last=False)
+            return tree
+        self.trees.move_to_end(source)
+        if len(tree.distances) < len(self.graph):
+            # Members added since the search are unreachable until followed.
+            padding = np.full(len(self.graph) - len(tree.distances), -1, dtype=np.int32)
+            tree.distances = np.concatenate([tree.distances, padding])
+            tree.predecessors = np.concatenate([tree.predecessors, padding])
+        return tree
+
+    def distance(self, source, target):
+        return self.tree(source).distance(target)
+
+    def path(self, source, target):
+        return self.tree(source).path(target)
+
+    def on_follow(self, source, target):
+        # The tree changes only if the edge reaches the target no later than
+        # its current level; ties can reorder the level the target lands in.
+        for root, tree in list(self.trees.items()):
+            level = _level(tree, source)
+            if level < 0:
+                continue
+            target_level = _level(tree, target)
+            if target_level < 0 or target_level > level:
+                del self.trees[root]
+
+    def on_unfollow(self, source, target):
+        # Only an edge the tree actually uses can change it.
+        for root, tree in list(self.trees.items()):
+            if target < len(tree.predecessors) and tree.predecessors[target] == source and target != root:
+                del self.trees[root]
+
+    def on_bulk(self):
+        self.trees.clear()
+
+
+def _level(tree, node):
+    return int(tree.distances[node]) if node < len(tree.distances) else -1
+
+
+def shortest_path(graph, source, target):
+    # Served from an attached index when there is one; otherwise a one-off
+    # bidirectional search is cheaper than building a whole BFS tree.
+    reachability = graph.listener(ReachabilityIndex)
+    if reachability is not None and not reachability.reachable(source, target):
+        return []
+    index = graph.listener(ShortestPathIndex)
+    if index is not None:
+        return index.path(source, target)
+    return bidirectional_path(graph, source, target)
@@ -0,0 +1,211 @@
+# algorithms/statistics.py
+
+import numpy as np
+
+from algorithms.shortest_paths import gather_neighbors
+from data.graph import GraphListener, member_nodes, shared_graph
+from data.sparse import grow
+
+
+def engagement_columns(members):
+    graph = shared_graph(members)
+    nodes = member_nodes(members)
+    num_nodes = len(graph)
+    likes = graph.likes.row_sums(num_nodes)[nodes]
+    comments = graph.comments.row_sums(num_nodes)[nodes]
+    followers = graph.in_degrees()[nodes]
+    rates = np.zeros(len(nodes))
+    has_followers = followers > 0
+    rates[has_followers] = (likes[has_followers] + comments[has_followers]) / followers[has_followers] * 100
+    return likes, comments, followers, rates
+
+
+def linear_fit(x, y):
+    # Closed-form single-feature least squares, matching what
+    # LinearRegression().fit(x, y) and .score(x, y) report, including the
+    # degenerate cases of a constant feature or a constant target.
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dx = x - x.mean()
+    dy = y - y.mean()
+    sxx = dx @ dx
+    coefficient = (dx @ dy) / sxx if sxx > 0 else 0.0
+    residuals = dy - coefficient * dx
+    ss_res = residuals @ residuals
+    ss_tot = dy @ dy
+    if ss_tot == 0:
+        r_squared = 1.0 if ss_res == 0 else 0.0
+    else:
+        r_squared = 1 - ss_res / ss_tot
+    return coefficient, r_squared
+
+
+def overall_statistics(members):
+    likes, comments, followers, rates = engagement_columns(members)
+    total_members = len(members)
+    mean_engagement_rate = rates.mean() if total_members else 0
+    std_dev_engagement_rate = rates.std() if total_members else 0
+
+    if total_members > 1:
+        coefficient, r_squared = linear_fit(followers, rates)
+    else:
+        coefficient = None
+        r_squared = None
+
+    return {
+        "Total comments": int(comments.sum()),
+        "Total likes": int(likes.sum()),
+        "Total following": int(followers.sum()),
+        "Total members": total_members,
+        "Mean engagement rate": round(mean_engagement_rate, 2),
+        "Standard deviation of engagement rates": round(std_dev_engagement_rate, 2),
+        "Engagement rate vs Followers regression coefficient": round(coefficient, 2) if coefficient is not None else None,
+        "R-squared value": round(r_squared, 2) if r_squared is not None else None
+    }
+
+
+def ancestors(graph, nodes):
+    # Every node that can reach one of nodes, nodes included, by a
+    # breadth-first pass over the incoming edges.
+    indptr, indices = graph.in_csr()
+    seen = np.zeros(len(graph), dtype=bool)
+    frontier = np.fromiter(nodes, dtype=np.int64, count=len(nodes))
+    seen[frontier] = True
+    while len(frontier):
+        neighbors, _ = gather_neighbors(indptr, indices, frontier)
+        frontier = np.unique(neighbors[~seen[neighbors]]).astype(np.int64)
+        seen[frontier] = True
+    return np.flatnonzero(seen)
+
+
+class OnlineStatistics(GraphListener):
+    # Keeps the overall statistics of every member of a graph up to date as
+    # follows, likes and comments arrive: running totals, a Welford
+    # mean/variance of engagement rates and the regression sums, so reads
+    # are O(1). take_dirty() reports the members whose all-pairs rows may
+    # have changed since it was last called.
+
+    def __init__(self, graph):
+        self.graph = graph
+        # Members that followed, unfollowed, liked or commented since the
+        # last take_dirty(); all_dirty after a new member or a bulk change.
+        self.touched = set()
+        # Members gaining or losing a follower: only their own engagement
+        # rate changes, so only their own row is dirty.
+        self.followed = set()
+        self.all_dirty = False
+        self.recompute()
+        graph.listeners.append(self)
+
+    def recompute(self):
+        graph = self.graph
+        num_nodes = len(graph)
+        self.total_likes = int(graph.likes.row_sums(num_nodes).sum())
+        self.total_comments = int(graph.comments.row_sums(num_nodes).sum())
+        self.followers = graph.in_degrees().astype(np.float64)
+        totals = graph.total_engagements()
+        self.rates = np.zeros(num_nodes)
+        has_followers = self.followers > 0
+        self.rates[has_followers] = totals[has_followers] / self.followers[has_followers] * 100
+        self.count = num_nodes
+        self.mean = self.rates.mean() if num_nodes else 0.0
+        self.m2 = float(((self.rates - self.mean) ** 2).sum())
+        self.sum_x = float(self.followers.sum())
+        self.sum_xx = float(self.followers @ self.followers)
+        self.sum_xy = float(self.followers @ self.rates)
+        self.sum_y = float(self.rates.sum())
+
+    def take_dirty(self):
+        # A member's out-edges and engagement (a weight on highest engagement
+        # paths) lie on the paths of everyone who can reach it, so those
+        # rows are dirty as well as the member's own influence row. A follow
+        # or unfollow also dirties the target's row (its engagement rate). A
+        # new member adds a column to every row.
+        graph = self.graph
+        if self.all_dirty:
+            nodes = np.arange(len(graph))
+        else:
+            nodes = np.union1d(ancestors(graph, self.touched), np.fromiter(self.followed, dtype=np.int64))
+        self.touched = set()
+        self.followed = set()
+        self.all_dirty = False
+        ids = graph.ids
+        return [ids[node] for node in nodes.tolist()]
+
+    def on_member(self, node):
+        self.followers = grow(self.followers, node + 1)
+        self.rates = grow(self.rates, node + 1)
+        self.count += 1
+        delta = -self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * -self.mean
+        self.all_dirty = True
+
+    def on_follow(self, source, target):
+        self.touched.add(source)
+        self.followed.add(target)
+        self._update(target)
+
+    def on_unfollow(self, source, target):
+        self.touched.add(source)
+        self.followed.add(target)
+        self._update(target)
+
+    def on_interaction(self, kind, source, target, count):
+        if kind == 'likes':
+            self.total_likes += count
+        else:
+            self.total_comments += count
+        self.touched.add(source)
+        self._update(source)
+
+    def on_bulk(self):
+        self.recompute()
+        self.all_dirty = True
+
+    def _update(self, node):
+        old_x = self.followers[node]
+        old_y = self.rates[node]
+        new_x = float(self.graph.in_degree(node))
+        new_y = self.graph.total_engagement(node) / new_x * 100 if new_x else 0.0
+        self.followers[node] = new_x
+        self.rates[node] = new_y
+        self.sum_x += new_x - old_x
+        self.sum_xx += new_x * new_x - old_x * old_x
+        self.sum_xy += new_x * new_y - old_x * old_y
+        self.sum_y += new_y - old_y
+        # Welford update for replacing one observation with another.
+        old_mean = self.mean
+        self.mean += (new_y - old_y) / self.count
+        self.m2 += (new_y - old_y) * (new_y - self.mean + old_y - old_mean)
+
+    def regression(self):
+        count = self.count
+        sxx = self.sum_xx - self.sum_x * self.sum_x / count
+        sxy = self.sum_xy - self.sum_x * self.sum_y / count
+        # Cancellation in the running sums leaves tiny non-zero residues.
+        tolerance = 1e-9 * max(1.0, self.sum_xx)
+        coefficient = sxy / sxx if sxx > tolerance else 0.0
+        ss_tot = max(self.m2, 0.0)
+        ss_res = max(ss_tot - coefficient * sxy, 0.0)
+        if ss_tot <= 1e-9 * max(1.0, self.mean * self.mean * count):
+            return coefficient, 1.0 if ss_res <= 1e-9 * max(1.0, ss_tot) else 0.0
+        return coefficient, 1 - ss_res / ss_tot
+
+    def overall(self):
+        count = self.count
+        if count > 1:
+            coefficient, r_squared = self.regression()
+        else:
+            coefficient = None
+            r_squared = None
+        return {
+            "Total comments": self.total_comments,
+            "Total likes": self.total_likes,
+            "Total following": int(self.sum_x),
+            "Total members": count,
+            "Mean engagement rate": round(self.mean, 2) if count else 0,
+            "Standard deviation of engagement rates": round(np.sqrt(max(self.m2, 0.0) / count), 2) if count else 0,
+            "Engagement rate vs Followers regression coefficient": round(coefficient, 2) if coefficient is not None else None,
+            "R-squared value": round(r_squared, 2) if r_squared is not None else None
+        }
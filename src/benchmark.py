@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import instrumentation
+from algorithms.engagement_paths import DEFAULT_MAX_NODES, highest_engagement_path
+from algorithms.influence import calculate_influence, influence_matrix
+from data.generator import power_law_network
+from data.loader import load_network
+from main import Network, all_pairs_records, display_overall_statistics, stream_to_csv
+
+SCENARIOS = (
+    'ingest', 'engagement_rates', 'influence', 'shortest_path', 'highest_engagement_path', 'stats', 'csv_export',
+    'member_memory',
+)
+
+
+def peak_rss_bytes():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def summarize(seconds, operations, latencies=None):
+    result = {
+        'seconds': seconds,
+        'operations': operations,
+        'throughput': operations / seconds if seconds else None,
+    }
+    if latencies is not None and len(latencies):
+        result['p50_ms'] = float(np.percentile(latencies, 50) * 1000)
+        result['p99_ms'] = float(np.percentile(latencies, 99) * 1000)
+    return result
+
+
+def timed_calls(calls):
+    latencies = []
+    start_time = time.perf_counter()
+    for call in calls:
+        call_start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(time.perf_counter() - start_time, len(latencies), latencies)
+
+
+class Benchmark:
+    def __init__(self, num_members, seed=0, queries=200, export_members=50, max_path_nodes=DEFAULT_MAX_NODES):
+        self.num_members = num_members
+        self.seed = seed
+        self.queries = queries
+        self.export_members = export_members
+        self.max_path_nodes = max_path_nodes
+        self.rng = np.random.default_rng(seed)
+        self.network = None
+
+    def generate(self):
+        start_time = time.perf_counter()
+        self.synthetic = power_law_network(self.num_members, seed=self.seed)
+        return {
+            'seconds': time.perf_counter() - start_time,
+            'follows': len(self.synthetic.follows),
+            'likes': len(self.synthetic.likes),
+            'comments': len(self.synthetic.comments),
+        }
+
+    def sample_pairs(self):
+        members = list(self.network.members.values())
+        pairs = self.rng.integers(0, len(members), (self.queries, 2)).tolist()
+        return [(members[source], members[target]) for source, target in pairs]
+
+    def ingest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = self.synthetic.save(directory)
+            self.network = Network()
+            start_time = time.perf_counter()
+            stats = load_network(self.network, paths['follows'], paths['likes'], paths['comments'])
+            return summarize(time.perf_counter() - start_time, stats.rows)
+
+    def engagement_rates(self):
+        members = list(self.network.members.values())
+        sample = self.rng.choice(len(members), min(len(members), self.queries), replace=False).tolist()
+        result = timed_calls(members[position].engagement_rate for position in sample)
+        start_time = time.perf_counter()
+        for member in members:
+            member.engagement_rate()
+        result['all_members_seconds'] = time.perf_counter() - start_time
+        return result
+
+    def influence(self):
+        result = timed_calls(lambda pair=pair: calculate_influence(*pair) for pair in self.sample_pairs())
+        start_time = time.perf_counter()
+        matrix = influence_matrix(self.network.members)
+        result['matrix_seconds'] = time.perf_counter() - start_time
+        result['matrix_nnz'] = matrix.nnz
+        return result
+
+    def shortest_path(self):
+        members = self.network.members
+        return timed_calls(
+            lambda pair=pair: pair[0].shortest_path_to(pair[1], members) for pair in self.sample_pairs()
+        )
+
+    def highest_engagement_path(self):
+        # Exact search is exponential in the worst case; cap the work per
+        # query so large graphs finish, and report how often the cap hit.
+        graph = self.network.graph
+        exact = []
+
+        def query(source, target):
+            result = highest_engagement_path(graph, source._index, target._index, max_nodes=self.max_path_nodes)
+            exact.append(result.exact)
+
+        result = timed_calls(lambda pair=pair: query(*pair) for pair in self.sample_pairs())
+        result['exact_share'] = sum(exact) / len(exact) if exact else None
+        return result
+
+    def stats(self):
+        start_time = time.perf_counter()
+        display_overall_statistics(self.network.members)
+        return summarize(time.perf_counter() - start_time, len(self.network.members))
+
+    def csv_export(self):
+        # All-pairs output grows with the square of the members, so the
+        # export runs on its own smaller generated network, with the same
+        # cap on each highest engagement path search.
+        size = min(self.num_members, self.export_members)
+        network = power_law_network(size, seed=self.seed).build(Network())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'network_summary.csv')
+            start_time = time.perf_counter()
+            stream_to_csv(
+                display_overall_statistics(network.members),
+                all_pairs_records(network.members, max_nodes=self.max_path_nodes),
+                path,
+            )
+            result = summarize(time.perf_counter() - start_time, size)
+            result['bytes'] = os.path.getsize(path)
+        result['members'] = size
+        return result
+
+    def member_memory(self):
+        # Python heap bytes per member of a network without edges: member
+        # objects, names, the id index and the degree columns. Works under
+        # the memory capture too, which already has tracemalloc running.
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        network = Network()
+        for member_id in range(self.num_members):
+            network.add_member(member_id, f"Member{member_id}")
+        seconds = time.perf_counter() - start_time
+        allocated = tracemalloc.get_traced_memory()[0] - before
+        if started:
+            tracemalloc.stop()
+        result = summarize(seconds, len(network.members))
+        result['bytes_per_member'] = allocated / self.num_members
+        return result
+
+    def run(self, scenarios=SCENARIOS):
+        report = {
+            'members': self.num_members,
+            'seed': self.seed,
+            'queries': self.queries,
+            'commit': current_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'generate': self.generate(),
+            'scenarios': {},
+        }
+        # Every other scenario reads the ingested network.
+        for name in ('ingest',) + tuple(name for name in scenarios if name != 'ingest'):
+            rss_before = peak_rss_bytes()
+            with instrumentation.phase(name):
+                result = getattr(self, name)()
+            # Peak RSS is one high-water mark for the whole process, so a
+            # scenario only owns how far it raised it.
+            result['peak_rss_growth_bytes'] = peak_rss_bytes() - rss_before
+            report['scenarios'][name] = result
+        report['peak_rss_bytes'] = peak_rss_bytes()
+        if instrumentation.ENABLED:
+            report['instrumentation'] = instrumentation.report()
+        return report
+
+
+def current_commit():
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=os.path.dirname(__file__) or '.',
+        )
+    except OSError:
+        return None
+    return output.stdout.strip() or None
+
+
+def compare(report, baseline):
+    lines = []
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or not before.get('throughput') or not result.get('throughput'):
+            continue
+        change = result['throughput'] / before['throughput']
+        lines.append(f"{name:<26} {before['throughput']:>14,.1f} -> {result['throughput']:>14,.1f} ops/s  x{change:.2f}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the social network analysis on a synthetic power-law network.")
+    parser.add_argument('--members', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--queries', type=int, default=200, help="sampled queries per latency scenario")
+    parser.add_argument('--export-members', type=int, default=50, help="network size for the CSV export scenario")
+    parser.add_argument('--max-path-nodes', type=int, default=DEFAULT_MAX_NODES, help="work cap per highest engagement path search")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--baseline', help="earlier JSON report to compare throughput against")
+    parser.add_argument('--instrument', action='store_true', help="add search counters and per-scenario timings")
+    parser.add_argument('--profile', action='append', choices=instrumentation.CAPTURE_MODES, default=[],
+                        help="also capture a cProfile (cpu) or tracemalloc (memory) summary per scenario")
+    args = parser.parse_args(argv)
+    if args.instrument or args.profile:
+        instrumentation.reset()
+        instrumentation.enable(args.profile)
+
+    benchmark = Benchmark(args.members, args.seed, args.queries, args.export_members, args.max_path_nodes)
+    report = benchmark.run(args.scenarios)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text)
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as file:
+            for line in compare(report, json.load(file)):
+                print(line, file=sys.stderr)
+    if instrumentation.ENABLED:
+        instrumentation.disable()
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import instrumentation
+
+# numpy and the analysis modules are imported inside the commands, so
+# parsing the arguments stays cheap and each command loads only what it
+# uses. Running without a command keeps the original behaviour: a random
+# network of nine members exported to network_summary.csv.
+DEFAULT_COMMAND = 'export'
+# Options taken before the command, and whether each is followed by a value.
+GLOBAL_OPTIONS = {'--instrument': False, '--profile': True, '--report': True, '-h': False, '--help': False}
+
+
+def open_network(args):
+    from main import Network, random_network
+    with instrumentation.phase('build network'):
+        if args.input and not os.path.isdir(args.input):
+            return Network.load_snapshot(args.input, verify=args.verify)
+        network = Network()
+        if args.input:
+            from data.loader import load_saved_network
+            load_saved_network(network, args.input)
+        else:
+            random_network(network, args.members, args.seed)
+    return network
+
+
+def write_network(network, args):
+    with instrumentation.phase('save'):
+        if args.snapshot:
+            network.save_snapshot(args.output)
+        else:
+            from data.loader import save_network
+            save_network(network, args.output)
+
+
+def print_json(value):
+    print(json.dumps(value, indent=2))
+
+
+def generate(args):
+    from data.generator import power_law_network
+    with instrumentation.phase('generate'):
+        synthetic = power_law_network(args.members, seed=args.seed)
+    if args.snapshot:
+        from main import Network
+        write_network(synthetic.build(Network()), args)
+    else:
+        synthetic.save(args.output)
+    print(f"Generated {args.members} members, {len(synthetic.follows)} follows, {len(synthetic.likes)} likes and "
+          f"{len(synthetic.comments)} comments in {args.output}")
+
+
+def load(args):
+    from data.loader import load_network
+    from main import Network
+    network = Network()
+    with instrumentation.phase('load'):
+        stats = load_network(network, args.follows, args.likes, args.comments)
+    write_network(network, args)
+    print(stats)
+
+
+def analyze(args):
+    from main import display_overall_statistics
+    network = open_network(args)
+    with instrumentation.phase('overall statistics'):
+        overall = display_overall_statistics(network.members)
+    with instrumentation.phase('rankings'):
+        result = {
+            'overall_statistics': overall,
+            'top_by_engagement_rate': network.top_by_engagement_rate(args.top),
+            'top_by_total_engagement': network.top_by_total_engagement(args.top),
+        }
+    with instrumentation.phase('influence rank'):
+        result['top_by_influence'] = network.top_by_influence(args.top)
+    if args.format == 'json':
+        print_json(result)
+        return
+    print_statistics(overall)
+    for title, key, unit in (
+        ("Engagement rate", 'top_by_engagement_rate', '%'),
+        ("Total engagement", 'top_by_total_engagement', ''),
+        ("Influence rank", 'top_by_influence', ''),
+    ):
+        print(f"\n{title}")
+        for member_id, score in result[key]:
+            print(f"  Member {member_id}: {score:.4g}{unit}")
+
+
+def print_statistics(overall):
+    print("Overall Statistics")
+    for key, value in overall.items():
+        print(f"  {key}: {value}")
+
+
+def stats(args):
+    from main import display_overall_statistics
+    network = open_network(args)
+    with instrumentation.phase('overall statistics'):
+        overall = display_overall_statistics(network.members)
+    if args.format == 'json':
+        print_json(overall)
+    else:
+        print_statistics(overall)
+
+
+def max_path_nodes(args):
+    # Unset keeps the engine's default work cap; 0 searches exhaustively.
+    from algorithms.engagement_paths import DEFAULT_MAX_NODES
+    if args.max_path_nodes is None:
+        return DEFAULT_MAX_NODES
+    return args.max_path_nodes or None
+
+
+def path(args):
+    from algorithms.shortest_paths import shortest_path
+    network = open_network(args)
+    for member_id in (args.source, args.target):
+        if member_id not in network.members:
+            raise SystemExit(f"Unknown member: {member_id}")
+    graph = network.graph
+    with instrumentation.phase('shortest path'):
+        nodes = shortest_path(graph, graph.index[args.source], graph.index[args.target])
+    result = {'shortest_path': [graph.ids[node] for node in nodes]}
+    if args.engagement:
+        from algorithms.engagement_paths import highest_engagement_path
+        with instrumentation.phase('highest engagement path'):
+            engagement_path = highest_engagement_path(
+                graph, graph.index[args.source], graph.index[args.target], max_nodes=max_path_nodes(args)
+            )
+        result['highest_engagement_path'] = engagement_path.path_ids()
+        result['engagement'] = engagement_path.engagement
+        result['exact'] = engagement_path.exact
+    if args.format == 'json':
+        print_json(result)
+        return
+    shortest = result['shortest_path']
+    print(f"Shortest path: {' -> '.join(map(str, shortest)) if shortest else 'no path'}")
+    if args.engagement:
+        engagement = result['highest_engagement_path']
+        note = "" if result['exact'] else " (search capped; raise --max-path-nodes, or 0 for no cap)"
+        if engagement:
+            print(f"Highest engagement path: {' -> '.join(map(str, engagement))}, engagement {result['engagement']}{note}")
+        else:
+            print(f"Highest engagement path: no path{note}")
+
+
+def export(args):
+    from main import all_pairs_records, display_overall_statistics, stream_to_csv, stream_to_jsonl
+    if args.trace and args.workers != 1:
+        raise SystemExit("--trace runs the original searches in a single process; leave out --workers")
+    start_time = time.time()
+    network = open_network(args)
+    members = network.members
+    with instrumentation.phase('overall statistics'):
+        overall_stats = display_overall_statistics(members)
+    output = args.output or ('network_summary' if args.format == 'npy' else f"network_summary.{args.format}")
+    with instrumentation.phase('all pairs export'):
+        records = all_pairs_records(members, trace=args.trace, workers=args.workers, max_nodes=max_path_nodes(args))
+        if args.format == 'jsonl':
+            stream_to_jsonl(overall_stats, records, output)
+        elif args.format in ('npz', 'npy'):
+            from data.results import save_results
+            if (args.format == 'npz') != output.endswith('.npz'):
+                raise SystemExit("--format npz writes to a .npz file and --format npy to a directory")
+            save_results(output, overall_stats, records, members)
+        else:
+            stream_to_csv(overall_stats, records, output, include_traces=False if args.no_traces else None)
+
+    end_time = time.time()
+    total_execution_time = end_time - start_time
+    minutes, seconds = divmod(total_execution_time, 60)
+    print(f"\nTotal execution time: {int(minutes)} minutes {seconds:.4f} seconds")
+
+
+def compact(args):
+    from main import Network
+    with instrumentation.phase('replay'):
+        network = Network.restore(args.snapshot, args.log)
+    with instrumentation.phase('save'):
+        network.save_snapshot(args.snapshot)
+    network.event_log.close()
+    print(network.event_log.replayed)
+    print(f"Compacted {args.log} into {args.snapshot}")
+
+
+HANDLERS = {
+    'generate': generate, 'load': load, 'analyze': analyze, 'stats': stats, 'path': path, 'export': export,
+    'compact': compact,
+}
+
+
+def with_default_command(argv):
+    # Without a command, DEFAULT_COMMAND goes in front of the first argument
+    # that is not a top-level option, so `--members 5` is read as one of its
+    # options and `--output stats` as an output file, not a command.
+    position = 0
+    while position < len(argv):
+        option, has_value = argv[position].split('=', 1)[0], '=' in argv[position]
+        if option not in GLOBAL_OPTIONS:
+            break
+        if option in ('-h', '--help'):
+            return argv
+        position += 2 if GLOBAL_OPTIONS[option] and not has_value else 1
+    if position < len(argv) and argv[position] in HANDLERS:
+        return argv
+    return argv[:position] + [DEFAULT_COMMAND] + argv[position:]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Analyze the influence and engagement of a social network.")
+    parser.add_argument('--instrument', action='store_true', help="print search counters and per-phase timings")
+    parser.add_argument('--profile', action='append', choices=instrumentation.CAPTURE_MODES, default=[],
+                        help="also capture a cProfile (cpu) or tracemalloc (memory) summary per phase; repeatable")
+    parser.add_argument('--report', help="write the instrumentation report to this JSON file")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    network = argparse.ArgumentParser(add_help=False)
+    network.add_argument('--input', help="saved network directory or snapshot file (from generate or load); "
+                                         "without it a random network is built")
+    network.add_argument('--verify', action='store_true', help="check every checksum of a snapshot input")
+    network.add_argument('--members', type=int, default=9, help="size of the random network")
+    network.add_argument('--seed', type=int, help="seed for the random network")
+
+    generate_parser = commands.add_parser('generate', help="write a synthetic power-law network")
+    generate_parser.add_argument('--members', type=int, default=10_000)
+    generate_parser.add_argument('--seed', type=int, default=0)
+    generate_parser.add_argument('--output', required=True, help="directory to write the network to")
+    generate_parser.add_argument('--snapshot', action='store_true', help="write a binary snapshot file instead")
+
+    load_parser = commands.add_parser('load', help="read CSV/TSV/.npy edge lists into a saved network")
+    load_parser.add_argument('follows', help="(follower_id, followee_id) rows")
+    load_parser.add_argument('--likes', help="(source_id, target_id, count) rows")
+    load_parser.add_argument('--comments', help="(source_id, target_id, count) rows")
+    load_parser.add_argument('--output', required=True, help="directory to write the network to")
+    load_parser.add_argument('--snapshot', action='store_true', help="write a binary snapshot file instead")
+
+    analyze_parser = commands.add_parser('analyze', parents=[network], help="statistics and top members")
+    analyze_parser.add_argument('--top', type=int, default=10)
+    analyze_parser.add_argument('--format', choices=('text', 'json'), default='text')
+
+    stats_parser = commands.add_parser('stats', parents=[network], help="overall statistics")
+    stats_parser.add_argument('--format', choices=('text', 'json'), default='text')
+
+    path_parser = commands.add_parser('path', parents=[network], help="paths between two members")
+    path_parser.add_argument('source', type=int)
+    path_parser.add_argument('target', type=int)
+    path_parser.add_argument('--engagement', action='store_true', help="also find the highest engagement path")
+    path_parser.add_argument('--max-path-nodes', type=int,
+                             help="work cap for the highest engagement path search (default 2000; 0 for none)")
+    path_parser.add_argument('--format', choices=('text', 'json'), default='text')
+
+    export_parser = commands.add_parser('export', parents=[network], help="write the all-pairs summary")
+    export_parser.add_argument('--output', help="defaults to network_summary.<format>; a directory for npy")
+    export_parser.add_argument('--format', choices=('csv', 'jsonl', 'npz', 'npy'), default='csv',
+                               help="npz and npy write columnar results (one archive, or a directory of .npy "
+                                    "columns) for data.results.ResultsReader")
+    export_parser.add_argument('--workers', type=int, default=1,
+                               help="processes for the all-pairs analysis (not with --trace)")
+    export_parser.add_argument('--max-path-nodes', type=int,
+                               help="work cap per highest engagement path search (default 2000; 0 for none); "
+                                    "capped paths are marked best found")
+    export_parser.add_argument('--trace', action='store_true',
+                               help="run the original BFS/DFS searches and record their traces "
+                                    "(slow; single process, so not with --workers)")
+    export_parser.add_argument('--no-traces', action='store_true', help="leave the BFS/DFS Matrix rows out of the CSV")
+
+    compact_parser = commands.add_parser('compact', help="fold an event log into its snapshot")
+    compact_parser.add_argument('snapshot', help="snapshot file; created if it does not exist yet")
+    compact_parser.add_argument('log', help="event log written by Network.log_events")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args = parser.parse_args(with_default_command(argv))
+    if args.instrument or args.profile or args.report:
+        instrumentation.reset()
+        instrumentation.enable(args.profile)
+
+    HANDLERS[args.command](args)
+
+    if instrumentation.ENABLED:
+        print(instrumentation.format_report(), file=sys.stderr)
+        if args.report:
+            with open(args.report, 'w') as file:
+                json.dump(instrumentation.report(), file, indent=2)
+        instrumentation.disable()
+
+if __name__ == '__main__':
+    main()
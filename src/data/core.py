@@ -0,0 +1,207 @@
+# data/core.py
+
+import os
+
+import numpy as np
+
+from algorithms.components import ReachabilityIndex
+from algorithms.pagerank import InfluenceRank
+from algorithms.ranking import Rankings, top_k
+from algorithms.shortest_paths import ShortestPathIndex, shortest_path
+from algorithms.statistics import OnlineStatistics
+from data.event_log import EventLog, restore_log
+from data.graph import EngagementRow, Graph, MemberDirectory, NeighborSet, connect, join
+from data.snapshot import Snapshot, load_snapshot, save_snapshot
+
+# The one Member and Network implementation behind both facades (main and
+# data.member/data.network). All state lives in the shared Graph and every
+# query goes through its arrays and the algorithms modules, so a faster
+# core speeds up both. The facades subclass these and keep only what
+# differs: main's traced path searches, data's rounded engagement rate.
+
+class Member:
+    # Follows and engagement live in the graph's arrays, so a member is only
+    # its id, name and position there; slots keep it free of a __dict__.
+    __slots__ = ('member_id', 'name', '_graph', '_index')
+
+    def __init__(self, member_id, name, graph=None):
+        self.member_id = member_id
+        self.name = name
+        (graph if graph is not None else Graph()).add_node(self)
+
+    @property
+    def followers(self):
+        return NeighborSet(self, incoming=True)
+
+    @property
+    def following(self):
+        return NeighborSet(self, incoming=False)
+
+    @property
+    def likes(self):
+        return EngagementRow(self, 'likes')
+
+    @property
+    def comments(self):
+        return EngagementRow(self, 'comments')
+
+    def follow(self, other):
+        connect(self, other)
+
+    def unfollow(self, other):
+        if other._graph is self._graph:
+            self._graph.remove_edge(self._index, other._index)
+
+    def like(self, other, count=1):
+        join(self, other).add_interaction('likes', self._index, other._index, count)
+
+    def comment(self, other, count=1):
+        join(self, other).add_interaction('comments', self._index, other._index, count)
+
+    def total_engagement(self):
+        return self._graph.total_engagement(self._index)
+
+    def engagement_rate(self):
+        followers_count = len(self.followers)
+        if followers_count == 0:
+            return 0.0
+        return self.total_engagement() / followers_count * 100
+
+    def influence_on(self, other):
+        total_engagement = self.total_engagement()
+        if total_engagement == 0 or other._graph is not self._graph:
+            return 0.0
+        return self._graph.engagement_between(self._index, other._index) / total_engagement * 100
+
+
+class Network:
+    member_class = Member
+
+    def __init__(self):
+        self.graph = Graph()
+        # A view over the graph's members rather than a second dict of them.
+        self.members = MemberDirectory(self.graph)
+        self.statistics = None
+        self.path_index = None
+        self.reachability = None
+        self.rankings = None
+        self.influence_rank = None
+        self.event_log = None
+
+    def add_member(self, member_id, name):
+        self.members[member_id] = self.member_class(member_id, name, self.graph)
+
+    def follow(self, follower_id, followee_id):
+        self.members[follower_id].follow(self.members[followee_id])
+
+    def unfollow(self, follower_id, followee_id):
+        self.members[follower_id].unfollow(self.members[followee_id])
+
+    def add_follows(self, follower_ids, followee_ids):
+        index = self.graph.index
+        sources = np.fromiter((index[member_id] for member_id in follower_ids), dtype=np.int64)
+        targets = np.fromiter((index[member_id] for member_id in followee_ids), dtype=np.int64)
+        self.graph.add_edges(sources, targets)
+
+    def track_statistics(self):
+        if self.statistics is None:
+            self.statistics = OnlineStatistics(self.graph)
+        return self.statistics
+
+    def index_shortest_paths(self):
+        if self.path_index is None:
+            self.path_index = ShortestPathIndex(self.graph)
+        return self.path_index
+
+    def track_rankings(self):
+        if self.rankings is None:
+            self.rankings = Rankings(self.graph)
+        return self.rankings
+
+    def top_by_engagement_rate(self, k):
+        return self.track_rankings().top('engagement_rate', k)
+
+    def top_by_total_engagement(self, k):
+        return self.track_rankings().top('total_engagement', k)
+
+    def top_influenced_by(self, member_id, k):
+        return self.track_rankings().top_influenced(self.graph.index[member_id], k)
+
+    def track_influence_rank(self, **options):
+        if self.influence_rank is None:
+            self.influence_rank = InfluenceRank(self.graph, **options)
+        return self.influence_rank
+
+    def top_by_influence(self, k):
+        scores = self.track_influence_rank().scores()
+        nodes = top_k(scores, np.arange(len(scores)), k).tolist()
+        return [(self.graph.ids[node], float(scores[node])) for node in nodes]
+
+    def index_reachability(self):
+        if self.reachability is None:
+            self.reachability = ReachabilityIndex(self.graph)
+        return self.reachability
+
+    def can_reach(self, source_id, target_id):
+        index = self.index_reachability()
+        return index.reachable(self.graph.index[source_id], self.graph.index[target_id])
+
+    def shortest_path(self, source_id, target_id):
+        # Uses the index from index_shortest_paths() if one was attached;
+        # otherwise a bidirectional search that caches nothing.
+        path = shortest_path(self.graph, self.graph.index[source_id], self.graph.index[target_id])
+        return [self.graph.ids[node] for node in path]
+
+    def save_snapshot(self, path):
+        if self.event_log is None:
+            return save_snapshot(self.graph, path)
+        # Compaction: the snapshot now holds everything the log recorded, so
+        # the log starts over under the next generation.
+        log = self.event_log
+        log.flush()
+        save_snapshot(self.graph, path, {'log_generation': log.generation + 1})
+        log.reset(log.generation + 1)
+        return path
+
+    @classmethod
+    def load_snapshot(cls, path, verify=False):
+        # The graph arrays stay memory-mapped from the file; verify checks
+        # every section's checksum, which reads the whole file.
+        network = cls()
+        network.graph = load_snapshot(path, cls.member_class, verify)
+        network.members = MemberDirectory(network.graph)
+        return network
+
+    def log_events(self, path, **options):
+        # Writes every later change through to a new append-only event log;
+        # Network.restore continues an existing one. Members and follows
+        # from before the log started are not in it until a snapshot is saved.
+        if os.path.exists(path) and os.path.getsize(path):
+            raise ValueError(f"{path} already exists; use Network.restore to continue it")
+        self.event_log = EventLog(path, **options).attach(self.graph)
+        self.event_log.unlogged = len(self.graph) > 0
+        return self.event_log
+
+    @classmethod
+    def restore(cls, snapshot_path, log_path, **options):
+        # Restart: the latest snapshot (if one was written yet), then the
+        # committed tail of the log, which keeps recording afterwards.
+        network = cls()
+        generation = 0
+        if os.path.exists(snapshot_path):
+            snapshot = Snapshot(snapshot_path)
+            network.graph = snapshot.graph(cls.member_class)
+            generation = snapshot.metadata.get('log_generation', 0)
+        network.members = MemberDirectory(network.graph)
+        network.event_log = restore_log(network.graph, log_path, cls.member_class, generation, **options)
+        return network
+
+    def like(self, liker_id, likee_id, count=1):
+        self.members[liker_id].like(self.members[likee_id], count)
+
+    def comment(self, commenter_id, commentee_id, count=1):
+        self.members[commenter_id].comment(self.members[commentee_id], count)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
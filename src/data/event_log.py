@@ -0,0 +1,244 @@
+# data/event_log.py
+
+import os
+import struct
+import time
+import warnings
+import zlib
+
+import numpy as np
+
+from data.graph import GraphListener
+from data.loader import LoadStats
+
+# An append-only log of graph changes in fixed-width records. Records are
+# buffered and written in batches; each batch ends with a COMMIT record
+# holding the batch's record count and CRC32 and is fsynced once, so a
+# crash loses at most the batch that was still buffered, and replay only
+# applies batches whose commit checks out. The header carries a
+# generation number that ties the log to the snapshot it continues.
+MAGIC = b'SNETLOG\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sII')
+RECORD = np.dtype([('kind', '<u4'), ('count', '<i4'), ('source', '<i8'), ('target', '<i8')])
+PACK_RECORD = struct.Struct('<Iiqq')
+BATCH_RECORDS = 4096
+
+FOLLOW, UNFOLLOW, LIKE, COMMENT, MEMBER, NAME, COMMIT = range(1, 8)
+INTERACTION_KINDS = {'likes': LIKE, 'comments': COMMENT}
+# A MEMBER record keeps the name's byte length in count; the UTF-8 bytes
+# follow in NAME records, in everything after their kind field.
+NAME_BYTES = RECORD.itemsize - 4
+PACK_NAME = struct.Struct(f'<I{NAME_BYTES}s')
+MAX_COUNT = 2 ** 31 - 1
+
+
+class EventLog(GraphListener):
+    # Attached to a graph as a listener, it records every follow, unfollow,
+    # like, comment and new member. Bulk changes (add_edges, the loader,
+    # merging graphs) report no detail, so they only set unlogged; save a
+    # snapshot after them to make them durable, or close() warns.
+
+    def __init__(self, path, generation=0, batch_size=BATCH_RECORDS, sync=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.sync = sync
+        self.graph = None
+        self.unlogged = False
+        self._pending = bytearray()
+        self._pending_records = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            contents = read_log(path)
+            if contents.generation != generation:
+                raise ValueError(f"{path} is generation {contents.generation}, expected {generation}")
+            self.file = open(path, 'r+b')
+            # Drops a torn batch left by a crash before appending after it.
+            self.file.truncate(contents.end)
+            self.file.seek(contents.end)
+            self.generation = generation
+        else:
+            self.file = open(path, 'w+b')
+            self.reset(generation)
+
+    def attach(self, graph):
+        self.graph = graph
+        graph.listeners.append(self)
+        return self
+
+    def close(self):
+        self.flush()
+        if self.unlogged:
+            warnings.warn(f"{self.path} is missing changes made before it started or in bulk; "
+                          "save a snapshot to keep them", RuntimeWarning, stacklevel=2)
+        if self.graph is not None:
+            self.graph.listeners.remove(self)
+            self.graph = None
+        self.file.close()
+
+    def reset(self, generation):
+        # Starts the log over, for example once a snapshot holds its events.
+        self._pending = bytearray()
+        self._pending_records = 0
+        self.generation = generation
+        self.unlogged = False
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, generation))
+        self.file.truncate(HEADER.size)
+        self._sync()
+
+    def append(self, kind, source_id, target_id, count=0):
+        self._pending += PACK_RECORD.pack(kind, count, source_id, target_id)
+        self._pending_records += 1
+        if self._pending_records >= self.batch_size:
+            self.flush()
+
+    def append_member(self, member_id, name):
+        if not isinstance(member_id, (int, np.integer)):
+            raise ValueError("Event logs need integer member ids")
+        encoded = name.encode('utf-8')
+        self._pending += PACK_RECORD.pack(MEMBER, len(encoded), member_id, 0)
+        for start in range(0, len(encoded), NAME_BYTES):
+            self._pending += PACK_NAME.pack(NAME, encoded[start:start + NAME_BYTES])
+        self._pending_records += 1 + -(-len(encoded) // NAME_BYTES)
+        if self._pending_records >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_records:
+            return
+        commit = PACK_RECORD.pack(COMMIT, self._pending_records, zlib.crc32(self._pending), 0)
+        self.file.write(self._pending + commit)
+        self._pending = bytearray()
+        self._pending_records = 0
+        self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    def on_member(self, node):
+        self.append_member(self.graph.ids[node], self.graph.members[node].name)
+
+    def on_follow(self, source, target):
+        self.append(FOLLOW, self.graph.ids[source], self.graph.ids[target])
+
+    def on_unfollow(self, source, target):
+        self.append(UNFOLLOW, self.graph.ids[source], self.graph.ids[target])
+
+    def on_interaction(self, kind, source, target, count):
+        # Counts beyond a record's int32 field are split over several records.
+        source_id, target_id = self.graph.ids[source], self.graph.ids[target]
+        while count:
+            step = max(-MAX_COUNT, min(MAX_COUNT, count))
+            self.append(INTERACTION_KINDS[kind], source_id, target_id, step)
+            count -= step
+
+    def on_bulk(self):
+        self.unlogged = True
+
+
+class LogContents:
+    def __init__(self, generation, records, end, torn):
+        self.generation = generation
+        self.records = records
+        self.end = end
+        self.torn = torn
+
+
+def read_log(path):
+    # Reads the committed records in one pass; the CRC of each batch is
+    # checked, and anything after the first bad or unfinished batch is
+    # reported as torn and left out.
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not an event log")
+    magic, version, generation = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an event log")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"{path} uses event log format {version}; this version reads up to {FORMAT_VERSION}")
+    size = os.path.getsize(path)
+    records = np.fromfile(path, dtype=RECORD, count=(size - HEADER.size) // RECORD.itemsize, offset=HEADER.size)
+    committed = 0
+    for commit in np.flatnonzero(records['kind'] == COMMIT).tolist():
+        batch = records[committed:commit]
+        if records['count'][commit] != len(batch) or zlib.crc32(batch) != records['source'][commit]:
+            break
+        committed = commit + 1
+    end = HEADER.size + committed * RECORD.itemsize
+    records = records[:committed]
+    return LogContents(generation, records[records['kind'] != COMMIT], end, end != size)
+
+
+def apply_events(graph, records, member_class):
+    # Replays records in bulk: members first (an event can only name members
+    # added before it), then the last follow or unfollow of each pair, then
+    # every like and comment, which simply add up.
+    stats = LoadStats()
+    start_time = time.perf_counter()
+    kinds = records['kind']
+    members = np.flatnonzero(kinds == MEMBER).tolist()
+    if members:
+        payload = records.view(np.uint8).reshape(len(records), RECORD.itemsize)[:, 4:]
+        lengths = records['count'].tolist()
+        member_ids = records['source'].tolist()
+        for position in members:
+            length = lengths[position]
+            chunks = -(-length // NAME_BYTES)
+            name = payload[position + 1:position + 1 + chunks].tobytes()[:length].decode('utf-8')
+            if member_ids[position] not in graph.index:
+                member_class(member_ids[position], name, graph)
+                stats.new_members += 1
+
+    ids = np.array(graph.ids, dtype=np.int64)
+    order = np.argsort(ids, kind='stable')
+
+    def nodes(member_ids):
+        positions = np.minimum(np.searchsorted(ids[order], member_ids), max(len(ids) - 1, 0))
+        if len(member_ids) and (not len(ids) or (ids[order][positions] != member_ids).any()):
+            raise ValueError("The event log names a member that was never added")
+        return order[positions]
+
+    edges = np.flatnonzero((kinds == FOLLOW) | (kinds == UNFOLLOW))
+    if len(edges):
+        sources = nodes(records['source'][edges])
+        targets = nodes(records['target'][edges])
+        keys = sources * len(ids) + targets
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        follows = kinds[edges][last] == FOLLOW
+        sources, targets = sources[last], targets[last]
+        if (~follows).any():
+            graph.remove_edges(sources[~follows], targets[~follows])
+        if follows.any():
+            graph.add_edges(sources[follows], targets[follows])
+    for kind, code in INTERACTION_KINDS.items():
+        rows = np.flatnonzero(kinds == code)
+        if len(rows):
+            graph.add_interactions(
+                kind, nodes(records['source'][rows]), nodes(records['target'][rows]), records['count'][rows]
+            )
+    stats.rows = int(np.count_nonzero(kinds != NAME))
+    stats.seconds = time.perf_counter() - start_time
+    return stats
+
+
+def restore_log(graph, path, member_class, generation, **options):
+    # Replays the log at path onto a graph loaded from the snapshot of the
+    # given generation, then keeps logging to it. A log from an earlier
+    # generation was already folded into the snapshot (the process stopped
+    # between writing the snapshot and resetting the log) and is dropped.
+    stats = LoadStats()
+    if os.path.exists(path) and os.path.getsize(path):
+        contents = read_log(path)
+        if contents.generation > generation:
+            raise ValueError(f"{path} continues a newer snapshot (generation {contents.generation})")
+        if contents.generation == generation:
+            stats = apply_events(graph, contents.records, member_class)
+        else:
+            os.remove(path)
+    log = EventLog(path, generation, **options).attach(graph)
+    log.replayed = stats
+    return log
@@ -0,0 +1,103 @@
+# data/generator.py
+
+import os
+
+import numpy as np
+
+from data.loader import network_paths
+
+FIRST_BLOCK = 64
+
+
+class SyntheticNetwork:
+    # Member ids are 1..num_members; every pair array holds member ids.
+    def __init__(self, num_members, follows, likes, comments):
+        self.num_members = num_members
+        self.follows = follows
+        self.likes = likes
+        self.comments = comments
+
+    @property
+    def member_ids(self):
+        return np.arange(1, self.num_members + 1, dtype=np.int64)
+
+    def save(self, directory):
+        # Writes the saved network layout data.loader.load_saved_network reads.
+        os.makedirs(directory, exist_ok=True)
+        paths = network_paths(directory)
+        np.save(paths['members'], self.member_ids)
+        for name in ('follows', 'likes', 'comments'):
+            np.save(paths[name], getattr(self, name))
+        return paths
+
+    def build(self, network):
+        # Fills an empty Network (either facade) through its bulk paths.
+        for member_id in self.member_ids.tolist():
+            network.add_member(member_id, f"Member{member_id}")
+        graph = network.graph
+        nodes = self.follows - 1
+        graph.add_edges(nodes[:, 0], nodes[:, 1])
+        for kind in ('likes', 'comments'):
+            rows = getattr(self, kind)
+            graph.add_interactions(kind, rows[:, 0] - 1, rows[:, 1] - 1, rows[:, 2])
+        return network
+
+
+def power_law_network(num_members, seed=0, mean_following=10, uniform_share=0.2, follow_back=0.2, engaged_share=0.5,
+                      mean_likes=3.0, comment_share=0.3, mean_comments=1.5):
+    # Preferential attachment by copying: members join in order and each
+    # follow either picks an earlier member uniformly (uniform_share of the
+    # time) or copies the followee of a random earlier follow, which picks
+    # members in proportion to their followers and gives power-law follower
+    # counts. Members join in blocks that double in size, and a block only
+    # copies follows made before it, so each block is one vectorised step.
+    # A follow_back share of the follows is returned, which closes cycles.
+    #
+    # Members like some of the members they follow (engaged_share of the
+    # follows) with a per-member activity level drawn from a log-normal,
+    # so a few members produce most of the engagement; a share of those
+    # pairs also carries comments.
+    rng = np.random.default_rng(seed)
+    following = np.minimum(rng.poisson(mean_following, num_members), np.arange(num_members))
+    sources = np.repeat(np.arange(num_members, dtype=np.int64), following)
+    targets = np.empty(len(sources), dtype=np.int64)
+    edge_starts = np.zeros(num_members + 1, dtype=np.int64)
+    np.cumsum(following, out=edge_starts[1:])
+    block_start = 1
+    block_size = FIRST_BLOCK
+    while block_start < num_members:
+        block_end = min(num_members, block_start + block_size)
+        first, last = edge_starts[block_start], edge_starts[block_end]
+        block_sources = sources[first:last]
+        uniform = rng.integers(0, block_sources)
+        if first:
+            copied = targets[rng.integers(0, first, last - first)]
+            targets[first:last] = np.where(rng.random(last - first) < uniform_share, uniform, copied)
+        else:
+            targets[first:last] = uniform
+        block_start = block_end
+        block_size *= 2
+    back = rng.random(len(sources)) < follow_back
+    follows = _unique_pairs(np.concatenate([sources, targets[back]]), np.concatenate([targets, sources[back]]))
+
+    activity = rng.lognormal(0.0, 1.0, num_members)
+    engaged = follows[rng.random(len(follows)) < engaged_share]
+    scale = activity[engaged[:, 0]] / activity.mean()
+    like_counts = 1 + rng.poisson(np.maximum(mean_likes - 1, 0) * scale)
+    likes = np.column_stack([engaged, like_counts])
+    commented = engaged[rng.random(len(engaged)) < comment_share]
+    comment_counts = 1 + rng.poisson(np.maximum(mean_comments - 1, 0) * activity[commented[:, 0]] / activity.mean())
+    comments = np.column_stack([commented, comment_counts])
+    return SyntheticNetwork(num_members, follows + 1, _as_ids(likes), _as_ids(comments))
+
+
+def _unique_pairs(sources, targets):
+    width = max(int(targets.max(initial=0)) + 1, 1)
+    keys = np.unique(sources * width + targets)
+    return np.column_stack([keys // width, keys % width])
+
+
+def _as_ids(rows):
+    rows = rows.astype(np.int64)
+    rows[:, :2] += 1
+    return rows
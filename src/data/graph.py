@@ -0,0 +1,536 @@
+# data/graph.py
+
+import os
+from collections.abc import Mapping, MutableMapping, Set
+
+import numpy as np
+
+from data.sparse import COMPACT_RATIO, MIN_COMPACT_EDGES, CSRMatrix, SparseCounts, build_csr, csr_rows, grow
+
+# When set, every cached total read is checked against a full recompute.
+VERIFY_TOTALS = os.environ.get('SOCIAL_NETWORK_VERIFY', '') not in ('', '0')
+
+class GraphListener:
+    # Attached through Graph.listeners and called after every change; the
+    # hooks default to doing nothing, so subclasses override what they use.
+    def on_member(self, node):
+        pass
+
+    def on_follow(self, source, target):
+        pass
+
+    def on_unfollow(self, source, target):
+        pass
+
+    def on_interaction(self, kind, source, target, count):
+        pass
+
+    def on_bulk(self):
+        pass
+
+    def close(self):
+        self.graph.listeners.remove(self)
+
+class Graph:
+    def __init__(self):
+        self.members = []
+        self.ids = []
+        self.index = {}
+        self._out_indptr = np.zeros(1, dtype=np.int64)
+        self._out_indices = np.zeros(0, dtype=np.int32)
+        self._in_indptr = np.zeros(1, dtype=np.int64)
+        self._in_indices = np.zeros(0, dtype=np.int32)
+        self._pending_out = {}
+        self._pending_in = {}
+        self._pending_count = 0
+        # Unfollowed edges still in the CSR arrays, dropped at the next compact().
+        self._removed_out = {}
+        self._removed_in = {}
+        self._removed_count = 0
+        self._out_degrees = np.zeros(0, dtype=np.int64)
+        self._in_degrees = np.zeros(0, dtype=np.int64)
+        self.likes = SparseCounts()
+        self.comments = SparseCounts()
+        self.listeners = []
+        # Set for a Network's graph (see MemberDirectory), so merging in
+        # standalone members never moves the network's members elsewhere.
+        self.owned = False
+
+    @classmethod
+    def from_arrays(cls, out_csr, in_csr, likes_csr, comments_csr, ids=None):
+        # A read-only graph over existing arrays (for example memory-mapped
+        # ones); member views are not created for it.
+        graph = cls()
+        num_nodes = len(out_csr[0]) - 1
+        graph.members = [None] * num_nodes
+        if ids is not None:
+            graph.ids = list(ids)
+            graph.index = dict(zip(graph.ids, range(num_nodes)))
+        graph._out_indptr, graph._out_indices = out_csr
+        graph._in_indptr, graph._in_indices = in_csr
+        graph._out_degrees = np.diff(graph._out_indptr)
+        graph._in_degrees = np.diff(graph._in_indptr)
+        graph.likes = SparseCounts.from_csr(*likes_csr)
+        graph.comments = SparseCounts.from_csr(*comments_csr)
+        return graph
+
+    def __len__(self):
+        return len(self.members)
+
+    def names(self):
+        if isinstance(self.members, MemberViews):
+            return self.members.names()
+        return [member.name for member in self.members]
+
+    @property
+    def num_edges(self):
+        return len(self._out_indices) + self._pending_count - self._removed_count
+
+    def add_node(self, member):
+        if member.member_id in self.index:
+            raise ValueError(f"Member {member.member_id} is already in the graph")
+        node = len(self.members)
+        self.members.append(member)
+        self.ids.append(member.member_id)
+        self.index[member.member_id] = node
+        self._out_degrees = grow(self._out_degrees, node + 1)
+        self._in_degrees = grow(self._in_degrees, node + 1)
+        member._graph = self
+        member._index = node
+        for listener in self.listeners:
+            listener.on_member(node)
+        return node
+
+    def absorb(self, other):
+        if other is self:
+            return self
+        for member in other.members:
+            if member.member_id in self.index:
+                raise ValueError(f"Member {member.member_id} is already in the graph")
+        offset = len(self.members)
+        indptr, indices = other.out_csr()
+        for member in other.members:
+            self.add_node(member)
+        self.add_edges(csr_rows(indptr) + offset, indices + offset)
+        for counts, other_counts in ((self.likes, other.likes), (self.comments, other.comments)):
+            indptr, indices, data = other_counts.csr(len(other))
+            counts.add_many(csr_rows(indptr) + offset, indices + offset, data, len(self))
+        self._notify_bulk()
+        return self
+
+    def add_edge(self, source, target):
+        if self.has_edge(source, target):
+            return False
+        removed = self._removed_out.get(source)
+        if removed is not None and target in removed:
+            # Following again restores the edge still held in the arrays.
+            del removed[target]
+            del self._removed_in[target][source]
+            self._removed_count -= 1
+        else:
+            self._pending_out.setdefault(source, {})[target] = None
+            self._pending_in.setdefault(target, {})[source] = None
+            self._pending_count += 1
+        self._out_degrees[source] += 1
+        self._in_degrees[target] += 1
+        if self._pending_count > self._compact_threshold():
+            self.compact()
+        for listener in self.listeners:
+            listener.on_follow(source, target)
+        return True
+
+    def remove_edge(self, source, target):
+        pending = self._pending_out.get(source)
+        if pending is not None and target in pending:
+            del pending[target]
+            del self._pending_in[target][source]
+            self._pending_count -= 1
+        elif self.has_edge(source, target):
+            # Like additions, removals are buffered and folded in by compact().
+            self._removed_out.setdefault(source, {})[target] = None
+            self._removed_in.setdefault(target, {})[source] = None
+            self._removed_count += 1
+        else:
+            return False
+        self._out_degrees[source] -= 1
+        self._in_degrees[target] -= 1
+        if self._removed_count > self._compact_threshold():
+            self.compact()
+        for listener in self.listeners:
+            listener.on_unfollow(source, target)
+        return True
+
+    def add_edges(self, sources, targets):
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        edge_sources, edge_targets = self._edges()
+        self._rebuild(np.concatenate([edge_sources, sources]), np.concatenate([edge_targets, targets]))
+        self._notify_bulk()
+
+    def remove_edges(self, sources, targets):
+        # Pairs that are not edges are ignored.
+        num_nodes = len(self.members)
+        kept_sources, kept_targets = self._edges()
+        removed = np.isin(
+            kept_sources * num_nodes + kept_targets,
+            np.asarray(sources, dtype=np.int64) * num_nodes + np.asarray(targets, dtype=np.int64),
+        )
+        self._rebuild(kept_sources[~removed], kept_targets[~removed])
+        self._notify_bulk()
+
+    def add_interaction(self, kind, source, target, count):
+        getattr(self, kind).add(source, target, count)
+        if count:
+            for listener in self.listeners:
+                listener.on_interaction(kind, source, target, count)
+
+    def add_interactions(self, kind, sources, targets, counts):
+        getattr(self, kind).add_many(sources, targets, counts, len(self))
+        self._notify_bulk()
+
+    def listener(self, kind):
+        # The first attached listener of the given class, for example an index.
+        for listener in self.listeners:
+            if isinstance(listener, kind):
+                return listener
+        return None
+
+    def _notify_bulk(self):
+        for listener in self.listeners:
+            listener.on_bulk()
+
+    def has_edge(self, source, target):
+        pending = self._pending_out.get(source)
+        if pending is not None and target in pending:
+            return True
+        if source >= len(self._out_indptr) - 1:
+            return False
+        removed = self._removed_out.get(source)
+        if removed is not None and target in removed:
+            return False
+        row = self._out_indices[self._out_indptr[source]:self._out_indptr[source + 1]]
+        position = np.searchsorted(row, target)
+        return position < len(row) and row[position] == target
+
+    def successors(self, node):
+        return self._row(self._out_indptr, self._out_indices, self._pending_out, self._removed_out, node)
+
+    def predecessors(self, node):
+        return self._row(self._in_indptr, self._in_indices, self._pending_in, self._removed_in, node)
+
+    def out_degree(self, node):
+        if VERIFY_TOTALS:
+            self.verify(node)
+        return int(self._out_degrees[node])
+
+    def in_degree(self, node):
+        if VERIFY_TOTALS:
+            self.verify(node)
+        return int(self._in_degrees[node])
+
+    def out_degrees(self):
+        return self._out_degrees[:len(self)].copy()
+
+    def in_degrees(self):
+        return self._in_degrees[:len(self)].copy()
+
+    def verify(self, node=None):
+        nodes = range(len(self)) if node is None else [node]
+        for node in nodes:
+            expected = (
+                self._degree(self._out_indptr, self._pending_out, self._removed_out, node),
+                self._degree(self._in_indptr, self._pending_in, self._removed_in, node),
+                self.likes.recompute_row_sum(node),
+                self.comments.recompute_row_sum(node),
+            )
+            cached = (
+                int(self._out_degrees[node]),
+                int(self._in_degrees[node]),
+                self.likes.row_sum(node),
+                self.comments.row_sum(node),
+            )
+            if cached != expected:
+                raise AssertionError(
+                    f"Cached totals {cached} for member {self.ids[node]} do not match recomputed {expected}"
+                )
+
+    def engagement_between(self, source, target):
+        return self.likes.get(source, target) + self.comments.get(source, target)
+
+    def total_engagement(self, node):
+        if VERIFY_TOTALS:
+            self.verify(node)
+        return self.likes.row_sum(node) + self.comments.row_sum(node)
+
+    def total_engagements(self):
+        return self.likes.row_sums(len(self)) + self.comments.row_sums(len(self))
+
+    def engagement_matrix(self):
+        num_nodes = len(self)
+        likes_indptr, likes_indices, likes_data = self.likes.csr(num_nodes)
+        comments_indptr, comments_indices, comments_data = self.comments.csr(num_nodes)
+        indptr, indices, data = build_csr(
+            num_nodes,
+            np.concatenate([csr_rows(likes_indptr), csr_rows(comments_indptr)]),
+            np.concatenate([likes_indices, comments_indices]),
+            np.concatenate([likes_data, comments_data]),
+        )
+        return CSRMatrix(indptr, indices, data, (num_nodes, num_nodes), self.ids)
+
+    def out_csr(self):
+        self.compact()
+        return self._out_indptr, self._out_indices
+
+    def in_csr(self):
+        self.compact()
+        return self._in_indptr, self._in_indices
+
+    def compact(self):
+        if not self._pending_count and not self._removed_count and len(self._out_indptr) == len(self.members) + 1:
+            return
+        self._rebuild(*self._edges())
+
+    def _compact_threshold(self):
+        return max(MIN_COMPACT_EDGES, COMPACT_RATIO * len(self._out_indices))
+
+    def _rebuild(self, sources, targets):
+        num_nodes = len(self.members)
+        self._out_indptr, self._out_indices = build_csr(num_nodes, sources, targets)
+        self._in_indptr, self._in_indices = build_csr(num_nodes, self._out_indices, csr_rows(self._out_indptr))
+        self._out_degrees[:num_nodes] = np.diff(self._out_indptr)
+        self._in_degrees[:num_nodes] = np.diff(self._in_indptr)
+        self._pending_out = {}
+        self._pending_in = {}
+        self._pending_count = 0
+        self._removed_out = {}
+        self._removed_in = {}
+        self._removed_count = 0
+
+    def _edges(self):
+        # Every current edge as (sources, targets): the arrays less the
+        # buffered removals, plus the pending additions.
+        sources = csr_rows(self._out_indptr)
+        targets = self._out_indices
+        if self._removed_count:
+            num_nodes = len(self.members)
+            removed_sources, removed_targets = self._buffered(self._removed_out, self._removed_count)
+            kept = ~np.isin(sources * num_nodes + targets, removed_sources * num_nodes + removed_targets)
+            sources, targets = sources[kept], targets[kept]
+        pending_sources, pending_targets = self._buffered(self._pending_out, self._pending_count)
+        return np.concatenate([sources, pending_sources]), np.concatenate([targets, pending_targets])
+
+    def _buffered(self, rows, count):
+        sources = np.fromiter((source for source, row in rows.items() for _ in row), dtype=np.int64, count=count)
+        targets = np.fromiter((target for row in rows.values() for target in row), dtype=np.int64, count=count)
+        return sources, targets
+
+    def _row(self, indptr, indices, pending, removed, node):
+        row = indices[indptr[node]:indptr[node + 1]] if node < len(indptr) - 1 else indices[:0]
+        gone = removed.get(node)
+        if gone:
+            row = row[~np.isin(row, np.fromiter(gone, dtype=np.int64, count=len(gone)))]
+        extra = pending.get(node)
+        if extra:
+            row = np.concatenate([row, np.fromiter(extra, dtype=np.int32, count=len(extra))])
+        return row
+
+    def _degree(self, indptr, pending, removed, node):
+        degree = int(indptr[node + 1] - indptr[node]) if node < len(indptr) - 1 else 0
+        return degree + len(pending.get(node, ())) - len(removed.get(node, ()))
+
+
+class NeighborSet(Set):
+    def __init__(self, member, incoming):
+        self._member = member
+        self._incoming = incoming
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def _nodes(self):
+        graph = self._member._graph
+        if self._incoming:
+            return graph.predecessors(self._member._index)
+        return graph.successors(self._member._index)
+
+    def __iter__(self):
+        members = self._member._graph.members
+        return (members[node] for node in self._nodes().tolist())
+
+    def __len__(self):
+        graph = self._member._graph
+        if self._incoming:
+            return graph.in_degree(self._member._index)
+        return graph.out_degree(self._member._index)
+
+    def __contains__(self, other):
+        graph = self._member._graph
+        if getattr(other, '_graph', None) is not graph:
+            return False
+        if self._incoming:
+            return graph.has_edge(other._index, self._member._index)
+        return graph.has_edge(self._member._index, other._index)
+
+    def add(self, other):
+        if self._incoming:
+            other.follow(self._member)
+        else:
+            self._member.follow(other)
+
+    def discard(self, other):
+        if self._incoming:
+            other.unfollow(self._member)
+        else:
+            self._member.unfollow(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({[member.member_id for member in self]})"
+
+
+class MemberViews:
+    # Graph.members for a graph loaded from a snapshot: each Member is built
+    # from the id and name tables the first time it is asked for, so
+    # loading does not create millions of objects up front. Members added
+    # afterwards are appended as usual.
+    def __init__(self, graph, member_class, names):
+        self._graph = graph
+        self._member_class = member_class
+        self._names = names
+        self._members = [None] * len(names)
+        self._built = 0
+
+    def __len__(self):
+        return len(self._members)
+
+    def __getitem__(self, node):
+        member = self._members[node]
+        if member is None:
+            member = self._member_class.__new__(self._member_class)
+            member.member_id = self._graph.ids[node]
+            member.name = self._names[node]
+            member._graph = self._graph
+            member._index = node
+            self._members[node] = member
+            self._built += 1
+        return member
+
+    def __iter__(self):
+        return (self[node] for node in range(len(self._members)))
+
+    def append(self, member):
+        self._members.append(member)
+        self._built += 1
+
+    def names(self):
+        return [
+            member.name if member is not None else self._names[node]
+            for node, member in enumerate(self._members)
+        ]
+
+    def name_table(self):
+        # The loaded string table as is while no member has been built (and
+        # so none renamed or added); saving it again needs no decoding.
+        if not self._built:
+            return self._names
+        return type(self._names).from_strings(self.names())
+
+
+class MemberDirectory(MutableMapping):
+    # Network.members over a graph's id index, in node order. Lookups go
+    # through Graph.members, so snapshot members are only built when used.
+    def __init__(self, graph):
+        self.graph = graph
+        graph.owned = True
+
+    def __getitem__(self, member_id):
+        return self.graph.members[self.graph.index[member_id]]
+
+    def __setitem__(self, member_id, member):
+        # Members join the graph when they are created; this only checks it.
+        if self.get(member_id) is not member:
+            raise ValueError(f"Member {member_id} is not in this network's graph")
+
+    def __delitem__(self, member_id):
+        raise TypeError("Members cannot be removed from a network")
+
+    def __contains__(self, member_id):
+        return member_id in self.graph.index
+
+    def __iter__(self):
+        return iter(self.graph.ids)
+
+    def __len__(self):
+        return len(self.graph)
+
+
+def merge_graphs(graph, other):
+    # The graph a Network owns, or one with listeners attached, keeps its
+    # members and listeners; otherwise the larger graph absorbs the smaller.
+    if other is graph:
+        return graph
+    kept, merged = graph.owned or bool(graph.listeners), other.owned or bool(other.listeners)
+    if kept and merged:
+        raise ValueError("Members of two different networks cannot interact; add one network's members to the other")
+    if merged or (not kept and len(other) > len(graph)):
+        return other.absorb(graph)
+    return graph.absorb(other)
+
+
+class EngagementRow(Mapping):
+    def __init__(self, member, counts_name):
+        self._member = member
+        self._counts_name = counts_name
+
+    def _entries(self):
+        graph = self._member._graph
+        return getattr(graph, self._counts_name).row(self._member._index)
+
+    def __getitem__(self, member_id):
+        graph = self._member._graph
+        node = graph.index.get(member_id)
+        if node is None:
+            return 0
+        return getattr(graph, self._counts_name).get(self._member._index, node)
+
+    def get(self, member_id, default=0):
+        return self[member_id] or default
+
+    def __iter__(self):
+        members = self._member._graph.members
+        return iter([members[node].member_id for node in self._entries()])
+
+    def __len__(self):
+        return len(self._entries())
+
+    def values(self):
+        return self._entries().values()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)})"
+
+
+def join(member, other):
+    return merge_graphs(member._graph, other._graph)
+
+
+def connect(member, other):
+    graph = join(member, other)
+    graph.add_edge(member._index, other._index)
+
+
+def shared_graph(members):
+    # A MemberDirectory already is one graph's members, in node order.
+    if isinstance(members, MemberDirectory):
+        return members.graph
+    graph = None
+    for member in members.values():
+        graph = member._graph if graph is None else merge_graphs(graph, member._graph)
+    return graph if graph is not None else Graph()
+
+
+def member_nodes(members):
+    # The node of each member, in the order members lists them.
+    if isinstance(members, MemberDirectory):
+        return np.arange(len(members.graph), dtype=np.int64)
+    return np.fromiter((member._index for member in members.values()), dtype=np.int64, count=len(members))
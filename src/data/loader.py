@@ -0,0 +1,163 @@
+# data/loader.py
+
+import itertools
+import os
+import time
+
+import numpy as np
+
+from data.sparse import csr_rows
+
+CHUNK_ROWS = 1_000_000
+# A saved network is a directory holding one .npy file per array.
+NETWORK_FILES = ('members', 'follows', 'likes', 'comments')
+
+
+class LoadStats:
+    def __init__(self):
+        self.rows = 0
+        self.new_members = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"Loaded {self.rows} rows ({self.new_members} new members) in {self.seconds:.2f} seconds, "
+            f"{self.rows_per_second:,.0f} rows/s"
+        )
+
+
+def read_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    path = str(path)
+    if path.endswith('.npy'):
+        array = np.load(path, mmap_mode='r')
+        if array.ndim != 2 or array.shape[1] != columns:
+            raise ValueError(f"{path} should hold an array with {columns} columns")
+        for start in range(0, len(array), chunk_rows):
+            yield np.asarray(array[start:start + chunk_rows], dtype=np.int64)
+        return
+    delimiter = '\t' if path.endswith('.tsv') else ','
+    with open(path) as file:
+        first = file.readline()
+        lines = file if _is_header(first, delimiter) else itertools.chain([first], file)
+        while True:
+            batch = list(itertools.islice(lines, chunk_rows))
+            if not batch:
+                return
+            chunk = np.loadtxt(batch, delimiter=delimiter, dtype=np.int64, ndmin=2)
+            if chunk.shape[1] != columns:
+                raise ValueError(f"{path} should have {columns} columns")
+            yield chunk
+
+
+def _is_header(line, delimiter):
+    try:
+        [int(field) for field in line.strip().split(delimiter)]
+    except ValueError:
+        return True
+    return False
+
+
+class IdMap:
+    # Sorted member id -> node index arrays, so chunks are remapped with a
+    # vectorised binary search and only unseen ids touch Python.
+    def __init__(self, network):
+        self.network = network
+        ids = np.array(network.graph.ids, dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        self.ids = ids[order]
+        self.nodes = order.astype(np.int64)
+
+    def map(self, ids, stats):
+        unique, inverse = np.unique(ids, return_inverse=True)
+        positions = np.searchsorted(self.ids, unique)
+        known = positions < len(self.ids)
+        known[known] = self.ids[positions[known]] == unique[known]
+        nodes = np.empty(len(unique), dtype=np.int64)
+        nodes[known] = self.nodes[positions[known]]
+        new_ids = unique[~known]
+        if len(new_ids):
+            first = len(self.network.graph)
+            for member_id in new_ids.tolist():
+                self.network.add_member(member_id, f"Member{member_id}")
+            new_nodes = np.arange(first, first + len(new_ids), dtype=np.int64)
+            nodes[~known] = new_nodes
+            stats.new_members += len(new_ids)
+            merged = np.concatenate([self.ids, new_ids])
+            order = np.argsort(merged, kind='stable')
+            self.ids = merged[order]
+            self.nodes = np.concatenate([self.nodes, new_nodes])[order]
+        return nodes[inverse].reshape(ids.shape)
+
+
+def load_network(network, follows=None, likes=None, comments=None, chunk_rows=CHUNK_ROWS):
+    # Follow files hold (follower_id, followee_id) rows; like and comment files
+    # hold (source_id, target_id, count). Ids need not be contiguous: unseen
+    # ids become new members.
+    stats = LoadStats()
+    start_time = time.perf_counter()
+    graph = network.graph
+    id_map = IdMap(network)
+    if follows is not None:
+        sources, targets = [], []
+        for chunk in read_chunks(follows, 2, chunk_rows):
+            nodes = id_map.map(chunk, stats)
+            sources.append(nodes[:, 0].astype(np.int32))
+            targets.append(nodes[:, 1].astype(np.int32))
+            stats.rows += len(chunk)
+        if sources:
+            graph.add_edges(np.concatenate(sources), np.concatenate(targets))
+    for path, kind in ((likes, 'likes'), (comments, 'comments')):
+        if path is None:
+            continue
+        sources, targets, values = [], [], []
+        for chunk in read_chunks(path, 3, chunk_rows):
+            stats.rows += len(chunk)
+            chunk = chunk[chunk[:, 2] != 0]
+            nodes = id_map.map(chunk[:, :2], stats)
+            sources.append(nodes[:, 0].astype(np.int32))
+            targets.append(nodes[:, 1].astype(np.int32))
+            values.append(chunk[:, 2])
+        if sources:
+            graph.add_interactions(kind, np.concatenate(sources), np.concatenate(targets), np.concatenate(values))
+    stats.seconds = time.perf_counter() - start_time
+    return stats
+
+
+def network_paths(directory):
+    return {name: os.path.join(directory, f"{name}.npy") for name in NETWORK_FILES}
+
+
+def save_network(network, directory):
+    # members.npy keeps every member id in node order, including members
+    # without follows or interactions; the other files use the layout
+    # load_network reads.
+    graph = network.graph
+    ids = np.array(graph.ids, dtype=np.int64)
+    indptr, indices = graph.out_csr()
+    arrays = {
+        'members': ids,
+        'follows': np.column_stack([ids[csr_rows(indptr)], ids[indices]]),
+    }
+    for kind in ('likes', 'comments'):
+        indptr, indices, data = getattr(graph, kind).csr(len(graph))
+        arrays[kind] = np.column_stack([ids[csr_rows(indptr)], ids[indices], data.astype(np.int64)])
+    os.makedirs(directory, exist_ok=True)
+    paths = network_paths(directory)
+    for name, array in arrays.items():
+        np.save(paths[name], array)
+    return paths
+
+
+def load_saved_network(network, directory, chunk_rows=CHUNK_ROWS):
+    paths = network_paths(directory)
+    if os.path.exists(paths['members']):
+        index = network.graph.index
+        for member_id in np.load(paths['members']).tolist():
+            if member_id not in index:
+                network.add_member(member_id, f"Member{member_id}")
+    paths = {name: path if os.path.exists(path) else None for name, path in paths.items()}
+    return load_network(network, paths['follows'], paths['likes'], paths['comments'], chunk_rows)
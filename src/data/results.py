@@ -0,0 +1,171 @@
+# data/results.py
+
+import json
+import os
+
+import numpy as np
+
+RESULT_ARRAYS = (
+    'member_ids', 'sorted_member_ids', 'sorted_positions', 'engagement_rates',
+    'influence_indptr', 'influence_targets', 'influence_values',
+    'shortest_indptr', 'shortest_targets', 'shortest_path_offsets', 'shortest_path_nodes',
+    'engagement_indptr', 'engagement_targets', 'engagement_values', 'engagement_path_offsets', 'engagement_path_nodes',
+    'engagement_exact',
+)
+
+
+def _concatenate(arrays, dtype):
+    return np.concatenate(arrays).astype(dtype, copy=False) if arrays else np.zeros(0, dtype=dtype)
+
+
+class PathTable:
+    # One source's paths are packed into typed arrays as its record arrives
+    # and kept at the source's position; arrays() joins them in that order.
+    def __init__(self, num_sources):
+        self.blocks = [None] * num_sources
+
+    def add_source(self, index, position, rows):
+        # Rows without a path are left out, unless a capped search found none.
+        targets, lengths, nodes, values, exact = [], [], [], [], []
+        for other_id, path, value, row_exact in rows:
+            if not path and row_exact:
+                continue
+            targets.append(position[other_id])
+            lengths.append(len(path))
+            nodes.extend(position[member_id] for member_id in path)
+            values.append(value)
+            exact.append(row_exact)
+        self.blocks[index] = (
+            np.array(targets, dtype=np.int32), np.array(lengths, dtype=np.int64), np.array(nodes, dtype=np.int32),
+            np.array(values, dtype=np.int64), np.array(exact, dtype=bool),
+        )
+
+    def arrays(self):
+        targets, lengths, nodes, values, exact = zip(*self.blocks) if self.blocks else ((),) * 5
+        indptr = np.zeros(len(self.blocks) + 1, dtype=np.int64)
+        np.cumsum([len(block) for block in targets], out=indptr[1:])
+        lengths = _concatenate(lengths, np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return (
+            indptr, _concatenate(targets, np.int32), offsets, _concatenate(nodes, np.int32),
+            _concatenate(values, np.int64), _concatenate(exact, bool),
+        )
+
+
+def save_results(path, overall_stats, records, member_ids):
+    # Writes a directory of .npy columns (memory-mappable) or, when the path
+    # ends in .npz, a single NumPy archive.
+    member_ids = np.asarray(list(member_ids), dtype=np.int64)
+    position = {member_id: index for index, member_id in enumerate(member_ids.tolist())}
+    engagement_rates = np.zeros(len(member_ids))
+    # Records may arrive in any order (all_pairs_records with sources, or
+    # several workers), so each is packed into typed arrays on arrival, kept
+    # at its member's position, and the columns are joined in member_ids
+    # order at the end.
+    seen = np.zeros(len(member_ids), dtype=bool)
+    influence_targets = [None] * len(member_ids)
+    influence_values = [None] * len(member_ids)
+    shortest = PathTable(len(member_ids))
+    engagement = PathTable(len(member_ids))
+    for member_id, rate, influences, shortest_paths, engagement_paths in records:
+        index = position[member_id]
+        if seen[index]:
+            raise ValueError(f"More than one record for member {member_id}")
+        seen[index] = True
+        engagement_rates[index] = rate
+        influences = [(position[other_id], value) for other_id, value in influences if value]
+        influence_targets[index] = np.array([target for target, _ in influences], dtype=np.int32)
+        influence_values[index] = np.array([value for _, value in influences], dtype=np.float64)
+        shortest.add_source(index, position, ((other_id, entry[0], 0, True) for other_id, entry in shortest_paths))
+        engagement.add_source(index, position, ((other_id, entry[0], entry[1], entry[3]) for other_id, entry in engagement_paths))
+    if not seen.all():
+        raise ValueError("Expected one record per member")
+
+    influence_indptr = np.zeros(len(member_ids) + 1, dtype=np.int64)
+    np.cumsum([len(targets) for targets in influence_targets], out=influence_indptr[1:])
+    shortest_indptr, shortest_targets, shortest_offsets, shortest_nodes, _, _ = shortest.arrays()
+    engagement_indptr, engagement_targets, engagement_offsets, engagement_nodes, engagement_values, engagement_exact = (
+        engagement.arrays()
+    )
+    order = np.argsort(member_ids, kind='stable')
+    arrays = dict(zip(RESULT_ARRAYS, (
+        member_ids, member_ids[order], order.astype(np.int64), engagement_rates,
+        influence_indptr, _concatenate(influence_targets, np.int32), _concatenate(influence_values, np.float64),
+        shortest_indptr, shortest_targets, shortest_offsets, shortest_nodes,
+        engagement_indptr, engagement_targets, engagement_values, engagement_offsets, engagement_nodes,
+        engagement_exact,
+    )))
+    stats = json.dumps({key: (value.item() if hasattr(value, 'item') else value) for key, value in overall_stats.items()})
+
+    if str(path).endswith('.npz'):
+        np.savez(path, overall_stats=np.array(stats), **arrays)
+        return
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    with open(os.path.join(path, 'overall_stats.json'), 'w') as file:
+        file.write(stats)
+
+
+class ResultsReader:
+    def __init__(self, path):
+        if str(path).endswith('.npz'):
+            archive = np.load(path)
+            self.overall_stats = json.loads(str(archive['overall_stats']))
+            self.arrays = {name: archive[name] for name in RESULT_ARRAYS}
+        else:
+            with open(os.path.join(path, 'overall_stats.json')) as file:
+                self.overall_stats = json.load(file)
+            self.arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in RESULT_ARRAYS}
+
+    def __len__(self):
+        return len(self.arrays['member_ids'])
+
+    def position(self, member_id):
+        sorted_ids = self.arrays['sorted_member_ids']
+        index = int(np.searchsorted(sorted_ids, member_id))
+        if index == len(sorted_ids) or sorted_ids[index] != member_id:
+            raise KeyError(member_id)
+        return int(self.arrays['sorted_positions'][index])
+
+    def engagement_rate(self, member_id):
+        return float(self.arrays['engagement_rates'][self.position(member_id)])
+
+    def influences(self, member_id):
+        start, end = self._span('influence_indptr', member_id)
+        member_ids = self.arrays['member_ids']
+        targets = self.arrays['influence_targets'][start:end]
+        values = self.arrays['influence_values'][start:end]
+        return {int(member_ids[target]): float(value) for target, value in zip(targets, values)}
+
+    def shortest_paths(self, member_id):
+        return {other_id: path for other_id, path, _ in self._paths('shortest', member_id)}
+
+    def engagement_paths(self, member_id):
+        return {other_id: (path, value) for other_id, path, value in self._paths('engagement', member_id)}
+
+    def inexact_engagement_paths(self, member_id):
+        # Targets whose search hit its work cap: the path is only the best
+        # one found, or empty if none was found in time.
+        start, end = self._span('engagement_indptr', member_id)
+        member_ids = self.arrays['member_ids']
+        targets = self.arrays['engagement_targets'][start:end]
+        exact = self.arrays['engagement_exact'][start:end]
+        return sorted(int(member_ids[target]) for target in targets[~exact])
+
+    def _span(self, name, member_id):
+        position = self.position(member_id)
+        indptr = self.arrays[name]
+        return int(indptr[position]), int(indptr[position + 1])
+
+    def _paths(self, prefix, member_id):
+        start, end = self._span(f"{prefix}_indptr", member_id)
+        member_ids = self.arrays['member_ids']
+        offsets = self.arrays[f"{prefix}_path_offsets"]
+        nodes = self.arrays[f"{prefix}_path_nodes"]
+        values = self.arrays['engagement_values'] if prefix == 'engagement' else None
+        for row in range(start, end):
+            target = int(self.arrays[f"{prefix}_targets"][row])
+            path = [int(member_ids[node]) for node in nodes[offsets[row]:offsets[row + 1]]]
+            yield int(member_ids[target]), path, int(values[row]) if values is not None else None
@@ -0,0 +1,167 @@
+# data/snapshot.py
+
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from data.graph import Graph, MemberViews
+
+# File layout: a fixed preamble (magic, format version, header length and
+# header CRC32), a JSON header describing each section, then the sections
+# themselves, each aligned to ALIGNMENT bytes so they can be viewed straight
+# out of one read-only memory map. Every section carries its own CRC32.
+MAGIC = b'SNETSNAP'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<8sIII')
+ALIGNMENT = 64
+
+SECTIONS = (
+    ('out_indptr', '<i8'), ('out_indices', '<i4'),
+    ('in_indptr', '<i8'), ('in_indices', '<i4'),
+    ('likes_indptr', '<i8'), ('likes_indices', '<i4'), ('likes_data', '<i8'),
+    ('comments_indptr', '<i8'), ('comments_indices', '<i4'), ('comments_data', '<i8'),
+    ('ids', '<i8'),
+    ('name_offsets', '<i8'), ('name_bytes', 'u1'),
+)
+
+
+class StringTable:
+    # Strings stored end to end as UTF-8, with offsets[i]:offsets[i + 1]
+    # marking string i; entries are decoded on access.
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position):
+        return bytes(self.data[self.offsets[position]:self.offsets[position + 1]]).decode('utf-8')
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_snapshot(graph, path, metadata=None):
+    # Written to a temporary file first, so an interrupted save never
+    # leaves a truncated snapshot under the final name. metadata is a small
+    # JSON-serializable dict kept in the header (the event log generation).
+    num_nodes = len(graph)
+    ids = np.asarray(graph.ids) if num_nodes else np.zeros(0, dtype=np.int64)
+    if len(ids) != num_nodes or ids.dtype.kind not in 'iu':
+        raise ValueError("Snapshots need integer member ids")
+    ids = ids.astype(np.int64)
+    if isinstance(graph.members, MemberViews):
+        names = graph.members.name_table()
+    else:
+        names = StringTable.from_strings(graph.names())
+    arrays = dict(zip(('out_indptr', 'out_indices'), graph.out_csr()))
+    arrays.update(zip(('in_indptr', 'in_indices'), graph.in_csr()))
+    arrays.update(zip(('likes_indptr', 'likes_indices', 'likes_data'), graph.likes.csr(num_nodes)))
+    arrays.update(zip(('comments_indptr', 'comments_indices', 'comments_data'), graph.comments.csr(num_nodes)))
+    arrays.update(ids=ids, name_offsets=names.offsets, name_bytes=names.data)
+
+    sections = {}
+    layout = []
+    size = 0
+    for name, dtype in SECTIONS:
+        array = np.ascontiguousarray(arrays[name], dtype=dtype)
+        sections[name] = {'dtype': dtype, 'shape': list(array.shape), 'offset': size, 'crc32': zlib.crc32(array)}
+        layout.append((size, array))
+        size = _aligned(size + array.nbytes)
+    header = json.dumps({
+        'members': num_nodes,
+        'follows': len(arrays['out_indices']),
+        'sections': sections,
+        'metadata': metadata or {},
+    }).encode('utf-8')
+    data_start = _aligned(PREAMBLE.size + len(header))
+
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as file:
+        file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header), zlib.crc32(header)))
+        file.write(header)
+        for offset, array in layout:
+            file.seek(data_start + offset)
+            file.write(array.data)
+        file.truncate(data_start + size)
+    os.replace(temporary, path)
+    return path
+
+
+class Snapshot:
+    def __init__(self, path, verify=False):
+        self.path = path
+        with open(path, 'rb') as file:
+            preamble = file.read(PREAMBLE.size)
+            if len(preamble) < PREAMBLE.size:
+                raise ValueError(f"{path} is not a network snapshot")
+            magic, version, header_length, header_crc = PREAMBLE.unpack(preamble)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a network snapshot")
+            if version > FORMAT_VERSION:
+                raise ValueError(f"{path} uses snapshot format {version}; this version reads up to {FORMAT_VERSION}")
+            header = file.read(header_length)
+        if len(header) < header_length or zlib.crc32(header) != header_crc:
+            raise ValueError(f"{path} has a corrupt snapshot header")
+        self.version = version
+        self.header = json.loads(header)
+        self.data_start = _aligned(PREAMBLE.size + header_length)
+        self.buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        self.arrays = {}
+        for name, section in self.header['sections'].items():
+            dtype = np.dtype(section['dtype'])
+            count = int(np.prod(section['shape'], dtype=np.int64))
+            start = self.data_start + section['offset']
+            end = start + count * dtype.itemsize
+            if end > len(self.buffer):
+                raise ValueError(f"{path} is truncated")
+            # Plain ndarray views, still backed by the shared memory map.
+            self.arrays[name] = np.asarray(self.buffer[start:end]).view(dtype).reshape(section['shape'])
+        if verify:
+            self.verify()
+
+    @property
+    def num_members(self):
+        return self.header['members']
+
+    @property
+    def metadata(self):
+        return self.header.get('metadata', {})
+
+    def verify(self):
+        # Reads every section, so this costs a full pass over the file.
+        for name, section in self.header['sections'].items():
+            if zlib.crc32(self.arrays[name]) != section['crc32']:
+                raise ValueError(f"{self.path} failed its checksum in section {name}")
+
+    def names(self):
+        return StringTable(self.arrays['name_offsets'], self.arrays['name_bytes'])
+
+    def graph(self, member_class):
+        # Members are created from the id and name tables on first access.
+        arrays = self.arrays
+        graph = Graph.from_arrays(
+            (arrays['out_indptr'], arrays['out_indices']),
+            (arrays['in_indptr'], arrays['in_indices']),
+            (arrays['likes_indptr'], arrays['likes_indices'], arrays['likes_data']),
+            (arrays['comments_indptr'], arrays['comments_indices'], arrays['comments_data']),
+            ids=arrays['ids'].tolist(),
+        )
+        graph.members = MemberViews(graph, member_class, self.names())
+        return graph
+
+
+def load_snapshot(path, member_class, verify=False):
+    return Snapshot(path, verify).graph(member_class)
@@ -0,0 +1,199 @@
+# data/sparse.py
+
+import numpy as np
+
+# Single updates are buffered per row and folded into the CSR arrays once
+# the buffer grows past this fraction of the compacted entry count.
+COMPACT_RATIO = 0.25
+MIN_COMPACT_EDGES = 1024
+
+
+def build_csr(num_rows, rows, cols, data=None):
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    # Sorting one combined int64 key is much faster than a two-key lexsort.
+    width = max(num_rows, int(cols.max()) + 1 if len(cols) else 0, 1)
+    keys = rows * width + cols
+    if data is None:
+        keys = np.unique(keys)
+    else:
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        data = np.asarray(data, dtype=np.int64)[order]
+        if len(keys) > 1:
+            starts = np.empty(len(keys), dtype=bool)
+            starts[0] = True
+            starts[1:] = keys[1:] != keys[:-1]
+            data = np.add.reduceat(data, np.flatnonzero(starts))
+            keys = keys[starts]
+    rows, cols = np.divmod(keys, width)
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    if data is None:
+        return indptr, cols.astype(np.int32)
+    return indptr, cols.astype(np.int32), data
+
+
+def grow(array, size):
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def csr_rows(indptr):
+    return np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+
+
+def csr_row_sums(indptr, data):
+    totals = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum(data, out=totals[1:])
+    return totals[indptr[1:]] - totals[indptr[:-1]]
+
+
+class SparseCounts:
+    def __init__(self):
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.int64)
+        self._pending = {}
+        self._pending_count = 0
+        self._totals = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_csr(cls, indptr, indices, data):
+        counts = cls()
+        counts.indptr = indptr
+        counts.indices = indices
+        counts.data = data
+        counts._totals = csr_row_sums(indptr, data)
+        return counts
+
+    @property
+    def nnz(self):
+        return len(self.indices) + self._pending_count
+
+    def add(self, row, col, count):
+        if not count:
+            return
+        pending = self._pending.setdefault(row, {})
+        if col not in pending:
+            self._pending_count += 1
+        pending[col] = pending.get(col, 0) + count
+        self._totals = grow(self._totals, row + 1)
+        self._totals[row] += count
+        if self._pending_count > max(MIN_COMPACT_EDGES, COMPACT_RATIO * len(self.indices)):
+            self.compact()
+
+    def add_many(self, rows, cols, counts, num_rows=0):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        # Zero counts add nothing and would otherwise be stored as entries.
+        nonzero = counts != 0
+        rows, cols, counts = rows[nonzero], cols[nonzero], counts[nonzero]
+        pending_rows, pending_cols, pending_counts = self._pending_entries()
+        num_rows = max(num_rows, len(self.indptr) - 1, int(rows.max()) + 1 if len(rows) else 0)
+        self._totals = grow(self._totals, num_rows)
+        np.add.at(self._totals, rows, counts)
+        self._rebuild(
+            num_rows,
+            np.concatenate([csr_rows(self.indptr), pending_rows, rows]),
+            np.concatenate([self.indices, pending_cols, cols]),
+            np.concatenate([self.data, pending_counts, counts]),
+        )
+
+    def get(self, row, col):
+        count = self._pending.get(row, {}).get(col, 0)
+        if row < len(self.indptr) - 1:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            position = start + np.searchsorted(self.indices[start:end], col)
+            if position < end and self.indices[position] == col:
+                count += int(self.data[position])
+        return count
+
+    def row(self, row):
+        entries = {}
+        if row < len(self.indptr) - 1:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            entries = dict(zip(self.indices[start:end].tolist(), self.data[start:end].tolist()))
+        for col, count in self._pending.get(row, {}).items():
+            entries[col] = entries.get(col, 0) + count
+        return entries
+
+    def row_sum(self, row):
+        return int(self._totals[row]) if row < len(self._totals) else 0
+
+    def row_sums(self, num_rows):
+        totals = np.zeros(num_rows, dtype=np.int64)
+        size = min(num_rows, len(self._totals))
+        totals[:size] = self._totals[:size]
+        return totals
+
+    def recompute_row_sum(self, row):
+        total = sum(self._pending.get(row, {}).values())
+        if row < len(self.indptr) - 1:
+            total += int(self.data[self.indptr[row]:self.indptr[row + 1]].sum())
+        return total
+
+    def recompute_row_sums(self, num_rows):
+        indptr, _, data = self.csr(num_rows)
+        return csr_row_sums(indptr, data)
+
+    def csr(self, num_rows):
+        self.compact(num_rows)
+        return self.indptr, self.indices, self.data
+
+    def compact(self, num_rows=0):
+        num_rows = max(num_rows, len(self.indptr) - 1, max(self._pending, default=-1) + 1)
+        if not self._pending_count and len(self.indptr) == num_rows + 1:
+            return
+        rows, cols, counts = self._pending_entries()
+        self._rebuild(
+            num_rows,
+            np.concatenate([csr_rows(self.indptr), rows]),
+            np.concatenate([self.indices, cols]),
+            np.concatenate([self.data, counts]),
+        )
+
+    def _rebuild(self, num_rows, rows, cols, counts):
+        self.indptr, self.indices, self.data = build_csr(num_rows, rows, cols, counts)
+        self._pending = {}
+        self._pending_count = 0
+
+    def _pending_entries(self):
+        size = self._pending_count
+        rows = np.fromiter((row for row, entries in self._pending.items() for _ in entries), dtype=np.int64, count=size)
+        cols = np.fromiter((col for entries in self._pending.values() for col in entries), dtype=np.int64, count=size)
+        counts = np.fromiter(
+            (count for entries in self._pending.values() for count in entries.values()), dtype=np.int64, count=size
+        )
+        return rows, cols, counts
+
+
+class CSRMatrix:
+    def __init__(self, indptr, indices, data, shape, ids=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+        self.ids = ids
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def row_sums(self):
+        return csr_row_sums(self.indptr, self.data)
+
+    def dense_row(self, row):
+        dense = np.zeros(self.shape[1], dtype=self.data.dtype)
+        start, end = self.indptr[row], self.indptr[row + 1]
+        dense[self.indices[start:end]] = self.data[start:end]
+        return dense
+
+    def toarray(self):
+        dense = np.zeros(self.shape, dtype=self.data.dtype)
+        dense[csr_rows(self.indptr), self.indices] = self.data
+        return dense
@@ -0,0 +1,199 @@
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+# Named counters and timers for the hot paths. Nothing is recorded unless
+# ENABLED is set; callers read instrumentation.ENABLED (not a copied name)
+# and skip the bookkeeping otherwise, so a disabled run pays one flag check
+# per search. Phases add wall and CPU time for the larger steps of a run,
+# and in capture mode a cProfile and/or tracemalloc summary per phase; the
+# profilers are only imported once a capture starts.
+ENABLED = os.environ.get('SOCIAL_NETWORK_INSTRUMENT', '') not in ('', '0')
+CAPTURE_MODES = ('cpu', 'memory')
+# Rows kept per phase in the cProfile and tracemalloc summaries.
+TOP_ENTRIES = 10
+
+counters = defaultdict(int)
+# name -> [calls, wall nanoseconds, cpu nanoseconds]
+timers = defaultdict(lambda: [0, 0, 0])
+phases = {}
+capture = ()
+
+_NULL = nullcontext()
+_profiling = False
+
+
+def enable(modes=()):
+    global ENABLED, capture
+    for mode in modes:
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {mode}")
+    ENABLED = True
+    capture = tuple(modes)
+
+
+def disable():
+    global ENABLED, capture
+    ENABLED = False
+    capture = ()
+
+
+def reset():
+    counters.clear()
+    timers.clear()
+    phases.clear()
+
+
+def count(name, amount=1):
+    counters[name] += amount
+
+
+def add_time(name, wall_ns, cpu_ns=0, calls=1):
+    entry = timers[name]
+    entry[0] += calls
+    entry[1] += wall_ns
+    entry[2] += cpu_ns
+
+
+def snapshot():
+    return {'counters': dict(counters), 'timers': {name: list(entry) for name, entry in timers.items()}}
+
+
+def merge(other):
+    # Adds a snapshot() taken in another process, e.g. an all-pairs worker.
+    for name, amount in other['counters'].items():
+        counters[name] += amount
+    for name, (calls, wall_ns, cpu_ns) in other['timers'].items():
+        add_time(name, wall_ns, cpu_ns, calls)
+
+
+class Timer:
+    __slots__ = ('name', 'wall', 'cpu')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter_ns()
+        self.cpu = time.process_time_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        add_time(self.name, time.perf_counter_ns() - self.wall, time.process_time_ns() - self.cpu)
+
+
+def timer(name):
+    return Timer(name) if ENABLED else _NULL
+
+
+class Phase:
+    def __init__(self, name):
+        self.name = name
+        self.profiler = None
+        self.tracing = False
+
+    def __enter__(self):
+        global _profiling
+        import cProfile
+        import tracemalloc
+        # Only the outermost phase profiles, since cProfile cannot nest.
+        if 'cpu' in capture and not _profiling:
+            self.profiler = cProfile.Profile()
+            _profiling = True
+            self.profiler.enable()
+        if 'memory' in capture:
+            self.tracing = not tracemalloc.is_tracing()
+            if self.tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.wall = time.perf_counter_ns()
+        self.cpu = time.process_time_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _profiling
+        import tracemalloc
+        wall_ns = time.perf_counter_ns() - self.wall
+        cpu_ns = time.process_time_ns() - self.cpu
+        entry = phases.setdefault(self.name, {'calls': 0, 'wall_ns': 0, 'cpu_ns': 0})
+        entry['calls'] += 1
+        entry['wall_ns'] += wall_ns
+        entry['cpu_ns'] += cpu_ns
+        if self.profiler is not None:
+            self.profiler.disable()
+            _profiling = False
+            entry['profile'] = profile_summary(self.profiler)
+        if 'memory' in capture:
+            current, peak = tracemalloc.get_traced_memory()
+            entry['allocated_bytes'] = current - self.memory
+            entry['peak_bytes'] = max(entry.get('peak_bytes', 0), peak)
+            entry['allocations'] = allocation_summary(tracemalloc.take_snapshot())
+            if self.tracing:
+                tracemalloc.stop()
+
+
+def phase(name):
+    return Phase(name) if ENABLED else _NULL
+
+
+def profile_summary(profiler, limit=TOP_ENTRIES):
+    import io
+    import pstats
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{line}({function})",
+            'calls': calls,
+            'own_seconds': own,
+            'cumulative_seconds': cumulative,
+        })
+    rows.sort(key=lambda row: -row['cumulative_seconds'])
+    return rows[:limit]
+
+
+def allocation_summary(memory_snapshot, limit=TOP_ENTRIES):
+    import cProfile
+    import tracemalloc
+    # Leaves out what the capture itself allocates.
+    memory_snapshot = memory_snapshot.filter_traces(
+        [tracemalloc.Filter(False, path) for path in (tracemalloc.__file__, cProfile.__file__, __file__)]
+    )
+    return [
+        {'line': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+         'bytes': stat.size, 'blocks': stat.count}
+        for stat in memory_snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def report():
+    return {
+        'phases': {name: dict(entry) for name, entry in phases.items()},
+        'timers': {
+            name: {'calls': calls, 'wall_ms': wall_ns / 1e6, 'cpu_ms': cpu_ns / 1e6}
+            for name, (calls, wall_ns, cpu_ns) in timers.items()
+        },
+        'counters': dict(counters),
+    }
+
+
+def format_report():
+    lines = ["Phases"]
+    for name, entry in phases.items():
+        line = f"  {name:<36} wall {entry['wall_ns'] / 1e6:>12.2f} ms  cpu {entry['cpu_ns'] / 1e6:>12.2f} ms"
+        if 'peak_bytes' in entry:
+            line += f"  peak {entry['peak_bytes'] / 2 ** 20:>9.2f} MiB"
+        lines.append(line)
+        for row in entry.get('profile', []):
+            lines.append(f"      {row['cumulative_seconds'] * 1000:>12.2f} ms  {row['calls']:>10}  {row['function']}")
+        for row in entry.get('allocations', []):
+            lines.append(f"      {row['bytes'] / 1024:>12.1f} KiB {row['blocks']:>10}  {row['line']}")
+    lines.append("Timers")
+    for name, (calls, wall_ns, cpu_ns) in sorted(timers.items()):
+        lines.append(f"  {name:<36} {calls:>10} calls  wall {wall_ns / 1e6:>12.2f} ms  cpu {cpu_ns / 1e6:>12.2f} ms")
+    lines.append("Counters")
+    for name, amount in sorted(counters.items()):
+        lines.append(f"  {name:<36} {amount:>14,}")
+    return "\n".join(lines)
@@ -1,53 +1,36 @@
 import csv
+import json
+import shutil
+import tempfile
 import time
 import numpy as np
 from collections import defaultdict, deque
-from sklearn.linear_model import LinearRegression
 import random
-
-class Member:
-    def __init__(self, member_id, name):
-        self.member_id = member_id
-        self.name = name
-        self.followers = set()
-        self.following = set()
-        self.likes = defaultdict(int)
-        self.comments = defaultdict(int)
-        self.likes_to = defaultdict(int)
-        self.comments_to = defaultdict(int)
-
-    def follow(self, other):
-        self.following.add(other)
-        other.followers.add(self)
-
-    def like(self, other, count=1):
-        self.likes[other.member_id] += count
-        self.likes_to[other.member_id] += count
-
-    def comment(self, other, count=1):
-        self.comments[other.member_id] += count
-        self.comments_to[other.member_id] += count
-
-    def engagement_rate(self):
-        followers_count = len(self.followers)
-        if followers_count == 0:
-            return 0.0
-        total_likes = sum(self.likes.values())
-        total_comments = sum(self.comments.values())
-        return (total_likes + total_comments) / followers_count * 100
-
-    def total_engagement(self):
-        return sum(self.likes.values()) + sum(self.comments.values())
-
-    def influence_on(self, other):
-        total_engagement = self.total_engagement()
-        if total_engagement == 0:
-            return 0.0
-        return (self.likes_to[other.member_id] + self.comments_to[other.member_id]) / total_engagement * 100
-
-    def shortest_path_to(self, other, members):
+import instrumentation
+from algorithms.all_pairs import all_pairs_blocks, unpack_path
+from algorithms.engagement_paths import DEFAULT_MAX_NODES, highest_engagement_path
+from algorithms.influence import influence_matrix
+from algorithms.shortest_paths import shortest_path
+from algorithms.statistics import overall_statistics
+from data import core
+from data.graph import member_nodes, shared_graph
+from data.sparse import CSRMatrix
+
+class Member(core.Member):
+    __slots__ = ()
+
+    # Likes and comments are stored once; the *_to names are kept as aliases.
+    likes_to = core.Member.likes
+    comments_to = core.Member.comments
+
+    def shortest_path_to(self, other, members, trace=False):
         if self == other:
             return [self.member_id], []
+        if not trace:
+            if other._graph is not self._graph:
+                return [], []
+            path = shortest_path(self._graph, self._index, other._index)
+            return [self._graph.ids[node] for node in path], []
 
         visited = set()
         queue = deque([(self, [self.member_id])])
@@ -62,11 +45,32 @@ class Member:
             for neighbor in current.following:
                 if neighbor == other:
                     bfs_matrix.append([neighbor.member_id])
+                    if instrumentation.ENABLED:
+                        instrumentation.count('trace.bfs_dequeued', len(bfs_matrix) - 1)
                     return path + [neighbor.member_id], bfs_matrix
                 queue.append((neighbor, path + [neighbor.member_id]))
+        if instrumentation.ENABLED:
+            instrumentation.count('trace.bfs_dequeued', len(bfs_matrix))
         return [], bfs_matrix
 
-    def highest_engagement_path_to(self, other, members):
+    def highest_engagement_path_to(self, other, members, trace=False, max_nodes=DEFAULT_MAX_NODES, with_exact=False):
+        # with_exact appends whether the search finished within max_nodes;
+        # the traced search is exhaustive, so always exact.
+        if not trace:
+            exact = True
+            if self == other:
+                path, engagement = [self.member_id], 0
+            elif other._graph is not self._graph:
+                path, engagement = [], 0
+            else:
+                result = highest_engagement_path(self._graph, self._index, other._index, max_nodes=max_nodes)
+                # The search scores every member on the path; this report leaves out the target.
+                engagement = result.engagement - other.total_engagement() if result.path else 0
+                path, exact = result.path_ids(), result.exact
+                if engagement <= 0:
+                    path, engagement = [], 0
+            return (path, engagement, [], exact) if with_exact else (path, engagement, [])
+
         dfs_matrix = []
 
         def dfs(current, target, path, visited, engagement):
@@ -83,130 +87,126 @@ class Member:
             return max_path, max_engagement
 
         path, engagement = dfs(self, other, [self.member_id], {self}, 0)
-        return path, engagement, dfs_matrix
-
-
-class Network:
-    def __init__(self):
-        self.members = {}
+        if instrumentation.ENABLED:
+            instrumentation.count('trace.dfs_nodes_visited', len(dfs_matrix))
+        return (path, engagement, dfs_matrix, True) if with_exact else (path, engagement, dfs_matrix)
 
-    def add_member(self, member_id, name):
-        self.members[member_id] = Member(member_id, name)
 
-    def follow(self, follower_id, followee_id):
-        self.members[follower_id].follow(self.members[followee_id])
+class Network(core.Network):
+    member_class = Member
 
-    def like(self, liker_id, likee_id, count=1):
-        self.members[liker_id].like(self.members[likee_id], count)
 
-    def comment(self, commenter_id, commentee_id, count=1):
-        self.members[commenter_id].comment(self.members[commentee_id], count)
-
-
-def display_all_pairs_data(members, relationship_matrix, engagement_matrix):
+def display_all_pairs_data(members, relationship_matrix, engagement_matrix, trace=False, workers=1):
     summary_data = {
         'engagement_rates': {},
         'influences': defaultdict(dict),
         'shortest_paths': defaultdict(dict),
         'engagement_paths': defaultdict(dict)
     }
-    
-    for member in members.values():
-        total_likes = sum(member.likes.values())
-        total_comments = sum(member.comments.values())
-        followers_count = len(member.followers)
-        if followers_count > 0:
-            engagement_rate = (total_likes + total_comments) / followers_count * 100
-        else:
-            engagement_rate = 0
-        summary_data['engagement_rates'][member.member_id] = engagement_rate
+
+    for member_id, engagement_rate, influences, shortest_paths, engagement_paths in all_pairs_records(members, trace, workers):
+        summary_data['engagement_rates'][member_id] = engagement_rate
+        for other_id, influence in influences:
+            summary_data['influences'][member_id][other_id] = influence
+        for other_id, shortest_path in shortest_paths:
+            summary_data['shortest_paths'][member_id][other_id] = shortest_path
+        for other_id, engagement_path in engagement_paths:
+            summary_data['engagement_paths'][member_id][other_id] = engagement_path
+
+    return summary_data
+
+
+def all_pairs_records(members, trace=False, workers=1, sources=None, max_nodes=DEFAULT_MAX_NODES):
+    # Yields one (member_id, engagement_rate, influences, shortest_paths,
+    # engagement_paths) record per source member, so callers only hold one
+    # source's results at a time. sources limits the run to those member ids,
+    # for example the dirty members reported by Network.track_statistics().
+    # max_nodes caps each highest engagement path search (None: no cap);
+    # engagement path entries are (path, engagement, dfs_matrix, exact),
+    # exact being False for a capped search's best path found.
+    if trace:
+        yield from traced_all_pairs_records(members, sources)
+        return
+
+    graph = shared_graph(members)
+    ids = graph.ids
+    nodes = member_nodes(members).tolist()
+    source_nodes = nodes if sources is None else [members[member_id]._index for member_id in sources]
+    for block in all_pairs_blocks(graph, source_nodes, nodes, workers, max_nodes):
+        source, engagement_rate, influences, shortest_paths, shortest_times, engagement_paths, engagements, exact = block
+        influences = influences.tolist()
+        exact = exact.tolist()
+        influence_rows, shortest_rows, engagement_rows = [], [], []
+
+        for position, target in enumerate(nodes):
+            if target == source:
+                continue
+            other_id = ids[target]
+            influence_rows.append((other_id, influences[position]))
+
+            shortest_path = [ids[node] for node in unpack_path(*shortest_paths, position)]
+            if shortest_path:
+                shortest_rows.append((other_id, (shortest_path, float(shortest_times[position]), [])))
+            else:
+                shortest_rows.append((other_id, ([], 0, [])))
+
+            highest_engagement_path = [ids[node] for node in unpack_path(*engagement_paths, position)]
+            if highest_engagement_path:
+                engagement_rows.append((other_id, (highest_engagement_path, int(engagements[position]), [], exact[position])))
+            else:
+                engagement_rows.append((other_id, ([], 0, [], exact[position])))
+
+        yield ids[source], engagement_rate, influence_rows, shortest_rows, engagement_rows
+
+
+def traced_all_pairs_records(members, sources=None):
+    influences = influence_matrix(members)
+    source_members = members.values() if sources is None else [members[member_id] for member_id in sources]
+
+    for member in source_members:
+        influence_row = influences.dense_row(member._index).tolist()
+        influence_rows, shortest_rows, engagement_rows = [], [], []
 
         for other in members.values():
             if member != other:
-                likes_to_other = member.likes_to[other.member_id]
-                comments_to_other = member.comments_to[other.member_id]
-                total_engagement = member.total_engagement()
-                if total_engagement > 0:
-                    influence = (likes_to_other + comments_to_other) / total_engagement * 100
-                else:
-                    influence = 0
-                summary_data['influences'][member.member_id][other.member_id] = influence
+                influence_rows.append((other.member_id, influence_row[other._index]))
 
-                start_time = time.time()
-                shortest_path, bfs_matrix = member.shortest_path_to(other, members)
-                end_time = time.time()
-                shortest_path_time = end_time - start_time
+                start_time = time.perf_counter_ns()
+                shortest_path, bfs_matrix = member.shortest_path_to(other, members, trace=True)
+                elapsed = time.perf_counter_ns() - start_time
+                shortest_path_time = elapsed / 1e9
 
-                start_time = time.time()
-                highest_engagement_path, engagement, dfs_matrix = member.highest_engagement_path_to(other, members)
-                end_time = time.time()
-                highest_engagement_path_time = end_time - start_time
+                with instrumentation.timer('trace.highest_engagement_path'):
+                    highest_engagement_path, engagement, dfs_matrix, exact = member.highest_engagement_path_to(
+                        other, members, trace=True, with_exact=True
+                    )
+                if instrumentation.ENABLED:
+                    instrumentation.add_time('trace.shortest_path', elapsed)
 
                 if shortest_path:
-                    summary_data['shortest_paths'][member.member_id][other.member_id] = (shortest_path, shortest_path_time, bfs_matrix)
+                    shortest_rows.append((other.member_id, (shortest_path, shortest_path_time, bfs_matrix)))
                 else:
-                    summary_data['shortest_paths'][member.member_id][other.member_id] = ([], 0, [])
+                    shortest_rows.append((other.member_id, ([], 0, [])))
 
                 if highest_engagement_path:
-                    summary_data['engagement_paths'][member.member_id][other.member_id] = (highest_engagement_path, engagement, dfs_matrix)
+                    engagement_rows.append((other.member_id, (highest_engagement_path, engagement, dfs_matrix, exact)))
                 else:
-                    summary_data['engagement_paths'][member.member_id][other.member_id] = ([], 0, [])
+                    engagement_rows.append((other.member_id, ([], 0, [], exact)))
 
-    return summary_data
+        yield member.member_id, member.engagement_rate(), influence_rows, shortest_rows, engagement_rows
 
 
 def display_overall_statistics(members):
-    total_comments = sum(sum(member.comments.values()) for member in members.values())
-    total_likes = sum(sum(member.likes.values()) for member in members.values())
-    total_following = sum(len(member.followers) for member in members.values())
-    total_members = len(members)
-    all_engagement_rates = [member.engagement_rate() for member in members.values()]
-    mean_engagement_rate = np.mean(all_engagement_rates) if all_engagement_rates else 0
-    std_dev_engagement_rate = np.std(all_engagement_rates) if all_engagement_rates else 0
-
-    # Calculate coefficient and R-squared value
-    engagement_rates = np.array(all_engagement_rates).reshape(-1, 1)
-    followers_counts = np.array([len(member.followers) for member in members.values()]).reshape(-1, 1)
-    
-    if total_members > 1:
-        model = LinearRegression().fit(followers_counts, engagement_rates)
-        coefficient = model.coef_[0][0]
-        r_squared = model.score(followers_counts, engagement_rates)
-    else:
-        coefficient = None
-        r_squared = None
-
-    overall_stats = {
-        "Total comments": total_comments,
-        "Total likes": total_likes,
-        "Total following": total_following,
-        "Total members": total_members,
-        "Mean engagement rate": round(mean_engagement_rate, 2),
-        "Standard deviation of engagement rates": round(std_dev_engagement_rate, 2),
-        "Engagement rate vs Followers regression coefficient": round(coefficient, 2) if coefficient is not None else None,
-        "R-squared value": round(r_squared, 2) if r_squared is not None else None
-    }
-
-    return overall_stats
+    return overall_statistics(members)
 
 
 def create_relationship_matrix(members):
-    size = len(members)
-    matrix = np.zeros((size, size), dtype=int)
-    for member in members.values():
-        for followed in member.following:
-            matrix[member.member_id - 1][followed.member_id - 1] = 1
-    return matrix
+    graph = shared_graph(members)
+    indptr, indices = graph.out_csr()
+    return CSRMatrix(indptr, indices, np.ones(len(indices), dtype=int), (len(graph), len(graph)), graph.ids)
 
 def create_engagement_matrix(members):
-    size = len(members)
-    matrix = np.zeros((size, size), dtype=int)
-    for member in members.values():
-        for other_id, likes in member.likes.items():
-            matrix[member.member_id - 1][other_id - 1] += likes
-        for other_id, comments in member.comments.items():
-            matrix[member.member_id - 1][other_id - 1] += comments
-    return matrix
+    return shared_graph(members).engagement_matrix()
 
 def format_percentage(value):
     if value < 10:
@@ -217,64 +217,95 @@ def format_percentage(value):
         return f"{value:.2f}%"
 
 
-def save_to_csv(overall_stats, summary_data, members):
-    with open('network_summary.csv', mode='w', newline='') as file:
+def save_to_csv(overall_stats, summary_data, members, path='network_summary.csv', include_traces=None):
+    records = (
+        (
+            member_id,
+            rate,
+            summary_data['influences'].get(member_id, {}).items(),
+            summary_data['shortest_paths'].get(member_id, {}).items(),
+            summary_data['engagement_paths'].get(member_id, {}).items(),
+        )
+        for member_id, rate in summary_data['engagement_rates'].items()
+    )
+    stream_to_csv(overall_stats, records, path, include_traces)
+
+
+def stream_to_csv(overall_stats, records, path='network_summary.csv', include_traces=None):
+    # BFS/DFS Matrix rows are written for the records that carry a trace
+    # (all_pairs_records(trace=True)); include_traces=True writes them for
+    # every path, False never.
+    with open(path, mode='w', newline='') as file:
         writer = csv.writer(file)
-        
+
         # Overall Statistics
         writer.writerow(["Overall Statistics"])
         for key, value in overall_stats.items():
             writer.writerow([key, value])
-        
+
         writer.writerow([])  # Empty row for separation
-        
-        # Engagement Rates
+
+        # Engagement rates go straight to the file; the later sections are
+        # spooled to temporary files and appended once every record is in.
         writer.writerow(["Engagement Rates"])
-        for member_id, rate in summary_data['engagement_rates'].items():
-            writer.writerow([f"Member {member_id}", f"{rate:.2f}%"])
-        
-        writer.writerow([])  # Empty row for separation
-        
-        # Influences
-        writer.writerow(["Influences"])
-        for member_id, influences in summary_data['influences'].items():
-            for other_id, influence in influences.items():
-                writer.writerow([f"Influence of Member {member_id} on Member {other_id}", f"{influence:.2f}%"])
-        
-        writer.writerow([])  # Empty row for separation
-        
-        # Shortest Paths
-        writer.writerow(["Shortest Paths"])
-        for member_id, paths in summary_data['shortest_paths'].items():
-            for other_id, (path, shortest_path_time, bfs_matrix) in paths.items():
-                writer.writerow([f"Shortest path from Member {member_id} to Member {other_id}", path])
-                writer.writerow([f"BFS Matrix", bfs_matrix])
-        
-        writer.writerow([])  # Empty row for separation
-        
-        # Highest Engagement Paths
-        writer.writerow(["Highest Engagement Paths"])
-        for member_id, paths in summary_data['engagement_paths'].items():
-            for other_id, (path, engagement, dfs_matrix) in paths.items():
-                writer.writerow([f"Highest engagement path from Member {member_id} to Member {other_id}", path, f"{engagement:.2f}%"])
-                writer.writerow([f"DFS Matrix", dfs_matrix])
-
-def main():
-    start_time = time.time()
-    
-    network = Network()
-    
+        with tempfile.TemporaryFile('w+', newline='') as influences_file, \
+                tempfile.TemporaryFile('w+', newline='') as shortest_file, \
+                tempfile.TemporaryFile('w+', newline='') as engagement_file:
+            influences_writer = csv.writer(influences_file)
+            shortest_writer = csv.writer(shortest_file)
+            engagement_writer = csv.writer(engagement_file)
+
+            for member_id, rate, influences, shortest_paths, engagement_paths in records:
+                writer.writerow([f"Member {member_id}", f"{rate:.2f}%"])
+                for other_id, influence in influences:
+                    influences_writer.writerow([f"Influence of Member {member_id} on Member {other_id}", f"{influence:.2f}%"])
+                for other_id, (path, shortest_path_time, bfs_matrix) in shortest_paths:
+                    shortest_writer.writerow([f"Shortest path from Member {member_id} to Member {other_id}", path])
+                    if include_traces or (include_traces is None and bfs_matrix):
+                        shortest_writer.writerow([f"BFS Matrix", bfs_matrix])
+                for other_id, (path, engagement, dfs_matrix, exact) in engagement_paths:
+                    row = [f"Highest engagement path from Member {member_id} to Member {other_id}", path, f"{engagement:.2f}%"]
+                    # A capped search's path is only the best one found.
+                    engagement_writer.writerow(row if exact else row + ["best found"])
+                    if include_traces or (include_traces is None and dfs_matrix):
+                        engagement_writer.writerow([f"DFS Matrix", dfs_matrix])
+
+            for title, section_file in (("Influences", influences_file), ("Shortest Paths", shortest_file), ("Highest Engagement Paths", engagement_file)):
+                writer.writerow([])  # Empty row for separation
+                writer.writerow([title])
+                section_file.seek(0)
+                shutil.copyfileobj(section_file, file)
+
+def stream_to_jsonl(overall_stats, records, path='network_summary.jsonl'):
+    # One JSON object per line: the overall statistics, then one line per
+    # source member, written as the records arrive.
+    with open(path, 'w') as file:
+        file.write(json.dumps({'overall_statistics': overall_stats}) + "\n")
+        for member_id, rate, influences, shortest_paths, engagement_paths in records:
+            file.write(json.dumps({
+                'member_id': member_id,
+                'engagement_rate': rate,
+                'influences': {other_id: influence for other_id, influence in influences},
+                'shortest_paths': {other_id: path for other_id, (path, _, _) in shortest_paths},
+                'engagement_paths': {
+                    other_id: {'path': path, 'engagement': engagement, 'exact': exact}
+                    for other_id, (path, engagement, _, exact) in engagement_paths
+                },
+            }) + "\n")
+
+
+def random_network(network, num_members=9, seed=None):
+    rng = random.Random(seed)
+
     # Adding members
-    for i in range(1, 10):
+    for i in range(1, num_members + 1):
         network.add_member(i, f"Member{i}")
-    
-    members = network.members
 
-    # Establishing follow relationships randomly
-    member_ids = list(members.keys())
-    for member_id in member_ids:
-        num_following = random.randint(1, min(5, len(member_ids) - 1))  # Increase the number of possible followings
-        following = random.sample([m for m in member_ids if m != member_id], num_following)
+    # Establishing follow relationships randomly (a lone member has nobody to follow)
+    member_ids = list(network.members.keys())
+    for member_id in member_ids if len(member_ids) > 1 else ():
+        num_following = rng.randint(1, min(5, len(member_ids) - 1))  # Increase the number of possible followings
+        following = rng.sample([m for m in member_ids if m != member_id], num_following)
         for followee_id in following:
             network.follow(member_id, followee_id)
 
@@ -282,118 +313,17 @@ def main():
     for member_id in member_ids:
         for other_member_id in member_ids:
             if member_id != other_member_id:
-                likes = random.randint(0, 5)  # Increase range for likes
-                comments = random.randint(0, 3)  # Increase range for comments
+                likes = rng.randint(0, 5)  # Increase range for likes
+                comments = rng.randint(0, 3)  # Increase range for comments
                 network.like(member_id, other_member_id, likes)
                 network.comment(member_id, other_member_id, comments)
-    
-    relationship_matrix = create_relationship_matrix(members)
-    engagement_matrix = create_engagement_matrix(members)
+    return network
 
-    summary_data = display_all_pairs_data(members, relationship_matrix, engagement_matrix)
-    overall_stats = display_overall_statistics(members)
 
-    save_to_csv(overall_stats, summary_data, members)
-    
-    end_time = time.time()
-    total_execution_time = end_time - start_time
-    minutes, seconds = divmod(total_execution_time, 60)
-    print(f"\nTotal execution time: {int(minutes)} minutes {seconds:.4f} seconds")
+def main(argv=None):
+    # The command line lives in cli.py, which imports this module lazily.
+    from cli import main as cli_main
+    return cli_main(argv)
 
 if __name__ == '__main__':
     main()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,19 @@
+import random
+from main import Network
+
+def build_network(num_members, seed, acyclic=False, min_following=1, max_following=3, interactions=True):
+    rng = random.Random(seed)
+    network = Network()
+    for i in range(1, num_members + 1):
+        network.add_member(i, f"Member{i}")
+    for member_id in range(1, num_members + 1):
+        candidates = [m for m in range(1, num_members + 1) if (m > member_id if acyclic else m != member_id)]
+        for followee_id in rng.sample(candidates, min(len(candidates), rng.randint(min_following, max_following))):
+            network.follow(member_id, followee_id)
+        if not interactions:
+            continue
+        for other_id in range(1, num_members + 1):
+            if other_id != member_id:
+                network.like(member_id, other_id, rng.randint(0, 3))
+                network.comment(member_id, other_id, rng.randint(0, 1))
+    return network
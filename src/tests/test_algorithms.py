@@ -3,7 +3,8 @@ import numpy as np
 from data.member import Member
 from data.network import Network
 from algorithms.path_finding import dijkstra, find_highest_engagement_path
-from algorithms.influence import calculate_influence
+from algorithms.influence import calculate_influence, influence_matrix, top_influenced
+from algorithms.statistics import linear_fit
 from sklearn.linear_model import LinearRegression
 import random
 
@@ -52,6 +53,36 @@ class TestAlgorithms(unittest.TestCase):
         actual_influence = calculate_influence(self.alice, self.bob)
         self.assertAlmostEqual(actual_influence, expected_influence, places=2)
 
+    def test_influence_matrix_matches_pairwise(self):
+        self.bob.like(self.alice, 4)
+        self.bob.comment(self.dave, 1)
+        matrix = influence_matrix(self.members)
+        for member in self.members.values():
+            row = matrix.dense_row(member._index)
+            for other in self.members.values():
+                self.assertEqual(round(row[other._index], 2), calculate_influence(member, other))
+
+    def test_top_influenced(self):
+        self.alice.like(self.bob, 1)
+        top = dict(top_influenced(self.members, 2))
+        self.assertEqual(top[1][0], (2, 6 / 21 * 100))
+        self.assertIn(top[1][1][0], (3, 6))
+        self.assertAlmostEqual(top[1][1][1], 5 / 21 * 100)
+        self.assertEqual(top[4], [])
+
+    def test_linear_fit_matches_sklearn(self):
+        rng = np.random.default_rng(4)
+        cases = [
+            (rng.integers(0, 10, 30), rng.random(30) * 500),
+            (np.full(5, 3), np.array([1.0, 2.0, 3.0, 4.0, 5.0])),
+            (np.array([1, 2, 3]), np.zeros(3)),
+        ]
+        for x, y in cases:
+            model = LinearRegression().fit(x.reshape(-1, 1), y)
+            coefficient, r_squared = linear_fit(x, y)
+            self.assertAlmostEqual(coefficient, model.coef_[0], places=8)
+            self.assertAlmostEqual(r_squared, model.score(x.reshape(-1, 1), y), places=8)
+
     def test_dijkstra(self):
         path = dijkstra(self.members, 1, 2)  # Shortest path from Alice (1) to Bob (2)
         self.assertEqual(path, [1, 5, 2])  # Should be [1, 5, 2]
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from algorithms import all_pairs
+from main import all_pairs_records, display_all_pairs_data, display_overall_statistics, save_to_csv, stream_to_csv
+from tests.helpers import build_network
+
+class TestAllPairs(unittest.TestCase):
+
+    def setUp(self):
+        self.members = build_network(12, seed=17).members
+
+    def test_parallel_matches_serial(self):
+        serial = display_all_pairs_data(self.members, None, None)
+        parallel = display_all_pairs_data(self.members, None, None, workers=3)
+        self.assertEqual(list(parallel['engagement_rates'].items()), list(serial['engagement_rates'].items()))
+        self.assertEqual(parallel['influences'], serial['influences'])
+        self.assertEqual(list(parallel['influences'][5]), list(serial['influences'][5]))
+        self.assertEqual(parallel['engagement_paths'], serial['engagement_paths'])
+        self.assertEqual(
+            {m: {o: p[0] for o, p in paths.items()} for m, paths in parallel['shortest_paths'].items()},
+            {m: {o: p[0] for o, p in paths.items()} for m, paths in serial['shortest_paths'].items()},
+        )
+
+    def test_workers_keep_a_bounded_window_of_shards(self):
+        submitted = []
+
+        class CountingPool(ThreadPoolExecutor):
+            def submit(self, function, *args):
+                submitted.append(args[0])
+                return super().submit(function, *args)
+
+        graph = self.members.graph
+        nodes = list(range(len(graph)))
+        with mock.patch('concurrent.futures.ProcessPoolExecutor', CountingPool), \
+                mock.patch.object(all_pairs, 'SHARDS_PER_WORKER', 6):
+            blocks = all_pairs.all_pairs_blocks(graph, nodes, nodes, workers=2)
+            consumed = []
+            for block in blocks:
+                consumed.append(block[0])
+                in_flight = len(submitted) - sum(1 for shard in submitted if shard[-1] in consumed)
+                self.assertLessEqual(in_flight, all_pairs.IN_FLIGHT_PER_WORKER * 2)
+        self.assertEqual(consumed, nodes)
+        self.assertEqual(len(submitted), 12)
+
+    def test_traced_run_agrees_with_engine(self):
+        summary_data = display_all_pairs_data(self.members, None, None)
+        traced = display_all_pairs_data(self.members, None, None, trace=True)
+        self.assertEqual(summary_data['engagement_rates'], traced['engagement_rates'])
+        for member_id, paths in traced['engagement_paths'].items():
+            for other_id, (path, engagement, dfs_matrix, exact) in paths.items():
+                self.assertTrue(exact)
+                self.assertEqual(summary_data['engagement_paths'][member_id][other_id][1:], (engagement, [], True))
+        for member_id, paths in traced['shortest_paths'].items():
+            for other_id, (path, _, bfs_matrix) in paths.items():
+                self.assertEqual(summary_data['shortest_paths'][member_id][other_id][0], path)
+
+    def test_streamed_csv_matches_saved_summary(self):
+        overall_stats = display_overall_statistics(self.members)
+        with tempfile.TemporaryDirectory() as directory:
+            saved_path = os.path.join(directory, 'saved.csv')
+            streamed_path = os.path.join(directory, 'streamed.csv')
+            full_path = os.path.join(directory, 'full.csv')
+            traced_path = os.path.join(directory, 'traced.csv')
+            save_to_csv(overall_stats, display_all_pairs_data(self.members, None, None), self.members, saved_path)
+            stream_to_csv(overall_stats, all_pairs_records(self.members), streamed_path)
+            stream_to_csv(overall_stats, all_pairs_records(self.members), full_path, include_traces=True)
+            stream_to_csv(overall_stats, all_pairs_records(self.members, trace=True), traced_path)
+            with open(saved_path) as saved, open(streamed_path) as streamed, open(full_path) as full, \
+                    open(traced_path) as traced:
+                saved_rows = saved.read().splitlines()
+                streamed_rows = streamed.read().splitlines()
+                full_rows = full.read().splitlines()
+                traced_rows = traced.read().splitlines()
+        self.assertEqual(streamed_rows, saved_rows)
+        # Untraced records carry no BFS/DFS trace, so no trace rows are written.
+        self.assertIn("Highest Engagement Paths", streamed_rows)
+        self.assertFalse(any(row.startswith(("BFS Matrix", "DFS Matrix")) for row in streamed_rows))
+        self.assertEqual(len(full_rows), len(streamed_rows) + 2 * 12 * 11)
+        self.assertTrue(any(row.startswith("BFS Matrix,") and row != "BFS Matrix,[]" for row in traced_rows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from cli import main as run_cli, with_default_command
+from data.loader import load_saved_network
+from data.results import ResultsReader
+from main import Network, random_network
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def run_cli(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run_cli(list(argv))
+        return output.getvalue()
+
+    def test_import_main_skips_heavy_modules(self):
+        code = "import sys, main; print(sorted(m for m in ('sklearn', 'concurrent.futures', 'cProfile') if m in sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], cwd=SRC, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+    def test_generate_then_query(self):
+        network = self.path('network')
+        self.run_cli('generate', '--members', '300', '--seed', '1', '--output', network)
+        stats = json.loads(self.run_cli('stats', '--input', network, '--format', 'json'))
+        self.assertEqual(stats['Total members'], 300)
+        result = json.loads(self.run_cli('path', '--input', network, '5', '1', '--engagement', '--max-path-nodes', '2000', '--format', 'json'))
+        self.assertEqual(result['shortest_path'][0], 5)
+        self.assertEqual(result['shortest_path'][-1], 1)
+        self.assertEqual(result['highest_engagement_path'][-1], 1)
+        analysis = json.loads(self.run_cli('analyze', '--input', network, '--top', '3', '--format', 'json'))
+        self.assertEqual(len(analysis['top_by_influence']), 3)
+        self.assertEqual(analysis['overall_statistics'], stats)
+
+    def test_load_keeps_members_and_edges(self):
+        follows = self.path('follows.csv')
+        with open(follows, 'w') as file:
+            file.write("follower,followee\n10,20\n20,30\n")
+        likes = self.path('likes.csv')
+        with open(likes, 'w') as file:
+            file.write("10,30,4\n")
+        network_directory = self.path('network')
+        self.run_cli('load', follows, '--likes', likes, '--output', network_directory)
+        self.assertIn("10 -> 20 -> 30", self.run_cli('path', '--input', network_directory, '10', '30'))
+        self.assertIn("no path", self.run_cli('path', '--input', network_directory, '30', '10'))
+
+        network = random_network(Network(), 12, seed=4)
+        network.add_member(99, "Member99")
+        saved = self.path('saved')
+        from data.loader import save_network
+        save_network(network, saved)
+        loaded = Network()
+        load_saved_network(loaded, saved)
+        self.assertEqual(list(loaded.members), list(network.members))
+        for member_id, member in network.members.items():
+            other = loaded.members[member_id]
+            self.assertEqual(sorted(m.member_id for m in other.following), sorted(m.member_id for m in member.following))
+            self.assertEqual(other.total_engagement(), member.total_engagement())
+
+    def test_export_formats(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.assertIn("Total execution time", self.run_cli())
+            self.run_cli('export', '--members', '6', '--seed', '2', '--trace', '--output', 'traced.csv')
+            self.run_cli('export', '--members', '6', '--seed', '2', '--trace', '--no-traces', '--output', 'lean.csv')
+            self.run_cli('export', '--members', '6', '--seed', '2', '--format', 'jsonl', '--output', 'summary.jsonl')
+            self.run_cli('export', '--members', '6', '--seed', '2', '--format', 'npz')
+            self.run_cli('export', '--members', '6', '--seed', '2', '--format', 'npy', '--output', 'columns')
+            archive, columns = ResultsReader('network_summary.npz'), ResultsReader('columns')
+            csv_text = {}
+            for name in ('network_summary.csv', 'traced.csv', 'lean.csv'):
+                with open(name) as file:
+                    csv_text[name] = file.read()
+            with open('summary.jsonl') as file:
+                lines = [json.loads(line) for line in file]
+        finally:
+            os.chdir(cwd)
+        self.assertNotIn("BFS Matrix", csv_text['network_summary.csv'])
+        self.assertIn("BFS Matrix", csv_text['traced.csv'])
+        self.assertIn("DFS Matrix", csv_text['traced.csv'])
+        self.assertNotIn("BFS Matrix", csv_text['lean.csv'])
+        self.assertEqual(lines[0]['overall_statistics']['Total members'], 6)
+        self.assertEqual([line['member_id'] for line in lines[1:]], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(len(lines[1]['influences']), 5)
+        for results in (archive, columns):
+            self.assertEqual(len(results), 6)
+            self.assertEqual(results.overall_stats, lines[0]['overall_statistics'])
+            self.assertEqual(results.engagement_rate(1), lines[1]['engagement_rate'])
+
+    def test_capped_paths_are_marked(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            for output in ('capped.csv', 'capped.jsonl', 'capped.npz'):
+                self.run_cli('export', '--members', '12', '--seed', '2', '--max-path-nodes', '1',
+                             '--format', output.split('.')[1], '--output', output)
+            with open('capped.csv') as file:
+                capped_rows = [line for line in file if line.startswith("Highest engagement path")]
+            with open('capped.jsonl') as file:
+                lines = [json.loads(line) for line in file][1:]
+            results = ResultsReader('capped.npz')
+        finally:
+            os.chdir(cwd)
+        self.assertTrue(any(row.rstrip().endswith("best found") for row in capped_rows))
+        inexact = {line['member_id']: sorted(int(other_id) for other_id, entry in line['engagement_paths'].items()
+                                             if not entry['exact']) for line in lines}
+        self.assertTrue(any(inexact.values()))
+        for member_id, targets in inexact.items():
+            self.assertEqual(results.inexact_engagement_paths(member_id), targets)
+
+    def test_default_command_takes_the_options(self):
+        self.assertEqual(with_default_command(['--members', '5', '--seed', '1']), ['export', '--members', '5', '--seed', '1'])
+        self.assertEqual(with_default_command(['--instrument', '--profile', 'cpu', '--report=r.json', '--output', 'stats']),
+                         ['--instrument', '--profile', 'cpu', '--report=r.json', 'export', '--output', 'stats'])
+        self.assertEqual(with_default_command(['--instrument', 'stats', '--members', '3']), ['--instrument', 'stats', '--members', '3'])
+        self.assertEqual(with_default_command(['--help']), ['--help'])
+        self.assertEqual(with_default_command([]), ['export'])
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.run_cli('--members', '5', '--seed', '1', '--output', 'stats')
+            with open('stats') as file:
+                self.assertIn("Total members,5", file.read())
+        finally:
+            os.chdir(cwd)
+
+    def test_tiny_networks(self):
+        for members in ('0', '1'):
+            self.assertIn(f"Total members: {members}", self.run_cli('stats', '--members', members))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from tests.helpers import build_network
+from algorithms.engagement_paths import DEFAULT_MAX_NODES, highest_engagement_path
+from algorithms.path_finding import find_highest_engagement_path
+
+class TestEngagementPaths(unittest.TestCase):
+
+    def test_exact_matches_exhaustive_dfs(self):
+        network = build_network(9, seed=3)
+        members = network.members
+        for member in members.values():
+            for other in members.values():
+                if member == other:
+                    continue
+                expected_path, expected, _ = member.highest_engagement_path_to(other, members, trace=True)
+                path, engagement, dfs_matrix = member.highest_engagement_path_to(other, members)
+                self.assertEqual(engagement, expected)
+                self.assertEqual(bool(path), bool(expected_path))
+                self.assertEqual(dfs_matrix, [])
+
+    def test_dag_mode_is_exact_on_acyclic_graph(self):
+        network = build_network(12, seed=5, acyclic=True)
+        graph = network.graph
+        for source in range(len(graph)):
+            for target in range(len(graph)):
+                exact = highest_engagement_path(graph, source, target)
+                dag = highest_engagement_path(graph, source, target, mode='dag')
+                self.assertEqual(dag.engagement, exact.engagement)
+                self.assertTrue(dag.exact)
+
+    def test_dag_mode_reports_best_found_on_cycles(self):
+        network = build_network(10, seed=11)
+        graph = network.graph
+        exact = highest_engagement_path(graph, 0, 9)
+        dag = highest_engagement_path(graph, 0, 9, mode='dag')
+        self.assertTrue(exact.exact)
+        self.assertFalse(dag.exact)
+        self.assertLessEqual(dag.engagement, exact.engagement)
+        self.assertEqual(dag.path[0], 0)
+        self.assertEqual(dag.path[-1], 9)
+        self.assertEqual(len(set(dag.path)), len(dag.path))
+        self.assertEqual(dag.engagement, sum(graph.total_engagement(node) for node in dag.path))
+
+    def test_hop_limit_and_budget(self):
+        network = build_network(10, seed=11, max_following=5)
+        graph = network.graph
+        exact = highest_engagement_path(graph, 0, 9)
+        limited = highest_engagement_path(graph, 0, 9, mode='hops', max_hops=3)
+        self.assertLessEqual(len(limited.path) - 1, 3)
+        self.assertLessEqual(limited.engagement, exact.engagement)
+        if len(exact.path) - 1 > 3:
+            self.assertFalse(limited.exact)
+        self.assertGreater(exact.expanded, 2)
+        budgeted = highest_engagement_path(graph, 0, 9, max_nodes=2)
+        self.assertFalse(budgeted.exact)
+        self.assertLessEqual(budgeted.expanded, 3)
+
+    def test_default_budget_reports_best_found(self):
+        network = build_network(40, seed=2, max_following=8)
+        members = network.members
+        capped = highest_engagement_path(network.graph, 0, 39)
+        self.assertFalse(capped.exact)
+        self.assertLessEqual(capped.expanded, DEFAULT_MAX_NODES + 1)
+        self.assertEqual(capped.path_ids()[-1], 40)
+        path, engagement, _, exact = members[1].highest_engagement_path_to(members[40], members, with_exact=True)
+        self.assertEqual(path, capped.path_ids())
+        self.assertFalse(exact)
+        self.assertEqual(find_highest_engagement_path(members, 1, 40, with_exact=True), (path, capped.engagement, False))
+        self.assertEqual(len(members[1].highest_engagement_path_to(members[40], members)), 3)
+
+    def test_unknown_mode(self):
+        network = build_network(3, seed=1)
+        with self.assertRaises(ValueError):
+            highest_engagement_path(network.graph, 0, 1, mode='greedy')
+
+if __name__ == '__main__':
+    unittest.main()
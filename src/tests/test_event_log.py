@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+import main
+from data import network as data_network
+from data.event_log import HEADER, RECORD, read_log
+from main import display_overall_statistics, random_network
+
+def summary(network):
+    return {
+        member_id: (
+            member.name,
+            sorted(other.member_id for other in member.following),
+            sorted(other.member_id for other in member.followers),
+            dict(member.likes),
+            dict(member.comments),
+        )
+        for member_id, member in network.members.items()
+    }
+
+def make_changes(network):
+    random_network(network, 12, seed=3)
+    network.add_member(1000, "A name much longer than one log record can hold, Ωmega")
+    network.follow(1000, 2)
+    network.unfollow(1000, 2)
+    network.follow(1000, 2)
+    network.follow(1, 2)
+    network.unfollow(1, 2)
+    network.like(1000, 5, 3)
+    network.comment(5, 1000, 2)
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.directory.name, 'network.snap')
+        self.log = os.path.join(self.directory.name, 'events.log')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replay_both_facades(self):
+        for module in (main, data_network):
+            network = module.Network()
+            network.log_events(self.log, batch_size=7)
+            make_changes(network)
+            network.event_log.close()
+            restored = module.Network.restore(self.snapshot, self.log)
+            self.assertIsInstance(restored.members[1000], module.Member)
+            self.assertEqual(summary(restored), summary(network))
+            self.assertEqual(display_overall_statistics(restored.members), display_overall_statistics(network.members))
+            self.assertEqual(restored.event_log.replayed.new_members, 13)
+            restored.event_log.close()
+            os.remove(self.log)
+
+    def test_compaction_into_snapshot(self):
+        network = main.Network()
+        network.log_events(self.log)
+        make_changes(network)
+        network.save_snapshot(self.snapshot)
+        self.assertEqual(os.path.getsize(self.log), HEADER.size)
+        self.assertEqual(network.event_log.generation, 1)
+        stale = os.path.join(self.directory.name, 'stale.log')
+        network.follow(1000, 7)
+        network.like(7, 1000, 2)
+        network.add_member(2000, "Late")
+        network.event_log.flush()
+        shutil.copy(self.log, stale)
+        network.event_log.close()
+
+        restored = main.Network.restore(self.snapshot, self.log)
+        self.assertEqual(summary(restored), summary(network))
+        self.assertEqual(restored.event_log.replayed.rows, 3)
+        restored.save_snapshot(self.snapshot)
+        restored.event_log.close()
+
+        # A log the newer snapshot already holds is dropped, not replayed twice.
+        shutil.copy(stale, self.log)
+        again = main.Network.restore(self.snapshot, self.log)
+        self.assertEqual(summary(again), summary(network))
+        self.assertEqual(again.event_log.replayed.rows, 0)
+        self.assertEqual(read_log(self.log).generation, 2)
+        again.event_log.close()
+
+    def test_close_warns_about_unlogged_changes(self):
+        network = main.Network()
+        network.add_member(1, "One")
+        network.log_events(self.log)
+        network.add_member(2, "Two")
+        network.add_follows([1], [2])
+        with self.assertWarnsRegex(RuntimeWarning, "save a snapshot"):
+            network.event_log.close()
+        restored = main.Network.restore(self.snapshot, self.log)
+        self.assertEqual(sorted(restored.members), [2])
+        restored.event_log.close()
+
+        os.remove(self.log)
+        network.log_events(self.log)
+        network.add_follows([2], [1])
+        network.save_snapshot(self.snapshot)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            network.event_log.close()
+
+    def test_network_keeps_its_graph_when_members_join(self):
+        network = main.Network()
+        network.log_events(self.log)
+        network.add_member(1, "One")
+        network.add_member(2, "Two")
+        statistics = network.track_statistics()
+        outsiders = [main.Member(member_id, f"Outsider{member_id}") for member_id in range(10, 15)]
+        for outsider in outsiders[1:]:
+            outsiders[0].follow(outsider)
+        network.members[1].follow(outsiders[0])
+        self.assertIs(outsiders[0]._graph, network.graph)
+        self.assertIn(14, network.members)
+        network.follow(1, 2)
+        network.like(1, 2, 5)
+        self.assertEqual(statistics.overall()['Total likes'], 5)
+        other = main.Network()
+        other.add_member(3, "Three")
+        with self.assertRaisesRegex(ValueError, "two different networks"):
+            other.members[3].follow(network.members[1])
+        with self.assertWarnsRegex(RuntimeWarning, "save a snapshot"):
+            network.event_log.close()
+
+        restored = main.Network.restore(self.snapshot, self.log)
+        # Joining members are logged one by one; only their own follows came in bulk.
+        self.assertEqual(sorted(m.member_id for m in restored.members[1].following), [2, 10])
+        self.assertEqual(len(restored.members[10].following), 0)
+        self.assertEqual(restored.members[1].likes[2], 5)
+        restored.event_log.close()
+
+    def test_torn_batch_is_dropped(self):
+        network = main.Network()
+        network.log_events(self.log)
+        network.add_member(1, "One")
+        network.add_member(2, "Two")
+        network.event_log.flush()
+        network.follow(1, 2)
+        network.event_log.flush()
+        network.event_log.close()
+        with open(self.log, 'r+b') as file:
+            # Breaks the checksum of the second batch and adds half a record.
+            file.seek(-RECORD.itemsize * 2, os.SEEK_END)
+            file.write(b'\xff')
+            file.seek(0, os.SEEK_END)
+            file.write(b'\x01' * 10)
+        self.assertTrue(read_log(self.log).torn)
+
+        restored = main.Network.restore(self.snapshot, self.log)
+        self.assertEqual(sorted(restored.members), [1, 2])
+        self.assertEqual(len(restored.members[1].following), 0)
+        restored.follow(2, 1)
+        restored.event_log.close()
+        self.assertFalse(read_log(self.log).torn)
+        again = main.Network.restore(self.snapshot, self.log)
+        self.assertEqual([m.member_id for m in again.members[2].following], [1])
+        again.event_log.close()
+
+    def test_large_counts_and_checks(self):
+        network = main.Network()
+        network.log_events(self.log)
+        network.add_member(1, "One")
+        network.add_member(2, "Two")
+        network.like(1, 2, 5 * 2 ** 31)
+        network.event_log.close()
+        restored = main.Network.restore(self.snapshot, self.log)
+        self.assertEqual(restored.members[1].likes[2], 5 * 2 ** 31)
+        restored.event_log.close()
+        with self.assertRaisesRegex(ValueError, "already exists"):
+            main.Network().log_events(self.log)
+
+        other = main.Network()
+        other.log_events(os.path.join(self.directory.name, 'names.log'))
+        with self.assertRaisesRegex(ValueError, "integer member ids"):
+            other.add_member('a', "Letters")
+
+if __name__ == '__main__':
+    unittest.main()
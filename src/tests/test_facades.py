@@ -0,0 +1,64 @@
+import unittest
+import main
+from algorithms.influence import calculate_influence
+from algorithms.path_finding import dijkstra, find_highest_engagement_path
+from data import core
+from data import network as data_network
+from main import display_overall_statistics, random_network
+
+class TestFacades(unittest.TestCase):
+
+    def setUp(self):
+        self.networks = [random_network(module.Network(), 25, seed=11) for module in (main, data_network)]
+        for network in self.networks:
+            network.add_member(100, "Loner")
+            network.unfollow(1, next(iter(network.members[1].following)).member_id)
+
+    def test_share_one_core(self):
+        for module in (main, data_network):
+            network = module.Network()
+            self.assertIsInstance(network, core.Network)
+            network.add_member(1, "Alice")
+            self.assertIsInstance(network.members[1], module.Member)
+            self.assertIsInstance(network.members[1], core.Member)
+            self.assertFalse(hasattr(network.members[1], '__dict__'))
+
+    def test_identical_members(self):
+        main_network, data_facade = self.networks
+        self.assertEqual(list(main_network.members), list(data_facade.members))
+        for member_id, member in main_network.members.items():
+            other = data_facade.members[member_id]
+            self.assertEqual(other.name, member.name)
+            self.assertEqual({m.member_id for m in other.following}, {m.member_id for m in member.following})
+            self.assertEqual({m.member_id for m in other.followers}, {m.member_id for m in member.followers})
+            self.assertEqual(dict(other.likes), dict(member.likes_to))
+            self.assertEqual(dict(other.comments), dict(member.comments_to))
+            self.assertEqual(other.total_engagement(), member.total_engagement())
+            # The data facade reports engagement rates rounded to two places.
+            self.assertEqual(other.engagement_rate(), round(member.engagement_rate(), 2))
+            for target_id in (1, 7, 100):
+                self.assertEqual(
+                    calculate_influence(other, data_facade.members[target_id]),
+                    calculate_influence(member, main_network.members[target_id]),
+                )
+        self.assertEqual(display_overall_statistics(data_facade.members), display_overall_statistics(main_network.members))
+
+    def test_identical_queries(self):
+        main_network, data_facade = self.networks
+        for k in (1, 5):
+            self.assertEqual(data_facade.top_by_total_engagement(k), main_network.top_by_total_engagement(k))
+            self.assertEqual(data_facade.top_by_influence(k), main_network.top_by_influence(k))
+            self.assertEqual(data_facade.top_influenced_by(3, k), main_network.top_influenced_by(3, k))
+        for source, target in ((1, 25), (4, 9), (100, 2), (6, 100)):
+            self.assertEqual(data_facade.shortest_path(source, target), main_network.shortest_path(source, target))
+            self.assertEqual(data_facade.can_reach(source, target), main_network.can_reach(source, target))
+            self.assertEqual(dijkstra(data_facade.members, source, target), dijkstra(main_network.members, source, target))
+            self.assertEqual(
+                find_highest_engagement_path(data_facade.members, source, target, max_nodes=2000),
+                find_highest_engagement_path(main_network.members, source, target, max_nodes=2000),
+            )
+            path, _ = main_network.members[source].shortest_path_to(main_network.members[target], main_network.members)
+            self.assertEqual(len(path), len(main_network.shortest_path(source, target)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from benchmark import SCENARIOS, main as run_benchmark
+from data.generator import power_law_network
+from data.loader import load_network
+from main import Network, display_overall_statistics
+
+class TestGenerator(unittest.TestCase):
+
+    def test_seeded_power_law_network(self):
+        network = power_law_network(3000, seed=4)
+        again = power_law_network(3000, seed=4)
+        np.testing.assert_array_equal(network.follows, again.follows)
+        np.testing.assert_array_equal(network.likes, again.likes)
+        follows = network.follows
+        self.assertFalse((follows[:, 0] == follows[:, 1]).any())
+        self.assertEqual(len(np.unique(follows, axis=0)), len(follows))
+        self.assertTrue(((follows >= 1) & (follows <= 3000)).all())
+        followers = np.bincount(follows[:, 1], minlength=3001)[1:]
+        self.assertGreater(followers.max(), 20 * np.median(followers))
+        self.assertTrue((network.likes[:, 2] >= 1).all())
+        self.assertFalse(np.array_equal(power_law_network(3000, seed=5).follows, follows))
+
+    def test_build_matches_loader(self):
+        synthetic = power_law_network(300, seed=2)
+        built = synthetic.build(Network())
+        loaded = Network()
+        with tempfile.TemporaryDirectory() as directory:
+            paths = synthetic.save(directory)
+            load_network(loaded, paths['follows'], paths['likes'], paths['comments'])
+        self.assertEqual(display_overall_statistics(built.members), display_overall_statistics(loaded.members))
+
+    def test_benchmark_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.json')
+            run_benchmark(['--members', '200', '--queries', '10', '--export-members', '15', '--output', path])
+            with open(path) as file:
+                report = json.load(file)
+        self.assertEqual(report['members'], 200)
+        self.assertEqual(list(report['scenarios']), list(SCENARIOS))
+        for name in ('shortest_path', 'highest_engagement_path', 'influence'):
+            self.assertEqual(report['scenarios'][name]['operations'], 10)
+            self.assertLessEqual(report['scenarios'][name]['p50_ms'], report['scenarios'][name]['p99_ms'])
+        self.assertGreater(report['peak_rss_bytes'], 0)
+        self.assertGreaterEqual(report['scenarios']['ingest']['peak_rss_growth_bytes'], 0)
+        self.assertLess(report['scenarios']['member_memory']['bytes_per_member'], 1024)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import unittest
+import numpy as np
+from data.graph import Graph, GraphListener, MIN_COMPACT_EDGES
+from data.member import Member
+from data.network import Network
+from data.sparse import SparseCounts
+from main import Member as MainMember, create_engagement_matrix
+
+class TestGraph(unittest.TestCase):
+
+    def test_bulk_follows_build_csr(self):
+        network = Network()
+        for i in range(1, 5):
+            network.add_member(i, f"Member{i}")
+        network.add_follows([1, 1, 2, 3, 1], [2, 3, 3, 4, 2])
+        indptr, indices = network.graph.out_csr()
+        self.assertEqual(indices.dtype, np.int32)
+        self.assertEqual(indptr.tolist(), [0, 2, 3, 4, 4])
+        self.assertEqual(indices.tolist(), [1, 2, 2, 3])
+        in_indptr, in_indices = network.graph.in_csr()
+        self.assertEqual(in_indptr.tolist(), [0, 0, 1, 3, 4])
+        self.assertEqual(in_indices.tolist(), [0, 0, 1, 2])
+        self.assertEqual({m.member_id for m in network.members[3].followers}, {1, 2})
+
+    def test_single_follows_match_bulk(self):
+        single = Network()
+        bulk = Network()
+        for i in range(1, 40):
+            single.add_member(i, f"Member{i}")
+            bulk.add_member(i, f"Member{i}")
+        edges = [(i, (i * 7) % 39 + 1) for i in range(1, 40)] * 2
+        for follower_id, followee_id in edges:
+            single.follow(follower_id, followee_id)
+        bulk.add_follows([e[0] for e in edges], [e[1] for e in edges])
+        self.assertEqual(single.graph.num_edges, 39)
+        for member_id in range(1, 40):
+            self.assertEqual(
+                {m.member_id for m in single.members[member_id].following},
+                {m.member_id for m in bulk.members[member_id].following},
+            )
+
+    def test_pending_edges_compact(self):
+        graph = Graph()
+        members = [Member(i, f"Member{i}", graph) for i in range(MIN_COMPACT_EDGES + 2)]
+        for member in members[1:]:
+            members[0].follow(member)
+        self.assertEqual(len(members[0].following), MIN_COMPACT_EDGES + 1)
+        self.assertIn(members[0], members[-1].followers)
+        self.assertEqual(graph.num_edges, MIN_COMPACT_EDGES + 1)
+
+    def test_standalone_members_merge_graphs(self):
+        alice = Member(1, "Alice")
+        bob = Member(2, "Bob")
+        charlie = Member(3, "Charlie")
+        bob.follow(charlie)
+        alice.follow(bob)
+        self.assertIs(alice._graph, charlie._graph)
+        self.assertEqual(alice._graph.ids, [2, 3, 1])
+        self.assertIn(charlie, bob.following)
+        self.assertNotIn(alice, charlie.followers)
+
+    def test_followers_add_creates_edge(self):
+        alice = Member(1, "Alice")
+        bob = Member(2, "Bob")
+        alice.followers.add(bob)
+        alice.followers.add(bob)
+        self.assertEqual(len(alice.followers), 1)
+        self.assertIn(alice, bob.following)
+
+    def test_unfollow_removes_pending_and_compacted_edges(self):
+        network = Network()
+        for i in range(1, 5):
+            network.add_member(i, f"Member{i}")
+        network.add_follows([1, 1, 2], [2, 3, 3])
+        network.follow(3, 4)
+        network.unfollow(1, 3)
+        network.unfollow(3, 4)
+        network.unfollow(3, 1)
+        graph = network.graph
+        graph.verify()
+        self.assertEqual(graph.num_edges, 2)
+        self.assertEqual(graph.out_degrees().tolist(), [1, 1, 0, 0])
+        self.assertEqual(graph.in_degrees().tolist(), [0, 1, 1, 0])
+        self.assertNotIn(network.members[3], network.members[1].following)
+        self.assertEqual([m.member_id for m in network.members[3].followers], [2])
+        indptr, indices = graph.in_csr()
+        self.assertEqual(indices.tolist(), [0, 1])
+        network.members[2].followers.discard(network.members[1])
+        self.assertEqual(graph.num_edges, 1)
+
+    def test_unfollow_is_buffered_until_compact(self):
+        network = Network()
+        for i in range(1, 5):
+            network.add_member(i, f"Member{i}")
+        network.add_follows([1, 1, 2, 4], [2, 3, 3, 1])
+        graph = network.graph
+        indices = graph._out_indices
+        network.unfollow(1, 3)
+        network.unfollow(4, 1)
+        network.follow(4, 1)
+        network.unfollow(2, 3)
+        self.assertIs(graph._out_indices, indices)
+        graph.verify()
+        self.assertEqual(graph.num_edges, 2)
+        self.assertEqual({m.member_id for m in network.members[1].following}, {2})
+        self.assertEqual({m.member_id for m in network.members[1].followers}, {4})
+        self.assertEqual(len(network.members[3].followers), 0)
+        network.follow(2, 3)
+        self.assertEqual(graph.out_degrees().tolist(), [1, 1, 0, 1])
+        indptr, indices = graph.out_csr()
+        self.assertEqual(indices.tolist(), [1, 2, 0])
+        self.assertEqual(graph.in_csr()[1].tolist(), [3, 0, 1])
+        graph.verify()
+
+    def test_listeners_override_only_what_they_use(self):
+        class Follows(GraphListener):
+            def __init__(self, graph):
+                self.graph = graph
+                self.follows = []
+                graph.listeners.append(self)
+
+            def on_follow(self, source, target):
+                self.follows.append((source, target))
+
+        network = Network()
+        listener = Follows(network.graph)
+        for i in range(1, 4):
+            network.add_member(i, f"Member{i}")
+        network.follow(1, 2)
+        network.like(1, 2, 3)
+        network.unfollow(1, 2)
+        network.add_follows([2], [3])
+        self.assertEqual(listener.follows, [(0, 1)])
+        listener.close()
+        network.follow(3, 1)
+        self.assertEqual(network.graph.listeners, [])
+        self.assertEqual(listener.follows, [(0, 1)])
+
+    def test_sparse_counts_sum_pending_and_compacted(self):
+        counts = SparseCounts()
+        counts.add(0, 2, 3)
+        counts.add_many([0, 1, 0], [2, 0, 1], [1, 4, 2])
+        counts.add(0, 2, 5)
+        counts.add(1, 1, 0)
+        self.assertEqual(counts.get(0, 2), 9)
+        self.assertEqual(counts.row(0), {1: 2, 2: 9})
+        self.assertEqual(counts.row_sum(0), 11)
+        self.assertEqual(counts.row_sums(3).tolist(), [11, 4, 0])
+        self.assertEqual(counts.recompute_row_sums(3).tolist(), [11, 4, 0])
+        self.assertEqual(counts.nnz, 3)
+
+    def test_likes_and_comments_share_one_store(self):
+        alice = MainMember(1, "Alice")
+        bob = MainMember(2, "Bob")
+        charlie = MainMember(3, "Charlie")
+        alice.like(bob, 2)
+        alice.like(bob, 1)
+        alice.comment(charlie, 4)
+        self.assertEqual(alice.likes[2], 3)
+        self.assertEqual(alice.likes_to[2], 3)
+        self.assertEqual(alice.likes[3], 0)
+        self.assertEqual(dict(alice.comments), {3: 4})
+        self.assertEqual(alice.total_engagement(), 7)
+        self.assertAlmostEqual(alice.influence_on(charlie), 4 / 7 * 100)
+        matrix = create_engagement_matrix({1: alice, 2: bob, 3: charlie})
+        self.assertEqual(matrix.row_sums().tolist(), [7, 0, 0])
+        self.assertEqual(matrix.toarray().sum(), 7)
+
+    def test_cached_totals_match_recompute(self):
+        network = Network()
+        for i in range(1, 6):
+            network.add_member(i, f"Member{i}")
+        network.add_follows([1, 2, 3], [2, 3, 1])
+        network.follow(4, 1)
+        network.follow(4, 1)
+        network.like(1, 2, 3)
+        network.comment(1, 3, 2)
+        network.like(5, 1, 4)
+        network.graph.verify()
+        self.assertEqual(network.members[1].total_engagement(), 5)
+        self.assertEqual(len(network.members[1].followers), 2)
+        self.assertEqual(network.graph.in_degrees().tolist(), [2, 1, 1, 0, 0])
+
+    def test_verify_detects_stale_totals(self):
+        network = Network()
+        network.add_member(1, "Alice")
+        network.add_member(2, "Bob")
+        network.like(1, 2, 3)
+        network.graph.likes._totals[0] += 1
+        with self.assertRaises(AssertionError):
+            network.graph.verify()
+
+if __name__ == '__main__':
+    unittest.main()
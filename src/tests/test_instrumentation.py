@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+import instrumentation
+from main import all_pairs_records, main as run_main
+from tests.helpers import build_network
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_records_nothing(self):
+        instrumentation.disable()
+        members = build_network(12, 3).members
+        list(all_pairs_records(members))
+        with instrumentation.phase('run'), instrumentation.timer('step'):
+            pass
+        self.assertEqual(instrumentation.report(), {'phases': {}, 'timers': {}, 'counters': {}})
+
+    def test_counters_and_timers(self):
+        members = build_network(12, 3).members
+        instrumentation.enable()
+        with instrumentation.phase('all pairs'):
+            list(all_pairs_records(members))
+        report = instrumentation.report()
+        pairs = len(members) * (len(members) - 1)
+        self.assertEqual(report['timers']['all_pairs.bfs_tree']['calls'], len(members))
+        self.assertEqual(report['timers']['all_pairs.highest_engagement_path']['calls'], pairs)
+        self.assertGreater(report['counters']['bfs.searches'], 0)
+        self.assertGreater(report['counters']['engagement_path.nodes_expanded'], 0)
+        self.assertEqual(report['phases']['all pairs']['calls'], 1)
+        self.assertGreater(report['phases']['all pairs']['wall_ns'], 0)
+
+        list(all_pairs_records(members, trace=True))
+        self.assertGreater(instrumentation.counters['trace.dfs_nodes_visited'], 0)
+        self.assertGreater(instrumentation.counters['trace.bfs_dequeued'], 0)
+        self.assertEqual(instrumentation.timers['trace.shortest_path'][0], pairs)
+
+    def test_worker_counts_are_merged(self):
+        members = build_network(12, 3).members
+        instrumentation.enable()
+        list(all_pairs_records(members))
+        single = instrumentation.snapshot()['counters']
+        instrumentation.reset()
+        list(all_pairs_records(members, workers=2))
+        self.assertEqual(instrumentation.snapshot()['counters'], single)
+
+    def test_capture_modes(self):
+        instrumentation.enable(('cpu', 'memory'))
+        with instrumentation.phase('outer'):
+            with instrumentation.phase('inner'):
+                data = [list(range(100)) for _ in range(100)]
+        phases = instrumentation.report()['phases']
+        self.assertTrue(phases['outer']['profile'])
+        self.assertNotIn('profile', phases['inner'])
+        self.assertGreater(phases['inner']['peak_bytes'], 0)
+        self.assertTrue(any('test_instrumentation.py' in row['line'] for row in phases['inner']['allocations']))
+        self.assertTrue(data)
+        with self.assertRaises(ValueError):
+            instrumentation.enable(('disk',))
+
+    def test_cli_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                run_main(['--profile', 'cpu', '--report', 'report.json'])
+                with open('report.json') as file:
+                    report = json.load(file)
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(list(report['phases']), ['build network', 'overall statistics', 'all pairs export'])
+        self.assertIn('bfs.searches', report['counters'])
+        self.assertFalse(instrumentation.ENABLED)
+
+if __name__ == '__main__':
+    unittest.main()
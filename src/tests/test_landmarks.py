@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from tests.helpers import build_network
+from algorithms import landmarks
+from algorithms.landmarks import LandmarkIndex
+from algorithms.shortest_paths import bfs_tree
+
+class TestLandmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.network = build_network(40, seed=5, min_following=0, max_following=2, interactions=False)
+        self.graph = self.network.graph
+        self.distances = [bfs_tree(self.graph, source).distances for source in range(len(self.graph))]
+
+    def check_index(self, index):
+        with mock.patch.object(landmarks, 'PRUNE_MIN_FRONTIER', 1):
+            self.check_bounds_and_paths(index)
+        self.check_bounds_and_paths(index)
+
+    def check_bounds_and_paths(self, index):
+        nodes = np.arange(len(self.graph))
+        for source in range(len(self.graph)):
+            lower = index.lower_bounds(source, nodes)
+            upper = index.upper_bounds(source, nodes)
+            for target in range(len(self.graph)):
+                distance = int(self.distances[source][target])
+                if distance < 0:
+                    self.assertEqual(upper[target], np.inf)
+                    self.assertEqual(index.distance(source, target), None)
+                    continue
+                self.assertLessEqual(lower[target], distance)
+                self.assertGreaterEqual(upper[target], distance)
+                path = index.path(source, target)
+                self.assertEqual(len(path) - 1, distance)
+                self.assertEqual(index.distance(source, target), distance)
+                for node, next_node in zip(path, path[1:]):
+                    self.assertTrue(self.graph.has_edge(node, next_node))
+
+    def test_degree_landmarks_bound_and_guide_search(self):
+        index = LandmarkIndex.build(self.graph, num_landmarks=4)
+        self.assertEqual(index.from_landmarks.dtype, np.uint8)
+        self.assertEqual(index.nbytes, 2 * 4 * 40)
+        self.check_index(index)
+
+    def test_farthest_landmarks(self):
+        index = LandmarkIndex.build(self.graph, num_landmarks=6, strategy='farthest')
+        self.assertEqual(len(set(index.landmarks.tolist())), 6)
+        self.check_index(index)
+
+    def test_bounds_are_exact_at_landmarks(self):
+        index = LandmarkIndex.build(self.graph, num_landmarks=3)
+        for landmark in index.landmarks.tolist():
+            for target in range(len(self.graph)):
+                distance = int(self.distances[landmark][target])
+                lower, upper = index.bounds(landmark, target)
+                if distance >= 0:
+                    self.assertEqual((lower, upper), (distance, distance))
+
+    def test_save_and_memory_mapped_load(self):
+        index = LandmarkIndex.build(self.graph, num_landmarks=4)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'landmarks')
+            index.save(path)
+            loaded = LandmarkIndex.load(path, self.graph)
+            self.assertIsInstance(loaded.to_landmarks, np.memmap)
+            self.assertEqual(loaded.landmarks.tolist(), index.landmarks.tolist())
+            self.check_index(loaded)
+            with self.assertRaises(ValueError):
+                LandmarkIndex.load(path).path(0, 1)
+
+if __name__ == '__main__':
+    unittest.main()
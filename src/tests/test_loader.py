@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from data.loader import load_network
+from data.network import Network
+
+FOLLOWS = [(100, 7), (7, 3000), (3000, 100), (100, 3000), (42, 7), (100, 7)]
+LIKES = [(100, 7, 2), (7, 100, 1), (100, 7, 3), (42, 3000, 0)]
+COMMENTS = [(3000, 42, 4)]
+
+class TestLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, rows, header=None, delimiter=','):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            if header:
+                file.write(delimiter.join(header) + "\n")
+            for row in rows:
+                file.write(delimiter.join(str(value) for value in row) + "\n")
+        return path
+
+    def check(self, network):
+        members = network.members
+        self.assertEqual(sorted(members), [7, 42, 100, 3000])
+        self.assertEqual({m.member_id for m in members[100].following}, {7, 3000})
+        self.assertEqual({m.member_id for m in members[7].followers}, {100, 42})
+        self.assertEqual(members[100].likes[7], 5)
+        self.assertEqual(members[3000].comments[42], 4)
+        self.assertEqual(dict(members[42].likes), {})
+        self.assertEqual(members[100].total_engagement(), 5)
+        network.graph.verify()
+
+    def test_csv_with_header_in_chunks(self):
+        network = Network()
+        stats = load_network(
+            network,
+            follows=self.write('follows.csv', FOLLOWS, header=['follower', 'followee']),
+            likes=self.write('likes.csv', LIKES),
+            comments=self.write('comments.csv', COMMENTS),
+            chunk_rows=2,
+        )
+        self.check(network)
+        self.assertEqual(stats.rows, 11)
+        self.assertEqual(stats.new_members, 4)
+        self.assertIn("rows/s", str(stats))
+
+    def test_tsv_and_npy(self):
+        network = Network()
+        follows = os.path.join(self.directory.name, 'follows.npy')
+        np.save(follows, np.array(FOLLOWS))
+        load_network(
+            network,
+            follows=follows,
+            likes=self.write('likes.tsv', LIKES, delimiter='\t'),
+            comments=self.write('comments.tsv', COMMENTS, delimiter='\t'),
+        )
+        self.check(network)
+
+    def test_existing_members_keep_their_names(self):
+        network = Network()
+        network.add_member(7, "Alice")
+        load_network(network, follows=self.write('follows.csv', FOLLOWS))
+        self.assertEqual(network.members[7].name, "Alice")
+        self.assertEqual(network.members[3000].name, "Member3000")
+
+    def test_wrong_column_count(self):
+        with self.assertRaises(ValueError):
+            load_network(Network(), follows=self.write('follows.csv', LIKES))
+
+if __name__ == '__main__':
+    unittest.main()
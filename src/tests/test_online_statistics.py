@@ -0,0 +1,109 @@
+import unittest
+import random
+from main import Network, all_pairs_records, display_overall_statistics
+
+class TestOnlineStatistics(unittest.TestCase):
+
+    def assertStatisticsEqual(self, online, batch):
+        # Running sums may land on the other side of a rounding boundary.
+        self.assertEqual(online.keys(), batch.keys())
+        for key, value in batch.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(online[key], value, delta=0.0101, msg=key)
+            else:
+                self.assertEqual(online[key], value, msg=key)
+
+    def test_matches_batch_statistics_after_every_event(self):
+        rng = random.Random(29)
+        network = Network()
+        statistics = network.track_statistics()
+        for i in range(1, 4):
+            network.add_member(i, f"Member{i}")
+        self.assertStatisticsEqual(statistics.overall(), display_overall_statistics(network.members))
+        for step in range(300):
+            if step % 40 == 0:
+                member_id = len(network.members) + 1
+                network.add_member(member_id, f"Member{member_id}")
+            member_ids = list(network.members)
+            source, target = rng.sample(member_ids, 2)
+            event = rng.choice(('follow', 'like', 'comment'))
+            if event == 'follow':
+                network.follow(source, target)
+            elif event == 'like':
+                network.like(source, target, rng.randint(0, 4))
+            else:
+                network.comment(source, target, rng.randint(1, 2))
+            self.assertStatisticsEqual(statistics.overall(), display_overall_statistics(network.members))
+
+    def test_bulk_changes_recompute(self):
+        network = Network()
+        statistics = network.track_statistics()
+        for i in range(1, 6):
+            network.add_member(i, f"Member{i}")
+        network.add_follows([1, 2, 3, 4], [2, 3, 4, 5])
+        network.like(1, 2, 3)
+        self.assertStatisticsEqual(statistics.overall(), display_overall_statistics(network.members))
+
+    def test_dirty_influence_rows(self):
+        network = Network()
+        for i in range(1, 5):
+            network.add_member(i, f"Member{i}")
+        statistics = network.track_statistics()
+        self.assertEqual(statistics.take_dirty(), [])
+        network.follow(1, 2)
+        self.assertEqual(statistics.take_dirty(), [1, 2])
+        network.like(3, 1, 2)
+        network.comment(1, 4, 1)
+        network.like(3, 2, 1)
+        dirty = statistics.take_dirty()
+        self.assertEqual(dirty, [1, 3])
+        self.assertEqual(statistics.take_dirty(), [])
+        records = list(all_pairs_records(network.members, sources=dirty))
+        self.assertEqual([record[0] for record in records], [1, 3])
+        self.assertEqual(dict(records[1][2])[1], 2 / 3 * 100)
+        network.add_member(5, "Member5")
+        self.assertEqual(statistics.take_dirty(), [1, 2, 3, 4, 5])
+
+    def test_dirty_rows_cover_path_changes(self):
+        def rows(sources=None):
+            return {
+                member_id: (rate, influences, [(other_id, entry[0]) for other_id, entry in shortest], engagement)
+                for member_id, rate, influences, shortest, engagement in all_pairs_records(network.members, sources=sources)
+            }
+
+        network = Network()
+        for i in range(1, 7):
+            network.add_member(i, f"Member{i}")
+        network.add_follows([1, 2, 4, 5], [2, 3, 5, 6])
+        network.like(5, 6, 2)
+        statistics = network.track_statistics()
+        statistics.take_dirty()
+        before = rows()
+        # New paths from 1 and 2 through 3, and a heavier 4 on paths into it.
+        network.follow(3, 4)
+        network.like(4, 1, 3)
+        dirty = statistics.take_dirty()
+        self.assertEqual(dirty, [1, 2, 3, 4])
+        after = rows()
+        self.assertEqual(rows(dirty), {member_id: after[member_id] for member_id in dirty})
+        for member_id in set(after) - set(dirty):
+            self.assertEqual(after[member_id], before[member_id])
+        network.unfollow(2, 3)
+        self.assertEqual(statistics.take_dirty(), [1, 2, 3])
+
+    def test_dirty_rows_cover_follower_counts(self):
+        network = Network()
+        for i in range(1, 5):
+            network.add_member(i, f"Member{i}")
+        network.like(4, 1, 3)
+        statistics = network.track_statistics()
+        statistics.take_dirty()
+        # Member 4 follows no one, so only its follower count (and rate) changes.
+        network.follow(3, 4)
+        dirty = statistics.take_dirty()
+        self.assertEqual(dirty, [3, 4])
+        record = next(all_pairs_records(network.members, sources=[4]))
+        self.assertEqual(record[1], 300)
+
+if __name__ == '__main__':
+    unittest.main()
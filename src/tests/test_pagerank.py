@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from algorithms.pagerank import pagerank
+from tests.helpers import build_network
+
+class TestPageRank(unittest.TestCase):
+
+    def setUp(self):
+        self.network = build_network(30, seed=13)
+        self.graph = self.network.graph
+
+    def dense_scores(self, damping=0.85):
+        members = list(self.graph.members)
+        num_nodes = len(members)
+        weights = np.zeros((num_nodes, num_nodes))
+        for member in members:
+            for other in member.following:
+                weights[member._index, other._index] += 1
+            for other_id, count in member.likes.items():
+                weights[member._index, self.graph.index[other_id]] += count
+            for other_id, count in member.comments.items():
+                weights[member._index, self.graph.index[other_id]] += count
+        totals = weights.sum(axis=1)
+        transition = np.full((num_nodes, num_nodes), 1 / num_nodes)
+        has_out = totals > 0
+        transition[has_out] = weights[has_out] / totals[has_out, None]
+        scores = np.full(num_nodes, 1 / num_nodes)
+        for _ in range(1000):
+            scores = damping * transition.T @ scores + (1 - damping) / num_nodes
+        return scores
+
+    def test_matches_dense_power_iteration(self):
+        result = pagerank(self.graph, tolerance=1e-12, max_iterations=1000)
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.scores.sum(), 1.0)
+        np.testing.assert_allclose(result.scores, self.dense_scores(), atol=1e-10)
+        self.assertEqual(len(result.iteration_seconds), result.iterations)
+        self.assertEqual(set(result.by_id()), set(self.network.members))
+
+    def test_float32_and_iteration_limit(self):
+        exact = pagerank(self.graph, tolerance=1e-12, max_iterations=1000)
+        single = pagerank(self.graph, tolerance=1e-5, dtype=np.float32)
+        self.assertEqual(single.scores.dtype, np.float32)
+        np.testing.assert_allclose(single.scores, exact.scores, atol=1e-4)
+        limited = pagerank(self.graph, tolerance=0, max_iterations=3)
+        self.assertFalse(limited.converged)
+        self.assertEqual(limited.iterations, 3)
+
+    def test_warm_start_after_updates(self):
+        network = build_network(200, seed=13)
+        rank = network.track_influence_rank(tolerance=1e-9)
+        rank.scores()
+        network.follow(1, 2)
+        network.like(3, 4, 1)
+        scores = rank.scores()
+        cold = pagerank(network.graph, tolerance=1e-9)
+        self.assertLess(rank.last.iterations, cold.iterations)
+        np.testing.assert_allclose(scores, cold.scores, atol=1e-8)
+        network.add_member(201, "Member201")
+        network.follow(201, 1)
+        self.assertEqual(len(rank.scores()), 201)
+        self.assertAlmostEqual(rank.scores().sum(), 1.0)
+        top = network.top_by_influence(3)
+        self.assertEqual(len(top), 3)
+        self.assertEqual(top[0][1], rank.scores().max())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import random
+import warnings
+from main import Network
+from algorithms.influence import influence_matrix, top_influenced
+
+class TestRanking(unittest.TestCase):
+
+    def expected(self, network, score, k):
+        members = network.members.values()
+        ranked = sorted(members, key=lambda member: (-score(member), member._index))
+        return [(member.member_id, score(member)) for member in ranked[:k]]
+
+    def test_rankings_follow_every_event(self):
+        rng = random.Random(3)
+        network = Network()
+        for i in range(1, 6):
+            network.add_member(i, f"Member{i}")
+        for step in range(300):
+            if step % 30 == 0:
+                member_id = len(network.members) + 1
+                network.add_member(member_id, f"Member{member_id}")
+            source, target = rng.sample(list(network.members), 2)
+            event = rng.choice(('follow', 'unfollow', 'like', 'comment'))
+            if event == 'follow':
+                network.follow(source, target)
+            elif event == 'unfollow':
+                network.unfollow(source, target)
+            elif event == 'like':
+                network.like(source, target, rng.randint(0, 3))
+            else:
+                network.comment(source, target, 1)
+            for k in (1, 3, 50):
+                self.assertEqual(
+                    network.top_by_engagement_rate(k),
+                    self.expected(network, lambda member: member.engagement_rate(), k),
+                )
+                self.assertEqual(
+                    network.top_by_total_engagement(k),
+                    self.expected(network, lambda member: member.total_engagement(), k),
+                )
+
+    def test_top_influenced_by_matches_matrix(self):
+        rng = random.Random(8)
+        network = Network()
+        for i in range(1, 21):
+            network.add_member(i, f"Member{i}")
+        for _ in range(150):
+            source, target = rng.sample(range(1, 21), 2)
+            network.like(source, target, rng.randint(1, 3))
+        expected = dict(top_influenced(network.members, 4))
+        for member_id in network.members:
+            self.assertEqual(network.top_influenced_by(member_id, 4), expected[member_id])
+        network.add_member(21, "Member21")
+        self.assertEqual(network.top_influenced_by(21, 4), [])
+        subset = {member_id: network.members[member_id] for member_id in (3, 1)}
+        self.assertEqual(list(top_influenced(subset, 4)), [(3, expected[3]), (1, expected[1])])
+
+    def test_zero_counts_have_no_influence(self):
+        network = Network()
+        for i in range(1, 4):
+            network.add_member(i, f"Member{i}")
+        network.graph.add_interactions('likes', [0, 1], [1, 2], [0, 4])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            matrix = influence_matrix(network.members)
+        self.assertEqual(matrix.nnz, 1)
+        self.assertEqual(dict(top_influenced(network.members, 2)), {1: [], 2: [(3, 100.0)], 3: []})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from tests.helpers import build_network
+from algorithms.path_finding import dijkstra
+from algorithms.shortest_paths import bfs_tree
+
+class TestReachability(unittest.TestCase):
+
+    def setUp(self):
+        self.network = build_network(50, seed=17, min_following=0, max_following=2, interactions=False)
+        self.members = self.network.members
+
+    def check_against_bfs(self, index):
+        graph = self.network.graph
+        for source in range(len(graph)):
+            distances = bfs_tree(graph, source).distances
+            for target in range(len(graph)):
+                self.assertEqual(index.reachable(source, target), bool(distances[target] >= 0))
+
+    def test_matches_bfs_and_rejects_without_search(self):
+        index = self.network.index_reachability()
+        self.check_against_bfs(index)
+        pairs = len(self.network.graph) ** 2
+        self.assertLess(index.searches, pairs // 4)
+
+    def test_rebuilds_after_changes(self):
+        index = self.network.index_reachability()
+        self.network.add_member(51, "Member51")
+        self.assertFalse(self.network.can_reach(1, 51))
+        self.network.follow(1, 51)
+        self.network.follow(51, 2)
+        self.assertTrue(self.network.can_reach(1, 51))
+        self.network.unfollow(1, 51)
+        self.check_against_bfs(index)
+
+    def test_redundant_follows_keep_the_index(self):
+        index = self.network.index_reachability()
+        graph = self.network.graph
+        redundant = []
+        for source_id in range(1, 51):
+            tree = bfs_tree(graph, graph.index[source_id])
+            for target_id in range(1, 51):
+                if target_id != source_id and tree.distance(graph.index[target_id]) is not None \
+                        and self.members[target_id] not in self.members[source_id].following:
+                    redundant.append((source_id, target_id))
+        self.assertTrue(redundant)
+        for source_id, target_id in redundant[:20]:
+            self.network.follow(source_id, target_id)
+            self.assertFalse(index.stale)
+        self.check_against_bfs(index)
+        self.network.follow(50, 1)
+        self.check_against_bfs(index)
+
+    def test_path_engines_use_the_index(self):
+        self.network.index_reachability()
+        graph = self.network.graph
+        for source_id in range(1, 11):
+            tree = bfs_tree(graph, graph.index[source_id])
+            for target_id in range(1, 51):
+                if source_id == target_id:
+                    continue
+                source, target = self.members[source_id], self.members[target_id]
+                reachable = tree.distance(target._index) is not None
+                self.assertEqual(bool(source.shortest_path_to(target, self.members)[0]), reachable)
+                self.assertEqual(dijkstra(self.members, source_id, target_id) is not None, reachable)
+                if not reachable:
+                    self.assertEqual(source.highest_engagement_path_to(target, self.members), ([], 0, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from main import all_pairs_records, display_all_pairs_data, display_overall_statistics
+from data.results import ResultsReader, save_results
+from tests.helpers import build_network
+
+class TestResults(unittest.TestCase):
+
+    def setUp(self):
+        self.members = build_network(10, seed=23).members
+        self.summary_data = display_all_pairs_data(self.members, None, None)
+        self.overall_stats = display_overall_statistics(self.members)
+
+    def check_reader(self, reader):
+        self.assertEqual(len(reader), 10)
+        self.assertEqual(reader.overall_stats["Total members"], 10)
+        for member_id in self.members:
+            self.assertAlmostEqual(reader.engagement_rate(member_id), self.summary_data['engagement_rates'][member_id])
+            expected = {o: v for o, v in self.summary_data['influences'][member_id].items() if v}
+            self.assertEqual(reader.influences(member_id), expected)
+            self.assertEqual(
+                reader.shortest_paths(member_id),
+                {o: p for o, (p, _, _) in self.summary_data['shortest_paths'][member_id].items() if p},
+            )
+            self.assertEqual(
+                reader.engagement_paths(member_id),
+                {o: (p, e) for o, (p, e, _, _) in self.summary_data['engagement_paths'][member_id].items() if p},
+            )
+        with self.assertRaises(KeyError):
+            reader.engagement_rate(99)
+
+    def test_directory_round_trip_is_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results')
+            save_results(path, self.overall_stats, all_pairs_records(self.members), self.members)
+            reader = ResultsReader(path)
+            self.assertIsInstance(reader.arrays['shortest_path_nodes'], np.memmap)
+            self.assertEqual(reader.arrays['influence_targets'].dtype, np.int32)
+            self.check_reader(reader)
+
+    def test_npz_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.npz')
+            save_results(path, self.overall_stats, all_pairs_records(self.members), self.members)
+            self.check_reader(ResultsReader(path))
+
+    def test_records_out_of_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.npz')
+            records = list(all_pairs_records(self.members))
+            save_results(path, self.overall_stats, records[::-1], self.members)
+            self.check_reader(ResultsReader(path))
+            with self.assertRaisesRegex(ValueError, "one record per member"):
+                save_results(path, self.overall_stats, records[1:], self.members)
+            with self.assertRaisesRegex(ValueError, "More than one record"):
+                save_results(path, self.overall_stats, records + records[:1], self.members)
+
+if __name__ == '__main__':
+    unittest.main()
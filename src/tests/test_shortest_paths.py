@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+import random
+from tests.helpers import build_network
+from algorithms import shortest_paths
+from algorithms.path_finding import dijkstra
+from algorithms.shortest_paths import ShortestPathIndex, bfs_tree, bidirectional_path, hop_distances
+
+class TestShortestPaths(unittest.TestCase):
+
+    def setUp(self):
+        self.network = build_network(30, seed=7, min_following=0, max_following=3, interactions=False)
+        self.members = self.network.members
+
+    def test_bfs_tree_matches_queue_bfs(self):
+        for member in self.members.values():
+            tree = bfs_tree(self.network.graph, member._index)
+            for other in self.members.values():
+                if member == other:
+                    continue
+                expected, bfs_matrix = member.shortest_path_to(other, self.members, trace=True)
+                self.assertEqual(tree.path_ids(other._index), expected)
+                self.assertTrue(bfs_matrix)
+                self.assertEqual(tree.distance(other._index), len(expected) - 1 if expected else None)
+
+    def test_trace_is_opt_in(self):
+        alice, bob = self.members[1], self.members[2]
+        path, bfs_matrix = alice.shortest_path_to(bob, self.members)
+        self.assertEqual(bfs_matrix, [])
+        self.assertEqual(path, alice.shortest_path_to(bob, self.members, trace=True)[0])
+
+    def test_bidirectional_paths_are_shortest(self):
+        graph = self.network.graph
+        for source in range(len(graph)):
+            tree = bfs_tree(graph, source)
+            for target in range(len(graph)):
+                path = bidirectional_path(graph, source, target)
+                distance = tree.distance(target)
+                if distance is None:
+                    self.assertEqual(path, [])
+                    self.assertIsNone(dijkstra(self.members, graph.ids[source], graph.ids[target]))
+                    continue
+                self.assertEqual(len(path) - 1, distance)
+                self.assertEqual((path[0], path[-1]), (source, target))
+                for node, next_node in zip(path, path[1:]):
+                    self.assertTrue(graph.has_edge(node, next_node))
+
+    def test_bitset_hop_distances_match_bfs(self):
+        graph = self.network.graph
+        batches = list(hop_distances(graph, batch_size=8))
+        self.assertEqual(len(batches), 4)
+        for sources, distances in batches:
+            for row, source in enumerate(sources):
+                self.assertEqual(distances[row].tolist(), bfs_tree(graph, int(source)).distances.tolist())
+
+    def test_index_tracks_follows_and_unfollows(self):
+        rng = random.Random(11)
+        graph = self.network.graph
+        index = self.network.index_shortest_paths()
+        for step in range(200):
+            if step % 50 == 0:
+                self.network.add_member(len(self.members) + 1, "Member")
+            source_id, target_id = rng.sample(list(self.members), 2)
+            if self.members[target_id] in self.members[source_id].following:
+                self.network.unfollow(source_id, target_id)
+            else:
+                self.network.follow(source_id, target_id)
+            for source in rng.sample(range(len(graph)), 5):
+                fresh = bfs_tree(graph, source)
+                tree = index.tree(source)
+                self.assertEqual(tree.distances.tolist(), fresh.distances.tolist())
+                self.assertEqual(tree.predecessors.tolist(), fresh.predecessors.tolist())
+        self.assertLess(index.searches, 200 * 5)
+        self.assertEqual(self.network.shortest_path(1, 1), [1])
+
+    def test_tree_cache_is_bounded(self):
+        graph = self.network.graph
+        self.assertEqual(len(self.network.shortest_path(1, 5)), len(bfs_tree(graph, 0).path(4)))
+        self.assertIsNone(graph.listener(ShortestPathIndex))
+        index = ShortestPathIndex(graph, max_trees=3)
+        for source in (0, 1, 2, 0, 3):
+            index.tree(source)
+        self.assertEqual(list(index.trees), [2, 0, 3])
+        self.assertEqual(index.searches, 4)
+        index.close()
+        with mock.patch.object(shortest_paths, 'TREE_CACHE_BYTES', 8 * len(graph) * 2):
+            self.assertEqual(ShortestPathIndex(graph).capacity(), 2)
+
+    def test_index_answers_member_queries(self):
+        index = ShortestPathIndex(self.network.graph)
+        alice, bob = self.members[1], self.members[2]
+        expected, _ = alice.shortest_path_to(bob, self.members, trace=True)
+        self.assertEqual(alice.shortest_path_to(bob, self.members)[0], expected)
+        self.assertIn(alice._index, index.trees)
+        index.close()
+        self.assertEqual(self.network.graph.listeners, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import main
+from data import network as data_network
+from data.snapshot import FORMAT_VERSION, PREAMBLE, Snapshot
+from main import all_pairs_records, display_overall_statistics, random_network
+
+def without_timings(members):
+    return [
+        (member_id, rate, influences, [(other_id, path) for other_id, (path, _, _) in shortest_paths], engagement_paths)
+        for member_id, rate, influences, shortest_paths, engagement_paths in all_pairs_records(members)
+    ]
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'network.snap')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameNetwork(self, network, loaded):
+        self.assertEqual(list(loaded.members), list(network.members))
+        self.assertEqual(len(loaded.members), len(network.members))
+        for member_id, member in network.members.items():
+            other = loaded.members[member_id]
+            self.assertEqual((other.member_id, other.name), (member.member_id, member.name))
+            self.assertEqual({m.member_id for m in other.following}, {m.member_id for m in member.following})
+            self.assertEqual({m.member_id for m in other.followers}, {m.member_id for m in member.followers})
+            self.assertEqual(dict(other.likes), dict(member.likes))
+            self.assertEqual(dict(other.comments), dict(member.comments))
+            self.assertEqual(other.engagement_rate(), member.engagement_rate())
+        self.assertEqual(display_overall_statistics(loaded.members), display_overall_statistics(network.members))
+
+    def build(self, network_class):
+        network = random_network(network_class(), 15, seed=6)
+        network.add_member(1000, "Zoë Ωmega")
+        network.add_member(1001, "")
+        network.follow(1000, 3)
+        return network
+
+    def test_round_trip_both_facades(self):
+        for module in (main, data_network):
+            network = self.build(module.Network)
+            network.save_snapshot(self.path)
+            loaded = module.Network.load_snapshot(self.path, verify=True)
+            self.assertIsInstance(loaded.members[3], module.Member)
+            self.assertSameNetwork(network, loaded)
+            self.assertIs(loaded.members[3], loaded.members[3])
+            self.assertEqual(loaded.shortest_path(1000, 5), network.shortest_path(1000, 5))
+
+        network = self.build(main.Network)
+        network.save_snapshot(self.path)
+        loaded = main.Network.load_snapshot(self.path)
+        self.assertEqual(without_timings(loaded.members), without_timings(network.members))
+
+    def test_arrays_are_memory_mapped(self):
+        self.build(main.Network).save_snapshot(self.path)
+        snapshot = Snapshot(self.path)
+        self.assertEqual(snapshot.num_members, 17)
+        loaded = main.Network.load_snapshot(self.path)
+        indptr, indices = loaded.graph.out_csr()
+        self.assertFalse(indices.flags.writeable)
+        self.assertIsInstance(snapshot.buffer, np.memmap)
+        self.assertTrue(np.shares_memory(snapshot.arrays['out_indices'], snapshot.buffer))
+        self.assertEqual(snapshot.arrays['out_indices'].ctypes.data % 64, 0)
+
+    def test_resave_keeps_members_lazy(self):
+        network = self.build(main.Network)
+        network.save_snapshot(self.path)
+        loaded = main.Network.load_snapshot(self.path)
+        second = os.path.join(self.directory.name, 'second.snap')
+        loaded.save_snapshot(second)
+        self.assertEqual(display_overall_statistics(loaded.members), display_overall_statistics(network.members))
+        self.assertEqual(loaded.graph.members._members, [None] * 17)
+        self.assertSameNetwork(network, main.Network.load_snapshot(second, verify=True))
+
+    def test_changes_after_load_round_trip(self):
+        network = self.build(main.Network)
+        network.save_snapshot(self.path)
+        loaded = main.Network.load_snapshot(self.path)
+        for changed in (network, loaded):
+            changed.add_member(2000, "Newcomer")
+            changed.follow(2000, 1)
+            changed.unfollow(1000, 3)
+            changed.like(2000, 1, 4)
+            changed.comment(1, 2000, 2)
+            changed.members[5].name = "Renamed"
+        self.assertSameNetwork(network, loaded)
+        second = os.path.join(self.directory.name, 'second.snap')
+        loaded.save_snapshot(second)
+        self.assertSameNetwork(network, main.Network.load_snapshot(second, verify=True))
+
+    def test_rejects_corrupt_files(self):
+        self.build(main.Network).save_snapshot(self.path)
+        with open(self.path, 'rb') as file:
+            original = bytearray(file.read())
+
+        def write(data):
+            with open(self.path, 'wb') as file:
+                file.write(data)
+
+        corrupt = bytearray(original)
+        corrupt[-70] ^= 0xFF
+        write(corrupt)
+        main.Network.load_snapshot(self.path)
+        with self.assertRaisesRegex(ValueError, "checksum"):
+            main.Network.load_snapshot(self.path, verify=True)
+
+        corrupt = bytearray(original)
+        corrupt[PREAMBLE.size + 3] ^= 0xFF
+        write(corrupt)
+        with self.assertRaisesRegex(ValueError, "header"):
+            main.Network.load_snapshot(self.path)
+
+        newer = bytearray(original)
+        newer[8:12] = (FORMAT_VERSION + 1).to_bytes(4, 'little')
+        write(newer)
+        with self.assertRaisesRegex(ValueError, "format"):
+            main.Network.load_snapshot(self.path)
+
+        write(original[:len(original) // 2])
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            main.Network.load_snapshot(self.path)
+
+        write(b"follower,followee\n1,2\n")
+        with self.assertRaisesRegex(ValueError, "not a network snapshot"):
+            main.Network.load_snapshot(self.path)
+
+if __name__ == '__main__':
+    unittest.main()